@@ -0,0 +1,291 @@
+"""
+Bulk answer grading for exam-scale answer sets.
+
+Streams answers from a JSONL or CSV file, grades them in chunks across a
+process pool (each worker loads the model once), and appends results to a
+JSONL file in input order. A crashed or interrupted run resumes from the last
+complete chunk when started again with the same arguments.
+
+Input fields per record:
+    user_answer   the candidate's answer (required)
+    ideal_answer  the reference answer (required)
+    keywords      list, or a ";"-separated string in CSV files (optional)
+    question_id   question bank id, for the precomputed ideal-answer store (optional)
+    id            echoed back in the output (optional)
+
+A record that cannot be graded (not an object, or a field of the wrong type)
+gets an {"index", "id", "error"} line in its place and the run continues.
+
+Usage:
+    python bulk_grade.py answers.jsonl graded.jsonl --workers 8 --fuzzy
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_CHUNK_SIZE = 256
+DEFAULT_SEMANTIC_WEIGHT = 0.7
+
+
+def input_format(path, declared=None):
+    if declared:
+        return declared
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _parse_line(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        # Passed on as-is; grade_chunk reports it as an error record
+        return line
+
+
+def read_records(path, fmt, keyword_separator=";"):
+    """
+    Yield input records as dicts, with ``keywords`` normalized to a list.
+    JSONL lines that do not hold an object are yielded unchanged.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = csv.DictReader(f) if fmt == "csv" else (_parse_line(line) for line in f if line.strip())
+        for record in rows:
+            if not isinstance(record, dict):
+                yield record
+                continue
+            keywords = record.get("keywords") or []
+            if isinstance(keywords, str):
+                keywords = [k.strip() for k in keywords.split(keyword_separator) if k.strip()]
+            record["keywords"] = keywords
+            yield record
+
+
+def count_records(path, fmt):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            return sum(1 for _ in csv.DictReader(f))
+        return sum(1 for line in f if line.strip())
+
+
+def completed_count(output_path, chunk_size):
+    """
+    Number of results already written, rounded down to a whole chunk.
+
+    Output past the last whole chunk (including a partial line) is truncated,
+    so a resumed run grades the same chunks as an uninterrupted one. The file is
+    read line by line, so resuming a large run does not load it into memory.
+    """
+    if not os.path.exists(output_path):
+        return 0
+    lines = keep = end = offset = 0
+    with open(output_path, "rb+") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            lines += 1
+            offset += len(line)
+            if lines % chunk_size == 0:
+                keep, end = lines, offset
+        if end < os.fstat(f.fileno()).st_size:
+            f.truncate(end)
+    return keep
+
+
+def _init_worker(options):
+    """
+    Pool initializer: pin thread counts and load the model once per worker process.
+    Only run in pool workers; it changes process-wide settings.
+    """
+    threads = options.get("threads")
+    if threads:
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ[var] = str(threads)
+
+    import evaluate
+
+    # Whole chunks are already batched, so the cross-thread queue adds nothing here
+    evaluate.ENCODE_QUEUE_ENABLED = False
+    if options.get("use_semantic") and evaluate.SENTENCE_TRANSFORMERS_AVAILABLE:
+        evaluate.get_sentence_transformer_model()
+
+
+def _record_error(record):
+    """
+    Why ``record`` cannot be graded, or None if it can.
+    """
+    if not isinstance(record, dict):
+        return "Record must be a JSON object"
+    for field in ("user_answer", "ideal_answer"):
+        value = record.get(field)
+        if value is not None and not isinstance(value, str):
+            return f"{field} must be a string, not {type(value).__name__}"
+    keywords = record["keywords"]
+    if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+        return "keywords must be a list of strings"
+    return None
+
+
+def grade_chunk(start, records, options):
+    """
+    Grade a chunk of records with the grade_file ``options``; returns result
+    dicts in the same order, with an error result for each record that
+    cannot be graded.
+    """
+    from evaluate import evaluate_answers
+    from keyword_checker import KeywordSet
+
+    errors = [_record_error(r) for r in records]
+    valid = [r for r, error in zip(records, errors) if error is None]
+    pairs = [(r.get("user_answer") or "", r.get("ideal_answer") or "") for r in valid]
+    question_ids = [r.get("question_id") for r in valid]
+    similarities = evaluate_answers(
+        pairs,
+        use_semantic=options.get("use_semantic", True),
+        question_ids=question_ids if any(q is not None for q in question_ids) else None,
+        cascade=options.get("cascade"),
+    ) if pairs else []
+    weight = options.get("semantic_weight", DEFAULT_SEMANTIC_WEIGHT)
+
+    results = []
+    graded = iter(zip(pairs, similarities))
+    for offset, (record, error) in enumerate(zip(records, errors)):
+        if error is not None:
+            record_id = record.get("id") if isinstance(record, dict) else None
+            results.append({"index": start + offset, "id": record_id, "error": error})
+            continue
+        (user_answer, _), similarity = next(graded)
+        result = {"index": start + offset, "id": record.get("id"), "similarity": round(similarity, 4)}
+        if record["keywords"]:
+            keyword_options = (
+                options.get("strict", False),
+                options.get("fuzzy", False),
+                options.get("similarity_threshold", 85),
+            )
+            if record.get("question_id") is not None:
+                keyword_set = KeywordSet.for_question(record["question_id"], record["keywords"], *keyword_options)
+            else:
+                keyword_set = KeywordSet.compile(record["keywords"], *keyword_options)
+            coverage = keyword_set.score(user_answer)
+            result["keywordCoverage"] = coverage["coverage_score"]
+            result["matchedKeywords"] = coverage["matched_keyword_list"]
+            result["score"] = round(weight * similarity + (1 - weight) * coverage["coverage_score"], 4)
+        else:
+            result["score"] = result["similarity"]
+        results.append(result)
+    return results
+
+
+def _chunks(records, size, start):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield start, chunk
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+
+def _report(done, total, skipped, started):
+    elapsed = time.monotonic() - started
+    rate = (done - skipped) / elapsed if elapsed else 0.0
+    eta = f", ETA {(total - done) / rate:.0f}s" if rate and total else ""
+    print(f"Graded {done}/{total} answers ({rate:.1f}/s{eta})", file=sys.stderr, flush=True)
+
+
+def grade_file(input_path, output_path, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, fmt=None,
+               keyword_separator=";", progress_every=10, **options):
+    """
+    Grade every record in ``input_path`` into ``output_path``, resuming if it exists.
+
+    Returns:
+        int: Number of records graded in this run
+    """
+    fmt = input_format(input_path, fmt)
+    total = count_records(input_path, fmt)
+    skipped = completed_count(output_path, chunk_size)
+    if skipped:
+        print(f"Resuming after {skipped} graded answers", file=sys.stderr)
+    records = read_records(input_path, fmt, keyword_separator)
+    for _ in range(skipped):
+        next(records, None)
+
+    workers = max(1, workers)
+    options.setdefault("threads", max(1, (os.cpu_count() or 1) // workers))
+    started = time.monotonic()
+    done = skipped
+    with open(output_path, "a", encoding="utf-8") as out:
+        def write(results):
+            nonlocal done
+            for result in results:
+                out.write(json.dumps(result) + "\n")
+            out.flush()
+            done += len(results)
+
+        chunks = _chunks(records, chunk_size, skipped)
+        if workers == 1:
+            # Graded in this process, which keeps its own thread and queue settings
+            for n, (start, chunk) in enumerate(chunks, 1):
+                write(grade_chunk(start, chunk, options))
+                if n % progress_every == 0:
+                    _report(done, total, skipped, started)
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(options,)) as pool:
+                # Bounded window of in-flight chunks, written strictly in order
+                pending = deque()
+                for n, (start, chunk) in enumerate(chunks, 1):
+                    pending.append(pool.submit(grade_chunk, start, chunk, options))
+                    if len(pending) >= workers * 2:
+                        write(pending.popleft().result())
+                    if n % progress_every == 0:
+                        _report(done, total, skipped, started)
+                while pending:
+                    write(pending.popleft().result())
+    _report(done, total, skipped, started)
+    return done - skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade a file of answers in bulk")
+    parser.add_argument("input", help="JSONL or CSV file of answers")
+    parser.add_argument("output", help="JSONL results file (appended to on resume)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="Input format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--keyword-separator", default=";", help="Keyword separator in CSV input")
+    parser.add_argument("--semantic-weight", type=float, default=DEFAULT_SEMANTIC_WEIGHT,
+                        help="Weight of similarity vs keyword coverage in the combined score")
+    parser.add_argument("--tfidf", action="store_true", help="Use TF-IDF instead of the semantic model")
+    parser.add_argument("--cascade", action="store_true", help="Settle clear cases before the semantic model")
+    parser.add_argument("--strict", action="store_true", help="Whole-word keyword matching")
+    parser.add_argument("--fuzzy", action="store_true", help="Fuzzy keyword matching")
+    parser.add_argument("--similarity-threshold", type=int, default=85)
+    parser.add_argument("--progress-every", type=int, default=10, help="Chunks between progress lines")
+    args = parser.parse_args(argv)
+
+    graded = grade_file(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        fmt=args.format,
+        keyword_separator=args.keyword_separator,
+        progress_every=args.progress_every,
+        use_semantic=not args.tfidf,
+        cascade=args.cascade or None,
+        semantic_weight=args.semantic_weight,
+        strict=args.strict,
+        fuzzy=args.fuzzy,
+        similarity_threshold=args.similarity_threshold,
+    )
+    print(f"Graded {graded} answers into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
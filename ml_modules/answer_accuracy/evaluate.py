@@ -1,47 +1,149 @@
+import os
+import re
+import sys
+import threading
+
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
-# Try to import sentence transformers with graceful fallback
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: sentence-transformers not available: {e}")
+# The shared encoder backend lives in ml_modules/, one level up
+ANSWER_ACCURACY_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_MODULES_DIR = os.path.dirname(ANSWER_ACCURACY_DIR)
+for _path in (ANSWER_ACCURACY_DIR, ML_MODULES_DIR):
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+from encoder_backend import DEFAULT_BACKEND, backend_available, load_encoder
+from inference_queue import BatchingEncoder
+from question_bank_store import QuestionBankStore
+from tfidf_model import load_tfidf, pair_similarities
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+# Concurrent callers share micro-batched forward passes; set to 0 to call the model directly
+ENCODE_QUEUE_ENABLED = os.environ.get("PLACIFY_ENCODE_QUEUE", "1") != "0"
+# Root of a store built with question_bank_store.py; unset disables the lookup
+QUESTION_BANK_DIR = os.environ.get("PLACIFY_QUESTION_BANK_DIR")
+# Corpus-fitted vectorizer saved by tfidf_model.py; unset fits per call as before
+TFIDF_MODEL_PATH = os.environ.get("PLACIFY_TFIDF_MODEL")
+
+# Cascade mode: cheap checks settle clear cases before the transformer runs.
+#   min_words       answers with fewer words score 0.0
+#   near_duplicate  TF-IDF score at or above this is returned as-is
+#   off_topic       TF-IDF score below this is returned as-is; 0 (the default)
+#                   turns the stage off, since a paraphrase sharing no words with
+#                   the ideal answer also scores 0 and needs the semantic stage
+CASCADE_ENABLED = os.environ.get("PLACIFY_EVAL_CASCADE", "0") == "1"
+CASCADE_THRESHOLDS = {
+    "min_words": int(os.environ.get("PLACIFY_CASCADE_MIN_WORDS", "1")),
+    "near_duplicate": float(os.environ.get("PLACIFY_CASCADE_NEAR_DUPLICATE", "0.95")),
+    "off_topic": float(os.environ.get("PLACIFY_CASCADE_OFF_TOPIC", "0")),
+}
+CASCADE_STAGES = ("length", "exact", "nearDuplicate", "offTopic", "semantic")
+
+# Check for the encoder backend (sentence-transformers or onnxruntime) with graceful fallback
+SENTENCE_TRANSFORMERS_AVAILABLE = backend_available()
+if not SENTENCE_TRANSFORMERS_AVAILABLE:
+    print(f"Warning: encoder backend '{DEFAULT_BACKEND}' not available")
     print("Falling back to TF-IDF similarity. To use semantic similarity, install: pip install sentence-transformers")
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
 
 
 # Global model instance to avoid reloading
 _model = None
+_model_lock = threading.Lock()
+_question_bank_store = None
+_question_bank_loaded = False
+_tfidf_model = None
+_tfidf_loaded = False
+_cascade_counts = dict.fromkeys(CASCADE_STAGES, 0)
+_cascade_lock = threading.Lock()
 
 
 def get_sentence_transformer_model():
     """
     Load and return the sentence transformer model.
     Uses a lightweight model that provides good performance for semantic similarity.
+
+    Unless PLACIFY_ENCODE_QUEUE=0, the model is wrapped in a BatchingEncoder so
+    concurrent threads share forward passes; ``stats()`` on it reports queue
+    depth and batch sizes.
     """
     global _model
     if not SENTENCE_TRANSFORMERS_AVAILABLE:
         raise ImportError("sentence-transformers library not available")
     
     if _model is None:
-        try:
-            # Using all-MiniLM-L6-v2: lightweight, fast, and accurate for semantic similarity
-            _model = SentenceTransformer('all-MiniLM-L6-v2')
-        except Exception as e:
-            print(f"Error loading sentence transformer model: {e}")
-            raise
+        with _model_lock:
+            if _model is None:
+                try:
+                    # Using all-MiniLM-L6-v2: lightweight, fast, and accurate for semantic similarity
+                    model = load_encoder(MODEL_NAME)
+                except Exception as e:
+                    print(f"Error loading sentence transformer model: {e}")
+                    raise
+                _model = BatchingEncoder(model) if ENCODE_QUEUE_ENABLED else model
     return _model
 
 
-def evaluate_answer_semantic(user_answer, ideal_answer):
+def get_question_bank_store():
+    """
+    Load the precomputed ideal-answer embeddings once, if PLACIFY_QUESTION_BANK_DIR is set.
+
+    Returns:
+        QuestionBankStore or None: The store, or None if unset or unreadable
+    """
+    global _question_bank_store, _question_bank_loaded
+    if not _question_bank_loaded:
+        _question_bank_loaded = True
+        if QUESTION_BANK_DIR:
+            try:
+                _question_bank_store = QuestionBankStore(QUESTION_BANK_DIR, MODEL_NAME, DEFAULT_BACKEND)
+            except (OSError, ValueError) as e:
+                print(f"Warning: question bank store not loaded: {e}")
+    return _question_bank_store
+
+
+def get_tfidf_model():
+    """
+    Load the corpus-fitted TF-IDF vectorizer once, if PLACIFY_TFIDF_MODEL is set.
+
+    Returns:
+        TfidfVectorizer or None: The fitted vectorizer, or None if unset, unreadable
+        or not a fitted vectorizer (callers then fit per call)
+    """
+    global _tfidf_model, _tfidf_loaded
+    if not _tfidf_loaded:
+        _tfidf_loaded = True
+        if TFIDF_MODEL_PATH:
+            try:
+                _tfidf_model = load_tfidf(TFIDF_MODEL_PATH)
+            except Exception as e:
+                # A truncated or foreign pickle can fail in many ways; fit per call instead
+                print(f"Warning: TF-IDF model not loaded ({type(e).__name__}): {e}")
+    return _tfidf_model
+
+
+def _stored_ideal_embedding(question_id, ideal_answer):
+    """
+    Stored embedding for ``question_id`` if it was built from this ideal answer.
+    """
+    if question_id is None:
+        return None
+    store = get_question_bank_store()
+    if store is None:
+        return None
+    return store.get(question_id, ideal_answer)
+
+
+def evaluate_answer_semantic(user_answer, ideal_answer, question_id=None):
     """
     Evaluate answer similarity using semantic understanding with sentence transformers.
     
     Args:
         user_answer (str): The user's response
         ideal_answer (str): The correct/ideal answer
+        question_id (str, optional): Question bank id; when its ideal answer is in
+            the precomputed store only the user's answer is encoded
         
     Returns:
         float: Similarity score between 0 and 1, where 1 indicates perfect semantic match
@@ -55,7 +157,14 @@ def evaluate_answer_semantic(user_answer, ideal_answer):
     
     try:
         model = get_sentence_transformer_model()
-        
+
+        ideal_embedding = _stored_ideal_embedding(question_id, ideal_answer)
+        if ideal_embedding is not None:
+            user_embedding = get_question_bank_store().codec.project(
+                model.encode([user_answer], convert_to_numpy=True, normalize_embeddings=True)
+            )[0]
+            return max(0.0, min(1.0, float(np.dot(user_embedding, ideal_embedding))))
+
         # Generate embeddings for both answers
         embeddings = model.encode([user_answer, ideal_answer])
         
@@ -84,6 +193,9 @@ def evaluate_answer_tfidf(user_answer, ideal_answer):
     """
     if not user_answer.strip() or not ideal_answer.strip():
         return 0.0
+
+    if get_tfidf_model() is not None:
+        return evaluate_answers_tfidf([(user_answer, ideal_answer)])[0]
         
     try:
         vectorizer = TfidfVectorizer()
@@ -94,7 +206,7 @@ def evaluate_answer_tfidf(user_answer, ideal_answer):
         return 0.0
 
 
-def evaluate_answer(user_answer, ideal_answer, use_semantic=True):
+def evaluate_answer(user_answer, ideal_answer, use_semantic=True, question_id=None, cascade=None):
     """
     Main function to evaluate answer similarity.
     
@@ -102,11 +214,264 @@ def evaluate_answer(user_answer, ideal_answer, use_semantic=True):
         user_answer (str): The user's response
         ideal_answer (str): The correct/ideal answer
         use_semantic (bool): Whether to use semantic similarity (default: True)
+        question_id (str, optional): Question bank id for the precomputed store
+        cascade (bool, optional): Settle clear cases with cheap checks first
+            (default: PLACIFY_EVAL_CASCADE)
         
     Returns:
         float: Similarity score between 0 and 1
     """
     if use_semantic and SENTENCE_TRANSFORMERS_AVAILABLE:
-        return evaluate_answer_semantic(user_answer, ideal_answer)
+        if CASCADE_ENABLED if cascade is None else cascade:
+            return evaluate_answer_cascade(user_answer, ideal_answer, question_id=question_id)
+        return evaluate_answer_semantic(user_answer, ideal_answer, question_id=question_id)
     else:
         return evaluate_answer_tfidf(user_answer, ideal_answer)
+
+
+def _unique_texts(pairs):
+    """
+    Collect the distinct texts in ``pairs`` and map each pair to their positions.
+
+    Returns:
+        tuple: (unique_texts, user_indices, ideal_indices)
+    """
+    positions = {}
+    unique_texts = []
+    user_indices = []
+    ideal_indices = []
+    for user_answer, ideal_answer in pairs:
+        for text, indices in ((user_answer, user_indices), (ideal_answer, ideal_indices)):
+            if text not in positions:
+                positions[text] = len(unique_texts)
+                unique_texts.append(text)
+            indices.append(positions[text])
+    return unique_texts, np.array(user_indices, dtype=np.int64), np.array(ideal_indices, dtype=np.int64)
+
+
+def evaluate_answers_semantic(pairs, batch_size=64, question_ids=None):
+    """
+    Evaluate many answer pairs with batched sentence-transformer encoding.
+
+    Args:
+        pairs (list): (user_answer, ideal_answer) tuples
+        batch_size (int): Sentences per forward pass
+        question_ids (list, optional): Question bank id per pair (or None);
+            ideal answers found in the precomputed store are not re-encoded
+
+    Returns:
+        list: Similarity scores between 0 and 1, in input order
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+
+    scores = np.zeros(len(pairs), dtype=np.float64)
+    valid = [i for i, (u, ideal) in enumerate(pairs) if u.strip() and ideal.strip()]
+    if not valid:
+        return scores.tolist()
+
+    model = get_sentence_transformer_model()
+    stored = [
+        _stored_ideal_embedding(question_ids[i] if question_ids else None, pairs[i][1])
+        for i in valid
+    ]
+    # Stored ideals stand in for their own text, so only user answers and
+    # unknown ideals reach the encoder
+    encode_pairs = [
+        (pairs[i][0], pairs[i][0] if vector is not None else pairs[i][1])
+        for i, vector in zip(valid, stored)
+    ]
+    texts, user_idx, ideal_idx = _unique_texts(encode_pairs)
+    embeddings = model.encode(
+        texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+    )
+    if any(vector is not None for vector in stored):
+        # Compare in the store's (possibly PCA-reduced) space
+        embeddings = get_question_bank_store().codec.project(embeddings)
+    ideal_embeddings = embeddings[ideal_idx]
+    for row, vector in enumerate(stored):
+        if vector is not None:
+            ideal_embeddings[row] = vector
+    # Row-wise dot product of unit vectors is the cosine similarity of each pair
+    similarities = np.einsum("ij,ij->i", embeddings[user_idx], ideal_embeddings)
+    scores[valid] = np.clip(similarities, 0.0, 1.0)
+    return scores.tolist()
+
+
+def evaluate_answers_tfidf(pairs):
+    """
+    Evaluate many answer pairs with TF-IDF.
+
+    With the corpus-fitted model from PLACIFY_TFIDF_MODEL all texts are
+    transformed at once and scored with row-wise sparse dot products. Without
+    it each pair is fitted on its own two texts, exactly as
+    evaluate_answer_tfidf does, so a score never depends on the other pairs
+    in the batch.
+
+    Args:
+        pairs (list): (user_answer, ideal_answer) tuples
+
+    Returns:
+        list: Similarity scores between 0 and 1, in input order
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+
+    vectorizer = get_tfidf_model()
+    if vectorizer is None:
+        return [evaluate_answer_tfidf(user_answer, ideal_answer) for user_answer, ideal_answer in pairs]
+
+    scores = np.zeros(len(pairs), dtype=np.float64)
+    valid = [i for i, (u, ideal) in enumerate(pairs) if u.strip() and ideal.strip()]
+    if not valid:
+        return scores.tolist()
+
+    try:
+        texts, user_idx, ideal_idx = _unique_texts([pairs[i] for i in valid])
+        scores[valid] = pair_similarities(vectorizer.transform(texts), user_idx, ideal_idx)
+    except Exception:
+        pass
+    return scores.tolist()
+
+
+def evaluate_answers(pairs, use_semantic=True, batch_size=64, question_ids=None, cascade=None):
+    """
+    Evaluate many (user_answer, ideal_answer) pairs at once.
+
+    Texts are deduplicated and encoded in batches, so grading a whole mock test
+    costs a few forward passes instead of one per question.
+
+    Args:
+        pairs (list): (user_answer, ideal_answer) tuples
+        use_semantic (bool): Whether to use semantic similarity (default: True)
+        batch_size (int): Sentences per forward pass for the semantic path
+        question_ids (list, optional): Question bank id per pair, for the precomputed store
+        cascade (bool, optional): Only send ambiguous pairs to the semantic model
+            (default: PLACIFY_EVAL_CASCADE)
+
+    Returns:
+        list: Similarity scores between 0 and 1, in input order
+    """
+    if use_semantic and SENTENCE_TRANSFORMERS_AVAILABLE:
+        if CASCADE_ENABLED if cascade is None else cascade:
+            return evaluate_answers_cascade(pairs, batch_size=batch_size, question_ids=question_ids)
+        try:
+            return evaluate_answers_semantic(pairs, batch_size=batch_size, question_ids=question_ids)
+        except Exception as e:
+            print(f"Error in batched semantic evaluation: {e}")
+    return evaluate_answers_tfidf(pairs)
+
+
+def _normalize_answer(text):
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def _count_cascade(stage, count=1):
+    with _cascade_lock:
+        _cascade_counts[stage] += count
+
+
+def _cheap_stage(user_answer, ideal_answer, tfidf_score, thresholds):
+    """
+    Decide a pair without the transformer if it is clear-cut.
+
+    Returns:
+        tuple: (stage, score) when settled, or (None, None) if it is ambiguous
+    """
+    if len(user_answer.split()) < thresholds["min_words"] or not ideal_answer.strip():
+        return "length", 0.0
+    if _normalize_answer(user_answer) == _normalize_answer(ideal_answer):
+        return "exact", 1.0
+    if tfidf_score >= thresholds["near_duplicate"]:
+        return "nearDuplicate", tfidf_score
+    if tfidf_score < thresholds["off_topic"]:
+        return "offTopic", tfidf_score
+    return None, None
+
+
+def evaluate_answer_cascade(user_answer, ideal_answer, question_id=None, thresholds=None):
+    """
+    Score an answer cheap-first: length, normalized exact match and TF-IDF
+    checks settle clear cases; only ambiguous answers are encoded.
+
+    Args:
+        user_answer (str): The user's response
+        ideal_answer (str): The correct/ideal answer
+        question_id (str, optional): Question bank id for the precomputed store
+        thresholds (dict, optional): Overrides for CASCADE_THRESHOLDS
+
+    Returns:
+        float: Similarity score between 0 and 1
+    """
+    thresholds = {**CASCADE_THRESHOLDS, **(thresholds or {})}
+    stage, score = _cheap_stage(
+        user_answer, ideal_answer, evaluate_answer_tfidf(user_answer, ideal_answer), thresholds
+    )
+    if stage is None:
+        stage, score = "semantic", evaluate_answer_semantic(user_answer, ideal_answer, question_id=question_id)
+    _count_cascade(stage)
+    return score
+
+
+def evaluate_answers_cascade(pairs, batch_size=64, question_ids=None, thresholds=None):
+    """
+    Batched cascade: TF-IDF scores for every pair (as evaluate_answer_cascade
+    computes them, so each pair lands in the same stage), then one semantic
+    pass over the pairs the cheap stage could not settle.
+
+    Args:
+        pairs (list): (user_answer, ideal_answer) tuples
+        batch_size (int): Sentences per forward pass for the semantic stage
+        question_ids (list, optional): Question bank id per pair, for the precomputed store
+        thresholds (dict, optional): Overrides for CASCADE_THRESHOLDS
+
+    Returns:
+        list: Similarity scores between 0 and 1, in input order
+    """
+    pairs = list(pairs)
+    thresholds = {**CASCADE_THRESHOLDS, **(thresholds or {})}
+    scores = evaluate_answers_tfidf(pairs)
+    ambiguous = []
+    for i, (user_answer, ideal_answer) in enumerate(pairs):
+        stage, score = _cheap_stage(user_answer, ideal_answer, scores[i], thresholds)
+        if stage is None:
+            ambiguous.append(i)
+        else:
+            scores[i] = score
+            _count_cascade(stage)
+    if ambiguous:
+        try:
+            semantic = evaluate_answers_semantic(
+                [pairs[i] for i in ambiguous],
+                batch_size=batch_size,
+                question_ids=[question_ids[i] for i in ambiguous] if question_ids else None,
+            )
+            for i, score in zip(ambiguous, semantic):
+                scores[i] = score
+        except Exception as e:
+            # The TF-IDF scores already in place are the fallback
+            print(f"Error in batched semantic evaluation: {e}")
+        _count_cascade("semantic", len(ambiguous))
+    return scores
+
+
+def get_cascade_stats():
+    """
+    How many answers each cascade stage settled, and the share of traffic per stage.
+    """
+    with _cascade_lock:
+        counts = dict(_cascade_counts)
+    total = sum(counts.values())
+    return {
+        "total": total,
+        "counts": counts,
+        "fractions": {stage: round(n / total, 4) if total else 0.0 for stage, n in counts.items()},
+    }
+
+
+def reset_cascade_stats():
+    with _cascade_lock:
+        for stage in _cascade_counts:
+            _cascade_counts[stage] = 0
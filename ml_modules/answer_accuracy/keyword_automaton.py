@@ -0,0 +1,152 @@
+"""
+Multi-pattern exact matching for keyword coverage.
+
+An Aho-Corasick automaton finds every occurrence of every keyword in one pass
+over the answer, so exact coverage stays linear in the answer length however
+many keywords a question has. The C implementation from ``pyahocorasick`` is
+used when installed; otherwise a pure-Python automaton with the same output.
+The pure-Python walk costs more per character than ``str.find``, so without
+pyahocorasick short keyword lists are scanned with ``str.find`` instead.
+"""
+
+from collections import deque
+
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Without pyahocorasick, keyword lists shorter than this use str.find scans
+SCAN_KEYWORD_LIMIT = 256
+
+
+def is_word_char(char):
+    """
+    Mirrors ``\\w`` in Python's Unicode regular expressions.
+    """
+    return char.isalnum() or char == "_"
+
+
+def at_word_boundary(text, index):
+    """
+    True where ``\\b`` would match before ``text[index]``.
+    """
+    before = index > 0 and is_word_char(text[index - 1])
+    after = index < len(text) and is_word_char(text[index])
+    return before != after
+
+
+class KeywordAutomaton:
+    """
+    Compiled set of patterns. Identical patterns share one entry and report
+    every pattern id that was added with them.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        ids_by_pattern = {}
+        for pattern_id, pattern in enumerate(self.patterns):
+            if pattern:
+                ids_by_pattern.setdefault(pattern, []).append(pattern_id)
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, ids in ids_by_pattern.items():
+                self._automaton.add_word(pattern, (len(pattern), tuple(ids)))
+            if ids_by_pattern:
+                self._automaton.make_automaton()
+            else:
+                self._automaton = None
+        else:
+            self._build(ids_by_pattern)
+
+    def _build(self, ids_by_pattern):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for pattern, ids in ids_by_pattern.items():
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(pattern), tuple(ids)))
+
+        # Breadth-first failure links; each state inherits its suffix's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text):
+        """
+        Yield ``(start, end, pattern_ids)`` for every occurrence, ``end`` exclusive.
+        """
+        if AHOCORASICK_AVAILABLE:
+            if self._automaton is None:
+                return
+            for last, (length, ids) in self._automaton.iter(text):
+                yield last + 1 - length, last + 1, ids
+            return
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, ids in output[state]:
+                yield index + 1 - length, index + 1, ids
+
+    def _scan(self, text, whole_words):
+        found = set()
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            start = text.find(pattern)
+            while start != -1:
+                end = start + len(pattern)
+                if not whole_words or (at_word_boundary(text, start) and at_word_boundary(text, end)):
+                    found.add(pattern_id)
+                    break
+                start = text.find(pattern, start + 1)
+        return found
+
+    def find(self, text, whole_words=False):
+        """
+        Ids of the patterns that occur in ``text``.
+
+        Args:
+            text (str): Text to scan, already case-folded like the patterns
+            whole_words (bool): Only count occurrences with ``\\b`` on both sides,
+                as ``re.search(r"\\b" + re.escape(pattern) + r"\\b", text)`` would
+
+        Returns:
+            set: Matched pattern ids
+        """
+        if not AHOCORASICK_AVAILABLE and len(self.patterns) < SCAN_KEYWORD_LIMIT:
+            return self._scan(text, whole_words)
+        found = set()
+        remaining = sum(1 for pattern in self.patterns if pattern)
+        for start, end, ids in self.iter_matches(text):
+            if ids[0] in found:
+                continue
+            if whole_words and not (at_word_boundary(text, start) and at_word_boundary(text, end)):
+                continue
+            found.update(ids)
+            if len(found) == remaining:
+                break
+        return found
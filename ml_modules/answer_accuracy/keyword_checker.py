@@ -1,168 +1,539 @@
+import os
 import re
+import sys
+import copy
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
 from rapidfuzz import fuzz
-from rapidfuzz.process import extractOne
+from rapidfuzz.process import cdist
 
+# Sibling modules are imported flat, as evaluate.py does
+ANSWER_ACCURACY_DIR = os.path.dirname(os.path.abspath(__file__))
+if ANSWER_ACCURACY_DIR not in sys.path:
+    sys.path.append(ANSWER_ACCURACY_DIR)
 
-def keyword_coverage_score(
-    user_answer, keywords, strict=False, fuzzy=False, similarity_threshold=85
-):
+from keyword_automaton import KeywordAutomaton, at_word_boundary, is_word_char
+from phrase_matcher import PhraseMatcher, align
+
+# Compiled keyword sets kept by KeywordSet.for_question
+QUESTION_CACHE_SIZE = int(os.environ.get("PLACIFY_KEYWORD_SET_CACHE_SIZE", "1024"))
+# Threads for the fuzzy score matrix (rapidfuzz cdist); -1 uses every core
+FUZZY_WORKERS = int(os.environ.get("PLACIFY_KEYWORD_FUZZY_WORKERS", "1"))
+
+
+class KeywordSet:
     """
-    Calculate the keyword coverage score for a user answer with optional fuzzy matching.
+    A question's keyword list compiled once for a matching mode.
 
-    Args:
-        user_answer (str): The user's answer text
-        keywords (list): List of keywords to check for
-        strict (bool, optional): If True, only match whole words. Defaults to False.
-        fuzzy (bool, optional): If True, use fuzzy string matching. Defaults to False.
-        similarity_threshold (int, optional): Minimum similarity score for fuzzy matching (0-100). Defaults to 85.
+    Lowercased forms, word splits and the exact-match automaton are built at
+    compile time, so scoring an answer only does answer-dependent work.
 
-    Returns:
-        dict: Dictionary containing matched_keywords, total_keywords, coverage_score, and match details
+    Fuzzy modes tokenize the answer once and score every keyword word against
+    every distinct answer token in one ``cdist`` matrix; the best column per
+    row is what ``extractOne`` would have returned (first best token).
+    Non-strict fuzzy phrase scores come from a ``PhraseMatcher``, which only
+    aligns keywords against the parts of the answer that can reach the
+    threshold and reports where the phrase matched (``matched_span``).
+
+    Example:
+        keyword_set = KeywordSet.compile(["python", "rest api"], fuzzy=True)
+        result = keyword_set.score(user_answer)
     """
-    user_answer = user_answer.lower()
-    match_count = 0
-    matched_keywords = []
-    match_details = []
 
-    for keyword in keywords:
-        keyword_lower = keyword.lower()
-        found_match = False
-        match_info = {
-            "keyword": keyword,
-            "matched": False,
-            "match_type": None,
-            "similarity_score": 0,
-            "matched_text": None,
+    _question_cache = OrderedDict()
+    _question_lock = threading.Lock()
+
+    def __init__(self, keywords, strict=False, fuzzy=False, similarity_threshold=85,
+                 workers=FUZZY_WORKERS):
+        self.keywords = list(keywords)
+        self.strict = strict
+        self.fuzzy = fuzzy
+        self.similarity_threshold = similarity_threshold
+        self.workers = workers
+        self.lowered = [keyword.lower() for keyword in self.keywords]
+        self.words = [keyword_lower.split() for keyword_lower in self.lowered]
+        self.automaton = None if fuzzy else KeywordAutomaton(self.lowered)
+        # Empty keywords never enter the automaton
+        self.empty_keywords = {index for index, keyword_lower in enumerate(self.lowered) if not keyword_lower}
+        self.phrase_matcher = PhraseMatcher(self.lowered) if fuzzy and not strict else None
+
+        # Fuzzy queries: the whole keyword when it is one word, else each word.
+        # Distinct queries become rows of the score matrix.
+        self.queries = []
+        self.query_rows = []
+        rows = {}
+        for keyword_lower, keyword_words in zip(self.lowered, self.words):
+            queries = [keyword_lower] if len(keyword_words) == 1 else keyword_words
+            for query in queries:
+                if query not in rows:
+                    rows[query] = len(self.queries)
+                    self.queries.append(query)
+            self.query_rows.append([rows[query] for query in queries])
+        self.scorer = fuzz.ratio if strict else fuzz.partial_ratio
+
+    @classmethod
+    def compile(cls, keywords, strict=False, fuzzy=False, similarity_threshold=85, workers=FUZZY_WORKERS):
+        """
+        Compiled set for ``keywords``; identical lists and options share one instance.
+        """
+        return _compile_keyword_set(tuple(keywords), strict, fuzzy, similarity_threshold, workers)
+
+    @classmethod
+    def for_question(cls, question_id, keywords, strict=False, fuzzy=False, similarity_threshold=85,
+                     workers=FUZZY_WORKERS):
+        """
+        Compiled set cached under ``question_id``; recompiled if the question's
+        keywords or options change.
+        """
+        signature = (tuple(keywords), strict, fuzzy, similarity_threshold, workers)
+        with cls._question_lock:
+            cached = cls._question_cache.get(question_id)
+            if cached is not None and cached[0] == signature:
+                cls._question_cache.move_to_end(question_id)
+                return cached[1]
+        keyword_set = cls(*signature)
+        with cls._question_lock:
+            cls._question_cache[question_id] = (signature, keyword_set)
+            cls._question_cache.move_to_end(question_id)
+            while len(cls._question_cache) > QUESTION_CACHE_SIZE:
+                cls._question_cache.popitem(last=False)
+        return keyword_set
+
+    def score(self, user_answer):
+        """
+        Calculate the keyword coverage score for one answer.
+
+        Args:
+            user_answer (str): The user's answer text
+
+        Returns:
+            dict: Dictionary containing matched_keywords, total_keywords, coverage_score, and match details
+        """
+        user_answer = user_answer.lower()
+        if self.fuzzy:
+            phrase_matches, best_matches = self._fuzzy_matches(user_answer)
+            return self._result(phrase_matches=phrase_matches, best_matches=best_matches)
+        return self._result(exact_matches=self._exact_matches(user_answer))
+
+    def _result(self, exact_matches=None, phrase_matches=None, best_matches=None):
+        """
+        Coverage result from the answer-dependent matches of ``_exact_matches``
+        (exact modes) or ``_fuzzy_matches`` (fuzzy modes).
+        """
+        match_count = 0
+        matched_keywords = []
+        match_details = []
+
+        for index, keyword in enumerate(self.keywords):
+            match_info = {
+                "keyword": keyword,
+                "matched": False,
+                "match_type": None,
+                "similarity_score": 0,
+                "matched_text": None,
+            }
+            if self.fuzzy:
+                found_match = self._match_fuzzy(index, phrase_matches, best_matches, match_info)
+            else:
+                found_match = self._match_exact(index, exact_matches, match_info)
+
+            if found_match:
+                match_count += 1
+                matched_keywords.append(keyword)
+
+            match_details.append(match_info)
+
+        score = match_count / len(self.keywords) if self.keywords else 0
+        return {
+            "matched_keywords": match_count,
+            "total_keywords": len(self.keywords),
+            "coverage_score": round(score, 2),
+            "matched_keyword_list": matched_keywords,
+            "match_details": match_details,
         }
 
-        if fuzzy:
-            # Fuzzy matching approach
-            if strict:
-                # For strict fuzzy matching, extract words from the answer and compare each
-                words = re.findall(r"\b\w+\b", user_answer)
-                # For multi-word keywords, split and check each word
-                keyword_words = keyword_lower.split()
-
-                if len(keyword_words) == 1:
-                    # Single word keyword
-                    best_match = extractOne(keyword_lower, words, scorer=fuzz.ratio)
+    def score_many(self, answers):
+        """
+        Score several answers against the same compiled keywords.
+
+        Returns:
+            list: One result dict per answer, in input order
+        """
+        return [self.score(answer) for answer in answers]
+
+    def _exact_matches(self, user_answer):
+        """
+        Ids of the keywords that occur exactly in the (lowercased) answer.
+        """
+        # One pass over the answer finds every exact keyword occurrence
+        exact_matches = self.automaton.find(user_answer, whole_words=self.strict)
+        # Empty keywords keep the old semantics: always found, or wherever r"\b\b" matches
+        if self.empty_keywords and (not self.strict or re.search(r"\b\b", user_answer)):
+            exact_matches.update(self.empty_keywords)
+        return exact_matches
+
+    def _fuzzy_matches(self, user_answer):
+        """
+        Answer-dependent fuzzy work for every keyword at once.
+
+        Returns:
+            tuple: (phrase_matches, best_matches) where phrase_matches holds each
+                keyword's (partial ratio, span) against the whole answer (None in
+                strict mode; the ratio is 0 below the threshold) and best_matches
+                the best (token, score) per query row, None for rows no keyword needs
+        """
+        # Tokenized once per answer, shared by every keyword
+        tokens = list(dict.fromkeys(re.findall(r"\b\w+\b", user_answer)))
+        best_matches = [None] * len(self.queries)
+        if self.strict:
+            # Scores under the threshold never count, so cdist may zero them
+            self._fill_best_matches(best_matches, tokens, range(len(self.queries)), self.similarity_threshold)
+            return None, best_matches
+
+        threshold = self.similarity_threshold
+        text_index = self.phrase_matcher.index(user_answer)
+        phrase_matches = [
+            self.phrase_matcher.best_match(text_index, index, threshold) for index in range(len(self.lowered))
+        ]
+        display_rows, token_rows = set(), set()
+        for index, (similarity, _) in enumerate(phrase_matches):
+            if len(self.words[index]) == 1:
+                if similarity >= threshold:
+                    display_rows.update(self.query_rows[index])
+            elif similarity < threshold:
+                token_rows.update(self.query_rows[index])
+        # Display rows need the true best token even below the threshold
+        self._fill_best_matches(best_matches, tokens, sorted(display_rows), None)
+        self._fill_best_matches(best_matches, tokens, sorted(token_rows - display_rows), threshold - 10)
+        return phrase_matches, best_matches
+
+    def _fill_best_matches(self, best_matches, tokens, rows, score_cutoff):
+        """
+        Score query ``rows`` against every distinct token in one cdist call.
+        """
+        rows = list(rows)
+        if not tokens or not rows:
+            return
+        scores = cdist(
+            [self.queries[row] for row in rows],
+            tokens,
+            scorer=self.scorer,
+            dtype=np.float64,
+            workers=self.workers,
+            score_cutoff=score_cutoff if score_cutoff and score_cutoff > 0 else None,
+        )
+        # argmax picks the first best column, matching extractOne's tie-breaking
+        for i, (row, column) in enumerate(zip(rows, scores.argmax(axis=1))):
+            best_matches[row] = (tokens[column], float(scores[i, column]))
+
+    def _match_exact(self, index, exact_matches, match_info):
+        keyword_lower = self.lowered[index]
+        found_match = index in exact_matches
+        if found_match:
+            match_info["matched"] = True
+            match_info["match_type"] = "exact_strict" if self.strict else "exact_substring"
+            match_info["similarity_score"] = 100
+            match_info["matched_text"] = keyword_lower
+        return found_match
+
+    def _match_fuzzy(self, index, phrase_matches, best_matches, match_info):
+        keyword_lower = self.lowered[index]
+        keyword_words = self.words[index]
+        keyword_best = [best_matches[row] for row in self.query_rows[index]]
+        similarity_threshold = self.similarity_threshold
+        found_match = False
+
+        if self.strict:
+            # For strict fuzzy matching, compare against each word of the answer
+            if len(keyword_words) == 1:
+                # Single word keyword
+                best_match = keyword_best[0]
+                if best_match and best_match[1] >= similarity_threshold:
+                    found_match = True
+                    match_info["matched"] = True
+                    match_info["match_type"] = "fuzzy_strict"
+                    match_info["similarity_score"] = best_match[1]
+                    match_info["matched_text"] = best_match[0]
+            else:
+                # Multi-word keyword - check if all words have good matches
+                word_matches = []
+                for kw, best_match in zip(keyword_words, keyword_best):
                     if best_match and best_match[1] >= similarity_threshold:
-                        found_match = True
-                        match_info["matched"] = True
-                        match_info["match_type"] = "fuzzy_strict"
-                        match_info["similarity_score"] = best_match[1]
+                        word_matches.append((kw, best_match))
+
+                if len(word_matches) == len(keyword_words):
+                    found_match = True
+                    match_info["matched"] = True
+                    match_info["match_type"] = "fuzzy_strict_multiword"
+                    # Average the similarity scores
+                    avg_score = sum(match[1][1] for match in word_matches) / len(
+                        word_matches
+                    )
+                    match_info["similarity_score"] = avg_score
+                    match_info["matched_text"] = ", ".join(
+                        [match[1][0] for match in word_matches]
+                    )
+        else:
+            # For non-strict fuzzy matching, use different strategies based on keyword length
+            if len(keyword_words) == 1:
+                # Single word - use partial ratio against the whole text
+                similarity, span = phrase_matches[index]
+                if similarity >= similarity_threshold:
+                    found_match = True
+                    match_info["matched"] = True
+                    match_info["match_type"] = "fuzzy_partial"
+                    match_info["similarity_score"] = similarity
+                    match_info["matched_span"] = span
+
+                    # Find the best matching word for display
+                    best_match = keyword_best[0]
+                    if best_match:
                         match_info["matched_text"] = best_match[0]
+            else:
+                # Multi-word keyword - check against phrases in the text
+                # Also try word-by-word matching with partial ratio
+                similarity, span = phrase_matches[index]
+                if similarity >= similarity_threshold:
+                    found_match = True
+                    match_info["matched"] = True
+                    match_info["match_type"] = "fuzzy_partial_phrase"
+                    match_info["similarity_score"] = similarity
+                    match_info["matched_span"] = span
+                    match_info["matched_text"] = (
+                        keyword_lower  # Indicate it was found as a phrase
+                    )
                 else:
-                    # Multi-word keyword - check if all words have good matches
+                    # Try token-based matching for multi-word keywords
                     word_matches = []
-                    for kw in keyword_words:
-                        best_match = extractOne(kw, words, scorer=fuzz.ratio)
-                        if best_match and best_match[1] >= similarity_threshold:
+
+                    for kw, best_match in zip(keyword_words, keyword_best):
+                        if (
+                            best_match
+                            and best_match[1] >= similarity_threshold - 10
+                        ):  # Slightly lower threshold for individual words
                             word_matches.append((kw, best_match))
 
-                    if len(word_matches) == len(keyword_words):
+                    # If we match most of the words, consider it a match
+                    if (
+                        len(word_matches) >= len(keyword_words) * 0.7
+                    ):  # At least 70% of words matched
                         found_match = True
                         match_info["matched"] = True
-                        match_info["match_type"] = "fuzzy_strict_multiword"
-                        # Average the similarity scores
-                        avg_score = sum(match[1][1] for match in word_matches) / len(
-                            word_matches
-                        )
+                        match_info["match_type"] = "fuzzy_partial_tokens"
+                        avg_score = sum(
+                            match[1][1] for match in word_matches
+                        ) / len(word_matches)
                         match_info["similarity_score"] = avg_score
                         match_info["matched_text"] = ", ".join(
                             [match[1][0] for match in word_matches]
                         )
-            else:
-                # For non-strict fuzzy matching, use different strategies based on keyword length
-                if len(keyword_lower.split()) == 1:
-                    # Single word - use partial ratio against the whole text
-                    similarity = fuzz.partial_ratio(keyword_lower, user_answer)
-                    if similarity >= similarity_threshold:
-                        found_match = True
-                        match_info["matched"] = True
-                        match_info["match_type"] = "fuzzy_partial"
-                        match_info["similarity_score"] = similarity
+        return found_match
 
-                        # Find the best matching word for display
-                        words = re.findall(r"\b\w+\b", user_answer)
-                        best_match = extractOne(
-                            keyword_lower, words, scorer=fuzz.partial_ratio
-                        )
-                        if best_match:
-                            match_info["matched_text"] = best_match[0]
-                else:
-                    # Multi-word keyword - check against phrases in the text
-                    # Also try word-by-word matching with partial ratio
-                    similarity = fuzz.partial_ratio(keyword_lower, user_answer)
-                    if similarity >= similarity_threshold:
-                        found_match = True
-                        match_info["matched"] = True
-                        match_info["match_type"] = "fuzzy_partial_phrase"
-                        match_info["similarity_score"] = similarity
-                        match_info["matched_text"] = (
-                            keyword_lower  # Indicate it was found as a phrase
-                        )
-                    else:
-                        # Try token-based matching for multi-word keywords
-                        keyword_words = keyword_lower.split()
-                        words = re.findall(r"\b\w+\b", user_answer)
-                        word_matches = []
-
-                        for kw in keyword_words:
-                            best_match = extractOne(
-                                kw, words, scorer=fuzz.partial_ratio
-                            )
-                            if (
-                                best_match
-                                and best_match[1] >= similarity_threshold - 10
-                            ):  # Slightly lower threshold for individual words
-                                word_matches.append((kw, best_match))
-
-                        # If we match most of the words, consider it a match
-                        if (
-                            len(word_matches) >= len(keyword_words) * 0.7
-                        ):  # At least 70% of words matched
-                            found_match = True
-                            match_info["matched"] = True
-                            match_info["match_type"] = "fuzzy_partial_tokens"
-                            avg_score = sum(
-                                match[1][1] for match in word_matches
-                            ) / len(word_matches)
-                            match_info["similarity_score"] = avg_score
-                            match_info["matched_text"] = ", ".join(
-                                [match[1][0] for match in word_matches]
-                            )
+
+@lru_cache(maxsize=256)
+def _compile_keyword_set(keywords, strict, fuzzy, similarity_threshold, workers):
+    return KeywordSet(keywords, strict, fuzzy, similarity_threshold, workers)
+
+
+def keyword_coverage_score(
+    user_answer, keywords, strict=False, fuzzy=False, similarity_threshold=85
+):
+    """
+    Calculate the keyword coverage score for a user answer with optional fuzzy matching.
+
+    Args:
+        user_answer (str): The user's answer text
+        keywords (list): List of keywords to check for
+        strict (bool, optional): If True, only match whole words. Defaults to False.
+        fuzzy (bool, optional): If True, use fuzzy string matching. Defaults to False.
+        similarity_threshold (int, optional): Minimum similarity score for fuzzy matching (0-100). Defaults to 85.
+
+    Returns:
+        dict: Dictionary containing matched_keywords, total_keywords, coverage_score, and match details
+    """
+    return KeywordSet.compile(keywords, strict, fuzzy, similarity_threshold).score(user_answer)
+
+
+class KeywordCoverageTracker:
+    """
+    Keyword coverage of a transcript that arrives in pieces, e.g. live speech
+    to text during a mock interview.
+
+    ``update`` matches only the new text plus a short overlap with what came
+    before (twice the longest keyword), so each update costs time proportional
+    to the delta rather than to the transcript. Keywords found once stay
+    found. Matches touching the end of the transcript, where a word or phrase
+    may still be growing, count towards the current result but are checked
+    again on the next update.
+
+    The current result is what ``keyword_coverage_score`` returns for the whole
+    transcript so far, except that deltas are lowercased one at a time and
+    fuzzy phrase keywords longer than 64 characters are only matched within
+    the overlap window.
+
+    Example:
+        tracker = KeywordCoverageTracker(["python", "rest api"], fuzzy=True)
+        for phrase in transcript_stream:
+            result = tracker.update(phrase)
+            print(result["coverage_score"])
+    """
+
+    def __init__(self, keywords, strict=False, fuzzy=False, similarity_threshold=85, question_id=None):
+        if question_id is None:
+            self.keyword_set = KeywordSet.compile(keywords, strict, fuzzy, similarity_threshold)
         else:
-            # Original exact matching approach
-            if strict:
-                # Create a pattern that matches the whole word only
-                pattern = r"\b" + re.escape(keyword_lower) + r"\b"
-                if re.search(pattern, user_answer):
-                    found_match = True
-                    match_info["matched"] = True
-                    match_info["match_type"] = "exact_strict"
-                    match_info["similarity_score"] = 100
-                    match_info["matched_text"] = keyword_lower
-            else:
-                # Original behavior - substring matching
-                if keyword_lower in user_answer:
-                    found_match = True
-                    match_info["matched"] = True
-                    match_info["match_type"] = "exact_substring"
-                    match_info["similarity_score"] = 100
-                    match_info["matched_text"] = keyword_lower
+            self.keyword_set = KeywordSet.for_question(question_id, keywords, strict, fuzzy, similarity_threshold)
+        keyword_set = self.keyword_set
+        self.length = 0
+        self._tail = ""
+        self._context = 2 * max((len(keyword_lower) for keyword_lower in keyword_set.lowered), default=0) + 2
 
-        if found_match:
-            match_count += 1
-            matched_keywords.append(keyword)
-
-        match_details.append(match_info)
-
-    score = match_count / len(keywords) if keywords else 0
-    return {
-        "matched_keywords": match_count,
-        "total_keywords": len(keywords),
-        "coverage_score": round(score, 2),
-        "matched_keyword_list": matched_keywords,
-        "match_details": match_details,
-    }
+        # Exact modes: committed keyword ids and those only found at the end
+        self._found = set() if strict else set(keyword_set.empty_keywords)
+        self._trailing = set()
+        # Fuzzy modes: best (token, score) per query row over complete tokens,
+        # and the word still being spoken at the end of the transcript
+        self._seen_tokens = set()
+        self._best = [None] * len(keyword_set.queries)
+        self._partial_token = ""
+        # Non-strict fuzzy: best (score, span) per keyword over settled windows
+        self._phrases = [(0, None)] * len(keyword_set.keywords)
+        self._trailing_phrases = [(0, None)] * len(keyword_set.keywords)
+        self._current = keyword_set.score("")
+
+    @property
+    def coverage_score(self):
+        return self._current["coverage_score"]
+
+    @property
+    def match_details(self):
+        return copy.deepcopy(self._current["match_details"])
+
+    def result(self):
+        """
+        Current coverage result, shaped like ``keyword_coverage_score``'s.
+        The caller gets its own copy and may change it freely.
+        """
+        return copy.deepcopy(self._current)
+
+    def update(self, delta):
+        """
+        Add the next piece of the transcript.
+
+        Args:
+            delta (str): Text appended to the transcript, including any spacing
+
+        Returns:
+            dict: A copy of the coverage result for the whole transcript so far
+        """
+        delta = delta.lower()
+        if not delta:
+            return self.result()
+        keyword_set = self.keyword_set
+        # text starts at transcript offset self.length - len(self._tail)
+        text = self._tail + delta
+        offset = self.length - len(self._tail)
+        previous_end = len(self._tail)
+        self.length += len(delta)
+
+        if not keyword_set.fuzzy:
+            self._update_exact(text, previous_end)
+            current = keyword_set._result(exact_matches=self._found | self._trailing)
+        else:
+            best_matches = self._update_tokens(delta)
+            phrase_matches = None
+            if not keyword_set.strict:
+                self._update_phrases(text, offset)
+                phrase_matches = [
+                    trailing if trailing[0] > settled[0] else settled
+                    for settled, trailing in zip(self._phrases, self._trailing_phrases)
+                ]
+            current = keyword_set._result(phrase_matches=phrase_matches, best_matches=best_matches)
+
+        self._tail = text[-self._context:]
+        self._current = current
+        return self.result()
+
+    def _update_exact(self, text, previous_end):
+        keyword_set = self.keyword_set
+        self._trailing = set()
+        for start, end, ids in keyword_set.automaton.iter_matches(text):
+            # Occurrences ending earlier were settled by a previous update
+            if end < previous_end:
+                continue
+            if keyword_set.strict:
+                if not at_word_boundary(text, start) or not at_word_boundary(text, end):
+                    continue
+                if end == len(text):
+                    # The next delta may extend the last word
+                    self._trailing.update(ids)
+                    continue
+            self._found.update(ids)
+        if keyword_set.strict and keyword_set.empty_keywords and re.search(r"\w", text):
+            self._found.update(keyword_set.empty_keywords)
+
+    def _update_tokens(self, delta):
+        """
+        Fold the delta's complete tokens into the best match per query row.
+
+        Returns:
+            list: Best (token, score) per query row, including the trailing word
+        """
+        text = self._partial_token + delta
+        tokens = re.findall(r"\b\w+\b", text)
+        self._partial_token = tokens.pop() if tokens and is_word_char(text[-1]) else ""
+
+        new_tokens = [token for token in dict.fromkeys(tokens) if token not in self._seen_tokens]
+        self._merge_best(self._best, new_tokens)
+        self._seen_tokens.update(new_tokens)
+
+        if not self._partial_token or self._partial_token in self._seen_tokens:
+            return self._best
+        best_matches = list(self._best)
+        self._merge_best(best_matches, [self._partial_token])
+        return best_matches
+
+    def _merge_best(self, best_matches, tokens):
+        keyword_set = self.keyword_set
+        if not tokens or not keyword_set.queries:
+            return
+        scores = cdist(keyword_set.queries, tokens, scorer=keyword_set.scorer, dtype=np.float64,
+                       workers=keyword_set.workers)
+        # Earlier tokens win ties, as in a full rescore
+        for row, column in enumerate(scores.argmax(axis=1)):
+            score = float(scores[row, column])
+            if best_matches[row] is None or score > best_matches[row][1]:
+                best_matches[row] = (tokens[column], score)
+
+    def _update_phrases(self, text, offset):
+        keyword_set = self.keyword_set
+        threshold = keyword_set.similarity_threshold
+        end = self.length
+        previous_end = offset + len(self._tail)
+        for index, keyword_lower in enumerate(keyword_set.lowered):
+            length = len(keyword_lower)
+            pad = keyword_set.phrase_matcher.pads[index]
+            if end <= length:
+                # partial_ratio swaps its arguments while the transcript is the shorter string
+                self._trailing_phrases[index] = self._shift(align(keyword_lower, text, 0, len(text), threshold), offset)
+                continue
+
+            # Windows that ended in this delta are final; the right pad keeps the
+            # shorter windows at the end out, since they change as text arrives
+            start = 0 if previous_end <= length else previous_end - length + 1
+            score, span = align(keyword_lower, text, start - offset, len(text), threshold, pad, start > 0, True)
+            if score > self._phrases[index][0]:
+                self._phrases[index] = self._shift((score, span), offset)
+
+            start = max(0, end - length)
+            self._trailing_phrases[index] = self._shift(
+                align(keyword_lower, text, start - offset, len(text), threshold, pad, start > 0, False), offset
+            )
+
+    @staticmethod
+    def _shift(match, offset):
+        score, span = match
+        return score, None if span is None else (span[0] + offset, span[1] + offset)
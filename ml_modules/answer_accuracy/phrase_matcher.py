@@ -0,0 +1,202 @@
+"""
+Windowed fuzzy phrase matching for keyword coverage.
+
+``fuzz.partial_ratio(phrase, answer)`` is the best ``fuzz.ratio`` between the
+phrase and any phrase-length window of the answer. Computing it against a
+whole interview transcript for every keyword dominates non-strict fuzzy
+coverage. ``PhraseMatcher`` gives the same scores by only running
+``partial_ratio`` on the parts of the answer that can reach the threshold:
+
+* The answer is indexed once: its character bigrams, sorted, with their
+  offsets. Every phrase looks up only its own bigrams.
+* Windows are grouped into blocks of ``block_size`` start offsets. A window
+  whose ratio reaches the threshold shares at least
+  ``(L - 1) - 3 * (L - min_lcs)`` bigrams with the phrase (each unmatched
+  character breaks at most three bigrams), so blocks whose bigram counts
+  cannot reach that bound are skipped.
+* Surviving blocks are merged into regions and scored exactly with
+  ``partial_ratio``. Inner region edges are padded with a character the
+  phrase does not contain, so a region never scores a window the whole
+  answer would not have.
+
+Decisions and scores at or above the threshold are identical to
+``partial_ratio`` on the whole answer; the matched span is reported as
+character offsets into the answer.
+"""
+
+import math
+import os
+
+import numpy as np
+from rapidfuzz import fuzz
+
+# Window start offsets per block; the prefilter keeps or skips whole blocks
+BLOCK_SIZE = 32
+# rapidfuzz aligns needles longer than this differently; they use the whole text
+MAX_WINDOWED_LENGTH = 64
+# Shorter answers are cheaper to score whole than to index
+MIN_WINDOWED_TEXT = int(os.environ.get("PLACIFY_PHRASE_WINDOW_MIN_CHARS", "2048"))
+PAD_CHARACTERS = "\x00\x01\x02\x03"
+
+
+def _codepoints(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+
+def _bigram_codes(codepoints):
+    return (codepoints[:-1] << 21) | codepoints[1:]
+
+
+class TextIndex:
+    """
+    Sorted character bigrams of one answer, shared by every phrase scored on it.
+    """
+
+    def __init__(self, text, block_size=BLOCK_SIZE):
+        self.text = text
+        self.block_size = block_size
+        self.blocks = max(1, math.ceil(len(text) / block_size))
+        self.windowed = len(text) >= MIN_WINDOWED_TEXT
+        if self.windowed:
+            codes = _bigram_codes(_codepoints(text))
+            self.order = np.argsort(codes, kind="stable")
+            self.sorted_codes = codes[self.order]
+
+    def block_counts(self, code):
+        """
+        Occurrences of one bigram per block of start offsets.
+        """
+        lo, hi = np.searchsorted(self.sorted_codes, [code, code + 1])
+        return np.bincount(self.order[lo:hi] // self.block_size, minlength=self.blocks)
+
+
+class PhraseMatcher:
+    """
+    Phrases compiled once; ``best_match`` scores one phrase against an indexed answer.
+
+    Example:
+        matcher = PhraseMatcher(["rest api", "machine learning"])
+        index = matcher.index(answer.lower())
+        score, span = matcher.best_match(index, 0, 85)
+    """
+
+    def __init__(self, phrases, block_size=BLOCK_SIZE):
+        self.phrases = list(phrases)
+        self.block_size = block_size
+        self.bigrams = []
+        self.pads = []
+        for phrase in self.phrases:
+            if len(phrase) > 1:
+                codes, counts = np.unique(_bigram_codes(_codepoints(phrase)), return_counts=True)
+            else:
+                codes, counts = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            self.bigrams.append((codes, counts))
+            self.pads.append(next((char for char in PAD_CHARACTERS if char not in phrase), None))
+
+    def index(self, text):
+        return TextIndex(text, self.block_size)
+
+    def best_match(self, index, phrase_id, threshold):
+        """
+        Best alignment of one phrase in the indexed answer.
+
+        Args:
+            index (TextIndex): The answer, from ``index``
+            phrase_id (int): Position of the phrase in ``phrases``
+            threshold (float): Scores below this are not needed
+
+        Returns:
+            tuple: (score, (start, end)). The score equals
+                ``fuzz.partial_ratio(phrase, text)`` whenever that reaches
+                ``threshold``; otherwise it is 0 and the span is None.
+        """
+        phrase = self.phrases[phrase_id]
+        text = index.text
+        length = len(phrase)
+        span_blocks = (self.block_size + length - 3) // self.block_size + 1
+        if (
+            not index.windowed
+            or length == 0
+            or length > MAX_WINDOWED_LENGTH
+            or self.pads[phrase_id] is None
+            or index.blocks <= span_blocks + 1
+        ):
+            return self._score_region(phrase, text, 0, len(text), threshold, None)
+
+        candidates = self._candidate_blocks(index, phrase_id, threshold, span_blocks)
+        best_score, best_span = 0, None
+        for start, end in self._regions(candidates, len(text), length):
+            score, span = self._score_region(phrase, text, start, end, threshold, self.pads[phrase_id])
+            if score > best_score:
+                best_score, best_span = score, span
+                if score == 100:
+                    break
+        return best_score, best_span
+
+    def match_all(self, text, threshold):
+        """
+        ``best_match`` for every phrase against one answer.
+        """
+        index = self.index(text)
+        return [self.best_match(index, phrase_id, threshold) for phrase_id in range(len(self.phrases))]
+
+    def _candidate_blocks(self, index, phrase_id, threshold, span_blocks):
+        length = len(self.phrases[phrase_id])
+        min_lcs = math.ceil(threshold * length / 100 - 1e-6)
+        required = (length - 1) - 3 * (length - min_lcs)
+        candidates = np.ones(index.blocks, dtype=bool)
+        if required > 0:
+            shared = np.zeros(index.blocks, dtype=np.int64)
+            upper = np.minimum(np.arange(index.blocks) + span_blocks, index.blocks)
+            for code, count in zip(*self.bigrams[phrase_id]):
+                cumulative = np.concatenate(([0], np.cumsum(index.block_counts(code))))
+                shared += np.minimum(count, cumulative[upper] - cumulative[:-1])
+            candidates = shared >= required
+        # Shorter windows at either end of the answer are not covered by the bound
+        candidates[0] = True
+        candidates[max(0, len(index.text) - length) // index.block_size:] = True
+        return np.flatnonzero(candidates)
+
+    def _regions(self, candidates, text_length, length):
+        """
+        Merge candidate blocks into text regions holding all their windows.
+        """
+        block_size = self.block_size
+        region_start = region_end = None
+        for block in candidates:
+            start = block * block_size
+            end = min(text_length, (block + 1) * block_size + length - 1)
+            if region_end is not None and start <= region_end:
+                region_end = max(region_end, end)
+                continue
+            if region_end is not None:
+                yield region_start, region_end
+            region_start, region_end = start, end
+        if region_end is not None:
+            yield region_start, region_end
+
+    @staticmethod
+    def _score_region(phrase, text, start, end, threshold, pad):
+        return align(phrase, text, start, end, threshold, pad, start > 0, end < len(text))
+
+
+def align(phrase, text, start, end, threshold, pad=None, pad_left=False, pad_right=False):
+    """
+    ``partial_ratio_alignment`` of ``phrase`` in ``text[start:end]``.
+
+    ``pad_left``/``pad_right`` pad that side with ``pad`` so windows running
+    past the region edge score no higher than a window of the surrounding text.
+
+    Returns:
+        tuple: (score, (start, end)) with offsets into ``text``, or (0, None)
+            when the score is below ``threshold``
+    """
+    left = pad * len(phrase) if pad and pad_left else ""
+    right = pad * len(phrase) if pad and pad_right else ""
+    alignment = fuzz.partial_ratio_alignment(phrase, left + text[start:end] + right, score_cutoff=threshold)
+    if alignment is None:
+        return 0, None
+    offset = start - len(left)
+    span_start = min(max(alignment.dest_start + offset, start), end)
+    span_end = min(max(alignment.dest_end + offset, start), end)
+    return alignment.score, (span_start, span_end)
@@ -0,0 +1,229 @@
+"""
+Precomputed ideal-answer embeddings for the question bank.
+
+Ideal answers are fixed per question, so they are embedded once offline and
+looked up at evaluation time; only the user's answer is encoded per request.
+
+Layout of a store (one sub-directory per model, so model upgrades never mix):
+    <root>/<model>/meta.json        model name, encoder backend, dimension, codec, build time
+    <root>/<model>/codec.json       embedding codec (plus components.npy for PCA)
+    <root>/<model>/embeddings.npy   (questions, dim) float32 or float16 matrix
+    <root>/<model>/index.json       question id -> {"row": int, "hash": str}
+
+Vectors are stored with an embedding_codec.EmbeddingCodec. With a PCA codec,
+user-answer embeddings must be mapped with ``store.codec.project`` before
+comparing them with stored ideal answers.
+
+Build offline:
+    python question_bank_store.py --input questions.jsonl --output stores/ --dtype float16
+    python question_bank_store.py --input questions.jsonl --output stores/ --codec codecs/pca128
+
+Each input line is a JSON object with "question_id" (or "id") and "ideal_answer".
+Set PLACIFY_QUESTION_BANK_DIR to the output root to have evaluate.py use it.
+Build with the same --backend (PLACIFY_ENCODER_BACKEND by default) that
+evaluate.py runs with; a store from another backend is refused.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+import numpy as np
+
+# The shared embedding modules live in ml_modules/, one level up
+ML_MODULES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ML_MODULES_DIR not in sys.path:
+    sys.path.append(ML_MODULES_DIR)
+
+from embedding_codec import DTYPES, EmbeddingCodec
+from encoder_backend import BACKENDS, DEFAULT_BACKEND, load_encoder
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+SUPPORTED_DTYPES = DTYPES
+# Stores written before the backend was recorded were all built with PyTorch
+LEGACY_BACKEND = "torch"
+
+
+def answer_hash(text):
+    """
+    Content hash of an ideal answer, insensitive to whitespace differences.
+    """
+    normalized = re.sub(r"\s+", " ", text or "").strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def model_directory(root, model_name):
+    return os.path.join(root, model_name.replace("/", "__"))
+
+
+class QuestionBankStore:
+    """
+    Read-side view of a built store. The embedding matrix is memory-mapped.
+    """
+
+    def __init__(self, root, model_name=DEFAULT_MODEL_NAME, backend=None):
+        backend = backend or DEFAULT_BACKEND
+        self.directory = model_directory(root, model_name)
+        with open(os.path.join(self.directory, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        if self.meta.get("model") != model_name:
+            raise ValueError(
+                f"Question bank store at {self.directory} was built with "
+                f"{self.meta.get('model')}, not {model_name}"
+            )
+        # Backends (int8 above all) give slightly different vectors for the same model
+        if self.meta.get("backend", LEGACY_BACKEND) != backend:
+            raise ValueError(
+                f"Question bank store at {self.directory} was built on the "
+                f"{self.meta.get('backend', LEGACY_BACKEND)} backend, not {backend}"
+            )
+        if os.path.exists(os.path.join(self.directory, "codec.json")):
+            self.codec = EmbeddingCodec.load(self.directory)
+        else:
+            self.codec = EmbeddingCodec(self.meta.get("dtype", "float32"))
+        # A codec from another build (e.g. caught mid-rebuild) would mis-decode the matrix
+        if "codec" in self.meta and self.meta["codec"] != self.codec.fingerprint():
+            raise ValueError(
+                f"Question bank store at {self.directory} records codec {self.meta['codec']}, "
+                f"but its codec files are {self.codec.fingerprint()}"
+            )
+        with open(os.path.join(self.directory, "index.json"), "r") as f:
+            self.index = json.load(f)
+        self.embeddings = np.load(os.path.join(self.directory, "embeddings.npy"), mmap_mode="r")
+        self.model_name = model_name
+        self.backend = backend
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, question_id, ideal_answer=None):
+        """
+        Return the unit-normalized float32 embedding (in codec space) for ``question_id``.
+
+        Args:
+            question_id (str): Question identifier
+            ideal_answer (str, optional): If given, the stored entry is only used
+                when it was built from this exact answer text
+
+        Returns:
+            numpy.ndarray or None: The embedding, or None if missing or stale
+        """
+        entry = self.index.get(str(question_id))
+        if entry is None:
+            return None
+        if ideal_answer is not None and entry["hash"] != answer_hash(ideal_answer):
+            return None
+        return self.codec.decode(self.embeddings[entry["row"]])
+
+
+def build_store(questions, root, model, model_name=DEFAULT_MODEL_NAME, dtype="float32", batch_size=256,
+                codec=None, backend=None):
+    """
+    Embed every ideal answer in bulk and write a store under ``root``.
+
+    Args:
+        questions (iterable): (question_id, ideal_answer) pairs
+        root (str): Store root directory
+        model: Encoder with a sentence-transformers style ``encode``
+        model_name (str): Model name recorded in the store (its version key)
+        dtype (str): "float32" or "float16"
+        batch_size (int): Sentences per forward pass
+        codec (EmbeddingCodec, optional): Storage codec, e.g. a fitted PCA;
+            overrides ``dtype``
+        backend (str, optional): Encoder backend ``model`` runs on, recorded in
+            the store (default: PLACIFY_ENCODER_BACKEND)
+
+    Returns:
+        str: The model directory that was written
+    """
+    codec = codec or EmbeddingCodec(dtype)
+    backend = backend or DEFAULT_BACKEND
+    ids, answers = [], []
+    for question_id, ideal_answer in questions:
+        ids.append(str(question_id))
+        answers.append(ideal_answer)
+
+    embeddings = model.encode(
+        answers, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+    )
+    embeddings = codec.encode(np.asarray(embeddings, dtype=np.float32))
+
+    directory = model_directory(root, model_name)
+    os.makedirs(directory, exist_ok=True)
+    # Write to temporary names first so readers never see a half-built store
+    codec_tmp = os.path.join(directory, "codec.tmp")
+    codec.save(codec_tmp)
+    np.save(os.path.join(directory, "embeddings.tmp.npy"), embeddings)
+    with open(os.path.join(directory, "index.tmp.json"), "w") as f:
+        json.dump(
+            {qid: {"row": row, "hash": answer_hash(answer)} for row, (qid, answer) in enumerate(zip(ids, answers))},
+            f,
+        )
+    with open(os.path.join(directory, "meta.tmp.json"), "w") as f:
+        json.dump(
+            {
+                "model": model_name,
+                "backend": backend,
+                "dim": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+                "dtype": codec.dtype,
+                "codec": codec.fingerprint(),
+                "count": len(ids),
+                "builtAt": int(time.time()),
+            },
+            f,
+        )
+    for name in ("embeddings.npy", "index.json"):
+        stem, ext = os.path.splitext(name)
+        os.replace(os.path.join(directory, f"{stem}.tmp{ext}"), os.path.join(directory, name))
+    # Codec files next, dropping the projection of an earlier PCA build; meta.json
+    # goes last and names the codec, so readers reject a store caught in between
+    components_tmp = os.path.join(codec_tmp, "components.npy")
+    components = os.path.join(directory, "components.npy")
+    if os.path.exists(components_tmp):
+        os.replace(components_tmp, components)
+    elif os.path.exists(components):
+        os.remove(components)
+    os.replace(os.path.join(codec_tmp, "codec.json"), os.path.join(directory, "codec.json"))
+    os.rmdir(codec_tmp)
+    os.replace(os.path.join(directory, "meta.tmp.json"), os.path.join(directory, "meta.json"))
+    return directory
+
+
+def read_questions(path):
+    """
+    Yield (question_id, ideal_answer) pairs from a JSONL file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield record.get("question_id", record.get("id")), record["ideal_answer"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the question-bank embedding store")
+    parser.add_argument("--input", required=True, help="JSONL file of questions")
+    parser.add_argument("--output", required=True, help="Store root directory")
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--dtype", choices=SUPPORTED_DTYPES, help="Storage dtype (default: float32, or the codec's)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--codec", help="PCA codec directory from embedding_codec.py fit")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND, help="Encoder backend")
+    args = parser.parse_args(argv)
+
+    model = load_encoder(args.model, args.backend)
+    codec = EmbeddingCodec.load(args.codec, args.dtype) if args.codec else None
+    directory = build_store(
+        read_questions(args.input), args.output, model, args.model, args.dtype or "float32", args.batch_size, codec,
+        args.backend,
+    )
+    print(f"Wrote question bank store to {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the bulk answer grading CLI.
+"""
+
+import os
+import json
+import tempfile
+
+import evaluate
+from bulk_grade import completed_count, grade_file
+
+
+def _write_answers(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps({
+                "id": f"ans-{i}",
+                "user_answer": f"A process is a program that is running ({i})",
+                "ideal_answer": "A process is an instance of a running program",
+                "keywords": ["process", "program", "memory"] if i % 2 else [],
+            }) + "\n")
+
+
+def _read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_bulk_grading_in_order_and_resumable():
+    with tempfile.TemporaryDirectory() as directory:
+        answers = os.path.join(directory, "answers.jsonl")
+        full = os.path.join(directory, "full.jsonl")
+        resumed = os.path.join(directory, "resumed.jsonl")
+        _write_answers(answers, 23)
+
+        assert grade_file(answers, full, workers=2, chunk_size=5, use_semantic=False) == 23
+        results = _read_results(full)
+        assert [r["index"] for r in results] == list(range(23))
+        assert [r["id"] for r in results] == [f"ans-{i}" for i in range(23)]
+        assert results[1]["keywordCoverage"] == 0.67 and "keywordCoverage" not in results[0]
+        assert all(0.0 <= r["score"] <= 1.0 for r in results)
+
+        # Simulate a crash mid-write: 12 full lines plus half of the 13th
+        with open(full, "rb") as f:
+            lines = f.read().splitlines(keepends=True)
+        with open(resumed, "wb") as f:
+            f.write(b"".join(lines[:12]) + lines[12][:10])
+        threads, queue_enabled = os.environ.get("OMP_NUM_THREADS"), evaluate.ENCODE_QUEUE_ENABLED
+        assert grade_file(answers, resumed, workers=1, chunk_size=5, use_semantic=False) == 13
+        assert _read_results(resumed) == results
+        # In-process grading leaves the caller's thread and queue settings alone
+        assert os.environ.get("OMP_NUM_THREADS") == threads
+        assert evaluate.ENCODE_QUEUE_ENABLED == queue_enabled
+    print("✅ Bulk grading keeps input order and resumes after a crash")
+
+
+def test_bad_records_get_error_lines():
+    with tempfile.TemporaryDirectory() as directory:
+        answers = os.path.join(directory, "answers.jsonl")
+        graded = os.path.join(directory, "graded.jsonl")
+        ideal = "A process is an instance of a running program"
+        with open(answers, "w", encoding="utf-8") as f:
+            for record in (
+                {"id": "ok", "user_answer": "A process is a running program", "ideal_answer": ideal},
+                {"id": "number", "user_answer": 42, "ideal_answer": ideal},
+                {"id": "list", "user_answer": "A process", "ideal_answer": [ideal]},
+                {"id": "keywords", "user_answer": "A process", "ideal_answer": ideal, "keywords": [1, 2]},
+                ["not", "an", "object"],
+            ):
+                f.write(json.dumps(record) + "\n")
+            f.write("{truncated\n")
+            f.write(json.dumps({"id": "last", "user_answer": "A program", "ideal_answer": ideal}) + "\n")
+
+        assert grade_file(answers, graded, workers=1, chunk_size=3, use_semantic=False) == 7
+        results = _read_results(graded)
+        assert [r["index"] for r in results] == list(range(7))
+        assert [r["id"] for r in results] == ["ok", "number", "list", "keywords", None, None, "last"]
+        assert [("error" in r) for r in results] == [False, True, True, True, True, True, False]
+        assert results[1]["error"] == "user_answer must be a string, not int"
+        assert "score" in results[0] and "score" in results[6]
+    print("✅ Records that cannot be graded get error lines and the run continues")
+
+
+def test_completed_count_truncates_to_whole_chunks():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "graded.jsonl")
+        assert completed_count(path, 4) == 0
+        for content, chunk_size, expected, kept in (
+            (b"1\n2\n3\n4\n5\n", 4, 4, b"1\n2\n3\n4\n"),
+            (b"1\n2\n3\n4\n", 2, 4, b"1\n2\n3\n4\n"),
+            (b"1\n2\n3\n4", 2, 2, b"1\n2\n"),
+            (b"1\n2", 4, 0, b""),
+        ):
+            with open(path, "wb") as f:
+                f.write(content)
+            assert completed_count(path, chunk_size) == expected
+            with open(path, "rb") as f:
+                assert f.read() == kept
+    print("✅ Resume point rounds down to a whole chunk")
+
+
+if __name__ == "__main__":
+    test_bulk_grading_in_order_and_resumable()
+    test_bad_records_get_error_lines()
+    test_completed_count_truncates_to_whole_chunks()
@@ -3,7 +3,20 @@
 Test script to verify the enhanced answer evaluation functionality.
 """
 
-from evaluate import evaluate_answer, evaluate_answer_semantic, evaluate_answer_tfidf
+import os
+import tempfile
+
+import evaluate
+from evaluate import (
+    evaluate_answer,
+    evaluate_answer_semantic,
+    evaluate_answer_tfidf,
+    evaluate_answers,
+    evaluate_answer_cascade,
+    evaluate_answers_cascade,
+    get_cascade_stats,
+    reset_cascade_stats,
+)
 
 
 def test_semantic_evaluation():
@@ -80,10 +93,185 @@ def test_backward_compatibility():
     print(f"Original function call: {original_result:.4f}")
 
 
+def test_batched_evaluation():
+    """Test that batched evaluation keeps input order and per-pair semantics."""
+    print("\nTesting Batched Evaluation")
+    print("=" * 50)
+
+    pairs = [
+        ("Python is a programming language", "Python is a programming language"),
+        ("", "Some answer"),
+        ("The sky is blue", "Machine learning algorithms"),
+        ("Python is a programming language", "Python is a programming language"),
+    ]
+
+    scores = evaluate_answers(pairs)
+    print(f"Batched scores: {[round(s, 4) for s in scores]}")
+    assert len(scores) == len(pairs)
+    assert scores[1] == 0.0
+    assert scores[0] == scores[3]
+    assert scores[0] > scores[2]
+    assert all(0.0 <= s <= 1.0 for s in scores)
+
+    tfidf_scores = evaluate_answers(pairs, use_semantic=False)
+    print(f"Batched TF-IDF scores: {[round(s, 4) for s in tfidf_scores]}")
+    assert abs(tfidf_scores[0] - 1.0) < 1e-9
+
+    # Without a corpus model each pair is scored on its own, whatever else is in the batch
+    mixed = pairs + [
+        ("Python lists are mutable sequences of values", "Python tuples are immutable sequences of values"),
+        ("Values in Python sequences can be indexed", "Python values"),
+    ]
+    batched = evaluate.evaluate_answers_tfidf(mixed)
+    assert batched == [evaluate_answer_tfidf(u, ideal) for u, ideal in mixed]
+    assert evaluate.evaluate_answers_tfidf(mixed[4:5]) == batched[4:5]
+
+
+def test_corpus_tfidf_model():
+    """Test the fallback with a saved, corpus-fitted TF-IDF model."""
+    from tfidf_model import fit_tfidf, save_tfidf
+
+    corpus = [
+        "A process is an instance of a running program",
+        "Threads share the memory of their process",
+        "TCP is connection oriented and UDP is connectionless",
+    ]
+    pairs = [
+        ("A running program instance is a process", corpus[0]),
+        ("UDP has no connection setup", corpus[2]),
+        ("", corpus[1]),
+    ]
+    saved = (evaluate.TFIDF_MODEL_PATH, evaluate._tfidf_model, evaluate._tfidf_loaded)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tfidf.joblib")
+        save_tfidf(fit_tfidf(corpus), path)
+        evaluate.TFIDF_MODEL_PATH, evaluate._tfidf_model, evaluate._tfidf_loaded = path, None, False
+        try:
+            scores = evaluate_answers(pairs, use_semantic=False)
+            single = [evaluate_answer_tfidf(u, ideal) for u, ideal in pairs]
+        finally:
+            evaluate.TFIDF_MODEL_PATH, evaluate._tfidf_model, evaluate._tfidf_loaded = saved
+    print(f"Corpus TF-IDF scores: {[round(s, 4) for s in scores]}")
+    assert scores == single
+    assert scores[0] > scores[1] > 0.0 and scores[2] == 0.0
+
+
+def test_corrupt_tfidf_model_falls_back():
+    """An unreadable or foreign TF-IDF model file falls back to the per-call fit."""
+    import joblib
+    import sklearn
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    pairs = [("A running program instance is a process", "A process is an instance of a running program")]
+    saved = (evaluate.TFIDF_MODEL_PATH, evaluate._tfidf_model, evaluate._tfidf_loaded)
+    with tempfile.TemporaryDirectory() as directory:
+        corrupt = os.path.join(directory, "corrupt.joblib")
+        with open(corrupt, "wb") as f:
+            f.write(b"\x80\x04not a pickle at all")
+        foreign = os.path.join(directory, "foreign.joblib")
+        joblib.dump(["not", "a", "model"], foreign)
+        unfitted = os.path.join(directory, "unfitted.joblib")
+        joblib.dump({"vectorizer": TfidfVectorizer(), "sklearnVersion": sklearn.__version__}, unfitted)
+        try:
+            evaluate.TFIDF_MODEL_PATH, evaluate._tfidf_model, evaluate._tfidf_loaded = None, None, False
+            expected = (evaluate_answers(pairs, use_semantic=False), evaluate_answer_tfidf(*pairs[0]))
+            for path in (corrupt, foreign, unfitted):
+                evaluate.TFIDF_MODEL_PATH, evaluate._tfidf_model, evaluate._tfidf_loaded = path, None, False
+                assert evaluate.get_tfidf_model() is None
+                assert (evaluate_answers(pairs, use_semantic=False), evaluate_answer_tfidf(*pairs[0])) == expected
+        finally:
+            evaluate.TFIDF_MODEL_PATH, evaluate._tfidf_model, evaluate._tfidf_loaded = saved
+    print("✅ Corrupt TF-IDF model files fall back to the per-call fit")
+
+
+def test_cascade_evaluation():
+    """Test that cheap cascade stages settle clear cases before the semantic model."""
+    ideal = "A process is an instance of a running program"
+    pairs = [
+        ("", ideal),
+        ("a process is an instance of a running program!", ideal),
+        ("Blue skies and sunny weather", ideal),
+        ("Each running program gets its own process", ideal),
+    ]
+    reset_cascade_stats()
+    scores = evaluate_answers_cascade(pairs)
+    single = [evaluate_answer_cascade(u, i) for u, i in pairs]
+    stats = get_cascade_stats()
+    print(f"Cascade scores: {[round(s, 4) for s in scores]}; stats: {stats}")
+    assert scores[:3] == [0.0, 1.0, 0.0] and single[:3] == scores[:3]
+    assert 0.0 < scores[3] < 1.0
+    assert stats["total"] == 8
+    assert stats["counts"]["length"] == 2 and stats["counts"]["exact"] == 2
+    # Sharing no words with the ideal answer is not enough to settle a pair
+    assert stats["counts"]["offTopic"] == 0 and stats["counts"]["semantic"] == 4
+
+    # Thresholds are configurable per call
+    assert evaluate_answer_cascade("Process", ideal, thresholds={"min_words": 3}) == 0.0
+    reset_cascade_stats()
+    assert evaluate_answer_cascade(pairs[2][0], ideal, thresholds={"off_topic": 0.01}) == 0.0
+    assert get_cascade_stats()["counts"]["offTopic"] == 1
+
+
+def test_cascade_sends_paraphrases_to_semantic():
+    """A paraphrase sharing no words with the ideal answer is scored by the semantic stage."""
+    ideal = "A process is an instance of a running program"
+    paraphrase = "Each executing application gets its own OS task"
+    assert evaluate_answer_tfidf(paraphrase, ideal) == 0.0
+
+    saved = (evaluate.evaluate_answer_semantic, evaluate.evaluate_answers_semantic)
+    # Stand in for the transformer, which rates the paraphrase as close
+    evaluate.evaluate_answer_semantic = lambda user, ideal_answer, question_id=None: 0.8
+    evaluate.evaluate_answers_semantic = lambda pairs, batch_size=64, question_ids=None: [0.8] * len(pairs)
+    try:
+        reset_cascade_stats()
+        assert evaluate_answer_cascade(paraphrase, ideal) == 0.8
+        assert evaluate_answers_cascade([(paraphrase, ideal)]) == [0.8]
+        assert get_cascade_stats()["counts"]["semantic"] == 2
+    finally:
+        evaluate.evaluate_answer_semantic, evaluate.evaluate_answers_semantic = saved
+    print("✅ Zero-overlap paraphrases reach the semantic stage")
+
+
+def test_cascade_batch_matches_single():
+    """A borderline pair lands in the same cascade stage alone and inside a mixed batch."""
+    ideal = "Python tuples are immutable sequences of values"
+    borderline = ("Python lists are mutable sequences of values", ideal)
+    pairs = [
+        ("Python is popular", ideal),
+        borderline,
+        ("Values in Python sequences can be indexed", "Python values"),
+        ("immutable objects cannot change", "Python"),
+    ]
+    # Put the near-duplicate cut between the pair's own TF-IDF score and the one
+    # a vectorizer fitted on the whole batch gives it
+    alone = evaluate_answer_tfidf(*borderline)
+    batch_texts = [text for pair in pairs for text in pair]
+    batch_vectors = evaluate.TfidfVectorizer().fit_transform(batch_texts)
+    batch_fit = float(evaluate.cosine_similarity(batch_vectors[2:3], batch_vectors[3:4])[0][0])
+    assert alone != batch_fit
+    thresholds = {"near_duplicate": (alone + batch_fit) / 2}
+
+    reset_cascade_stats()
+    single = [evaluate_answer_cascade(u, i, thresholds=thresholds) for u, i in pairs]
+    single_stats = get_cascade_stats()["counts"]
+    reset_cascade_stats()
+    batched = evaluate_answers_cascade(pairs, thresholds=thresholds)
+    batched_stats = get_cascade_stats()["counts"]
+    print(f"Borderline pair: alone {alone:.4f}, batch-fitted {batch_fit:.4f}; stages {batched_stats}")
+    assert batched == single
+    assert batched_stats == single_stats
+
+
 if __name__ == "__main__":
     try:
         test_semantic_evaluation()
         test_backward_compatibility()
+        test_batched_evaluation()
+        test_corpus_tfidf_model()
+        test_corrupt_tfidf_model_falls_back()
+        test_cascade_evaluation()
+        test_cascade_sends_paraphrases_to_semantic()
+        test_cascade_batch_matches_single()
         print("\n✅ All tests completed successfully!")
     except Exception as e:
         print(f"\n❌ Test failed with error: {e}")
@@ -10,7 +10,10 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
-from answer_accuracy.keyword_checker import keyword_coverage_score
+from rapidfuzz import fuzz
+from rapidfuzz.process import extractOne
+
+from answer_accuracy.keyword_checker import KeywordSet, keyword_coverage_score
 
 
 def print_detailed_results(result, test_name):
@@ -126,5 +129,25 @@ def test_fuzzy_keyword_checker():
     print("- Backward compatibility maintained with exact matching")
 
 
+def test_fuzzy_matrix_matches_extract_one():
+    """The cdist score matrix picks the same token and score as extractOne per word."""
+    answer = "i built pythom services, rest apis and an api gateway in pyton"
+    words = answer.replace(",", "").split()
+    keywords = ["python", "rest api", "api gateway", "kubernetes"]
+
+    result = keyword_coverage_score(answer, keywords, strict=True, fuzzy=True, similarity_threshold=80)
+    details = {d["keyword"]: d for d in result["match_details"]}
+    token, score, _ = extractOne("python", words, scorer=fuzz.ratio)
+    assert details["python"]["matched_text"] == token
+    assert details["python"]["similarity_score"] == score
+    assert details["api gateway"]["match_type"] == "fuzzy_strict_multiword"
+    assert not details["kubernetes"]["matched"]
+
+    threaded = KeywordSet(keywords, strict=True, fuzzy=True, similarity_threshold=80, workers=-1)
+    assert threaded.score(answer) == result
+    print("\nFuzzy score matrix agrees with extractOne and across worker counts")
+
+
 if __name__ == "__main__":
     test_fuzzy_keyword_checker()
+    test_fuzzy_matrix_matches_extract_one()
@@ -0,0 +1,60 @@
+"""
+Test script for the multi-pattern exact keyword matcher.
+"""
+
+import re
+import random
+
+import keyword_automaton
+from keyword_automaton import KeywordAutomaton
+
+
+def _expected(text, patterns, whole_words):
+    found = set()
+    for pattern_id, pattern in enumerate(patterns):
+        if not pattern:
+            continue
+        if whole_words:
+            if re.search(r"\b" + re.escape(pattern) + r"\b", text):
+                found.add(pattern_id)
+        elif pattern in text:
+            found.add(pattern_id)
+    return found
+
+
+def test_matches_regex_and_substring_semantics():
+    """Both the automaton walk and the short-list scan agree with re/`in`."""
+    rng = random.Random(7)
+    alphabet = list("ab c+.-_é1") + ["c++", ".net", "node.js"]
+
+    def text(n):
+        return "".join(rng.choice(alphabet) for _ in range(n))
+
+    saved_limit = keyword_automaton.SCAN_KEYWORD_LIMIT
+    try:
+        for limit in (0, saved_limit):
+            keyword_automaton.SCAN_KEYWORD_LIMIT = limit
+            for _ in range(3000):
+                answer = text(rng.randint(0, 40))
+                patterns = [text(rng.randint(0, 4)) for _ in range(rng.randint(1, 6))]
+                patterns.append(patterns[0])  # duplicates report both ids
+                automaton = KeywordAutomaton(patterns)
+                for whole_words in (False, True):
+                    assert automaton.find(answer, whole_words) == _expected(answer, patterns, whole_words)
+    finally:
+        keyword_automaton.SCAN_KEYWORD_LIMIT = saved_limit
+    print("✅ Automaton matches re.search / substring semantics")
+
+
+def test_word_boundaries_around_symbols():
+    automaton = KeywordAutomaton(["c++", "api", "node.js", "key"])
+    answer = "i use c++ daily, apis via node.js and an apikey"
+    assert automaton.find(answer) == {0, 1, 2, 3}
+    # "c++" needs a word character after it for \b, exactly like the regex did
+    assert automaton.find(answer, whole_words=True) == {2}
+    print("✅ Word boundaries follow \\b semantics")
+
+
+if __name__ == "__main__":
+    test_matches_regex_and_substring_semantics()
+    test_word_boundaries_around_symbols()
@@ -10,7 +10,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
-from answer_accuracy.keyword_checker import keyword_coverage_score
+from answer_accuracy.keyword_checker import KeywordCoverageTracker, KeywordSet, keyword_coverage_score
 
 
 def test_keyword_checker():
@@ -65,5 +65,54 @@ def test_keyword_checker():
     print(f"Strict matching only finds whole words, differentiating 'api' from 'APIs'")
 
 
+def test_compiled_keyword_set():
+    keywords = ["Python", "REST API", "docker"]
+    answers = [
+        "I built REST APIs in Python",
+        "Deployed with Docker and pyhton scripts",
+        "",
+    ]
+    for strict in (False, True):
+        for fuzzy in (False, True):
+            keyword_set = KeywordSet.compile(keywords, strict=strict, fuzzy=fuzzy)
+            expected = [
+                keyword_coverage_score(a, keywords, strict=strict, fuzzy=fuzzy) for a in answers
+            ]
+            assert keyword_set.score_many(answers) == expected
+            assert KeywordSet.compile(keywords, strict=strict, fuzzy=fuzzy) is keyword_set
+
+    first = KeywordSet.for_question("q1", keywords)
+    assert KeywordSet.for_question("q1", keywords) is first
+    assert KeywordSet.for_question("q1", keywords + ["sql"]) is not first
+    print("\nCompiled KeywordSet matches keyword_coverage_score and is cached per question")
+
+
+def test_coverage_tracker_follows_full_transcript():
+    keywords = ["Python", "REST API", "machine learning", "c++", "java"]
+    transcript = "So I wrote javascript, then a REST API in pythn and some C++ for machine learnin models."
+    chunks = [transcript[i:i + 7] for i in range(0, len(transcript), 7)]
+    for strict in (False, True):
+        for fuzzy in (False, True):
+            tracker = KeywordCoverageTracker(keywords, strict=strict, fuzzy=fuzzy)
+            seen = ""
+            for chunk in chunks:
+                seen += chunk
+                result = tracker.update(chunk)
+                expected = keyword_coverage_score(seen, keywords, strict=strict, fuzzy=fuzzy)
+                for detail in result["match_details"]:
+                    detail.pop("matched_span", None)
+                for detail in expected["match_details"]:
+                    detail.pop("matched_span", None)
+                assert result == expected, (strict, fuzzy, seen)
+            # Results are copies: editing one leaves the tracker's state alone
+            if fuzzy and not strict:
+                assert any("matched_span" in detail for detail in tracker.result()["match_details"])
+            tracker.match_details.clear()
+            assert len(tracker.result()["match_details"]) == len(keywords)
+            print(f"Tracker strict={strict} fuzzy={fuzzy}: coverage {tracker.coverage_score}")
+
+
 if __name__ == "__main__":
     test_keyword_checker()
+    test_compiled_keyword_set()
+    test_coverage_tracker_follows_full_transcript()
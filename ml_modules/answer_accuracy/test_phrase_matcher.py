@@ -0,0 +1,50 @@
+"""
+Test script for the windowed fuzzy phrase matcher.
+"""
+
+import random
+
+from rapidfuzz import fuzz
+
+import phrase_matcher
+from phrase_matcher import PhraseMatcher
+
+
+def test_matches_whole_text_partial_ratio():
+    """Windowed scores equal partial_ratio on the whole answer at or above the threshold."""
+    rng = random.Random(11)
+    vocab = "python django rest api docker kubernetes machine learning the a of and to is".split()
+    saved_min = phrase_matcher.MIN_WINDOWED_TEXT
+    phrase_matcher.MIN_WINDOWED_TEXT = 0
+    try:
+        for _ in range(300):
+            words = [rng.choice(vocab) for _ in range(rng.randint(0, 300))]
+            words = [w if rng.random() > 0.2 else w[:-1] + rng.choice("aeiouxz") for w in words]
+            answer = " ".join(words)
+            phrases = [" ".join(rng.choice(vocab) for _ in range(rng.randint(1, 4))) for _ in range(6)]
+            matcher = PhraseMatcher(phrases, block_size=rng.choice([4, 16, 32]))
+            for threshold in (0, 70, 85, 95):
+                for phrase, (score, span) in zip(phrases, matcher.match_all(answer, threshold)):
+                    expected = fuzz.partial_ratio(phrase, answer)
+                    if expected >= threshold:
+                        assert score == expected and span is not None
+                    else:
+                        assert score == 0 and span is None
+    finally:
+        phrase_matcher.MIN_WINDOWED_TEXT = saved_min
+    print("✅ Windowed phrase scores match whole-text partial_ratio")
+
+
+def test_reports_span_in_long_answer():
+    filler = "we talked about the weather and the team lunch " * 200
+    answer = filler + "i built a rest api with django " + filler
+    matcher = PhraseMatcher(["rest api", "machine learning"])
+    (score, (start, end)), missing = matcher.match_all(answer, 85)
+    assert score == 100 and answer[start:end] == "rest api"
+    assert missing == (0, None)
+    print(f"✅ Found 'rest api' at {start}:{end} in a {len(answer)}-character answer")
+
+
+if __name__ == "__main__":
+    test_matches_whole_text_partial_ratio()
+    test_reports_span_in_long_answer()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed ideal-answer embedding store.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conftest import HashingEncoder
+from embedding_codec import EmbeddingCodec
+from question_bank_store import QuestionBankStore, answer_hash, build_store, model_directory
+
+
+def test_build_and_lookup():
+    questions = [
+        ("q1", "A process is an instance of a running program"),
+        ("q2", "TCP is connection oriented while UDP is connectionless"),
+    ]
+    encoder = HashingEncoder()
+    expected = encoder.encode([a for _, a in questions], normalize_embeddings=True)
+    with tempfile.TemporaryDirectory() as root:
+        for dtype, tolerance in (("float32", 1e-7), ("float16", 1e-3)):
+            build_store(questions, root, encoder, model_name="hashing", dtype=dtype)
+            store = QuestionBankStore(root, "hashing")
+            assert len(store) == 2 and store.meta["dtype"] == dtype
+            assert np.allclose(store.get("q1"), expected[0], atol=tolerance)
+            # Whitespace changes keep the entry, edited answers invalidate it
+            assert store.get("q2", "TCP is connection oriented  while UDP is connectionless") is not None
+            assert store.get("q2", "UDP is connection oriented") is None
+            assert store.get("missing") is None
+        # Vectors from another backend of the same model are refused too
+        build_store(questions, root, encoder, model_name="hashing", backend="onnx-int8")
+        assert QuestionBankStore(root, "hashing", "onnx-int8").meta["backend"] == "onnx-int8"
+        try:
+            QuestionBankStore(root, "hashing", "torch")
+        except ValueError as e:
+            assert "onnx-int8" in str(e)
+        else:
+            raise AssertionError("Store for a different backend was opened")
+        # A store built by another model is refused even when it sits in this model's directory
+        os.replace(model_directory(root, "hashing"), model_directory(root, "another-model"))
+        try:
+            QuestionBankStore(root, "another-model")
+        except ValueError as e:
+            assert "hashing" in str(e)
+        else:
+            raise AssertionError("Store for a different model was opened")
+    assert answer_hash(" a  b ") == answer_hash("a b")
+    print("✅ Question bank store builds, reloads and rejects stale answers")
+
+
+def test_rebuild_replaces_codec():
+    questions = [(f"q{i}", f"answer number {i} about topic {i % 5} and detail {i % 7}") for i in range(40)]
+    encoder = HashingEncoder()
+    with tempfile.TemporaryDirectory() as root:
+        vectors = encoder.encode([a for _, a in questions], normalize_embeddings=True)
+        pca = EmbeddingCodec.fit_pca(vectors, 8)
+        build_store(questions, root, encoder, model_name="hashing", codec=pca)
+        assert QuestionBankStore(root, "hashing").get("q1").shape == (8,)
+
+        # Rebuilding as plain float32 must not leave the PCA projection behind
+        build_store(questions, root, encoder, model_name="hashing", dtype="float32")
+        store = QuestionBankStore(root, "hashing")
+        assert store.codec.components is None
+        assert not os.path.exists(os.path.join(model_directory(root, "hashing"), "components.npy"))
+        user = encoder.encode(["answer number 1"], normalize_embeddings=True)[0]
+        assert store.codec.project(user) @ store.get("q1") > 0
+
+        # Codec files that do not match meta.json are refused
+        pca.save(model_directory(root, "hashing"))
+        try:
+            QuestionBankStore(root, "hashing")
+        except ValueError as e:
+            print(f"✅ Mismatched codec refused: {e}")
+        else:
+            raise AssertionError("Store opened with a codec its meta does not name")
+
+
+if __name__ == "__main__":
+    test_build_and_lookup()
+    test_rebuild_replaces_codec()
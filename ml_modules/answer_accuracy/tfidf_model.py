@@ -0,0 +1,109 @@
+"""
+Corpus-fitted TF-IDF model for the fallback answer evaluator.
+
+Fitting a vectorizer on just the two answers being compared gives IDF weights
+from a two-document corpus and repeats the fit on every call. This module fits
+one vectorizer on the question bank / answer corpus offline, saves it with
+joblib, and evaluate.py loads it once per process from PLACIFY_TFIDF_MODEL.
+
+Fit offline:
+    python tfidf_model.py --input corpus.jsonl --output models/tfidf.joblib
+
+Each input line is a JSON object; its "question", "ideal_answer", "user_answer"
+and "answer" fields (whichever are present) are added to the corpus.
+"""
+
+import json
+import argparse
+
+import joblib
+import numpy as np
+import sklearn
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+CORPUS_FIELDS = ("question", "ideal_answer", "user_answer", "answer")
+
+
+def fit_tfidf(texts, min_df=1, max_ngram=1, sublinear_tf=True):
+    """
+    Fit a TF-IDF vectorizer on the answer corpus.
+
+    Args:
+        texts (iterable): Corpus documents
+        min_df (int): Ignore terms seen in fewer documents than this
+        max_ngram (int): Largest word n-gram in the vocabulary
+        sublinear_tf (bool): Use 1 + log(tf) so long answers do not dominate
+
+    Returns:
+        TfidfVectorizer: The fitted vectorizer
+    """
+    vectorizer = TfidfVectorizer(
+        min_df=min_df, ngram_range=(1, max_ngram), sublinear_tf=sublinear_tf
+    )
+    vectorizer.fit([text for text in texts if text and text.strip()])
+    return vectorizer
+
+
+def save_tfidf(vectorizer, path):
+    joblib.dump({"vectorizer": vectorizer, "sklearnVersion": sklearn.__version__}, path)
+
+
+def load_tfidf(path):
+    """
+    Load a vectorizer saved by save_tfidf.
+
+    Raises:
+        ValueError: If the file is not a saved vectorizer or was written by a
+            different scikit-learn version
+    """
+    saved = joblib.load(path)
+    if not isinstance(saved, dict) or not isinstance(saved.get("vectorizer"), TfidfVectorizer):
+        raise ValueError(f"{path} does not hold a TF-IDF model saved by tfidf_model.py")
+    if saved.get("sklearnVersion") != sklearn.__version__:
+        raise ValueError(
+            f"TF-IDF model {path} was saved with scikit-learn {saved.get('sklearnVersion')}, "
+            f"running {sklearn.__version__}; refit it"
+        )
+    if not hasattr(saved["vectorizer"], "idf_"):
+        raise ValueError(f"TF-IDF model {path} was saved before fitting")
+    return saved["vectorizer"]
+
+
+def pair_similarities(vectors, user_indices, ideal_indices):
+    """
+    Cosine similarity of each (user, ideal) row pair of an L2-normalized TF-IDF matrix.
+    """
+    # Rows are L2-normalized, so the row-wise sparse dot product is the cosine
+    products = vectors[user_indices].multiply(vectors[ideal_indices]).sum(axis=1)
+    return np.clip(np.asarray(products).ravel(), 0.0, 1.0)
+
+
+def read_corpus(path):
+    """
+    Yield corpus documents from a JSONL file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            for field in CORPUS_FIELDS:
+                if isinstance(record.get(field), str):
+                    yield record[field]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit the corpus TF-IDF model for answer evaluation")
+    parser.add_argument("--input", required=True, help="JSONL corpus file")
+    parser.add_argument("--output", required=True, help="Where to write the .joblib model")
+    parser.add_argument("--min-df", type=int, default=1)
+    parser.add_argument("--max-ngram", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    vectorizer = fit_tfidf(read_corpus(args.input), min_df=args.min_df, max_ngram=args.max_ngram)
+    save_tfidf(vectorizer, args.output)
+    print(f"Wrote TF-IDF model with {len(vectorizer.vocabulary_)} terms to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark matrix for keyword coverage scoring.
+
+Sweeps answer length, keyword count, share of multi-word keywords and the four
+strict/fuzzy modes of answer_accuracy.keyword_checker.keyword_coverage_score.
+For each configuration it reports warm latency percentiles (the compiled
+keyword set is cached, as in production), the one-off compile time and the
+peak Python allocation of a single call. Besides the usual JSON results and
+baseline comparison it writes a fixed-width table meant to be diffed between
+versions.
+
+Usage:
+    python benchmarks/bench_keyword_checker.py --save-baseline
+    python benchmarks/bench_keyword_checker.py --words 50,2000 --keywords 5,50 --modes fuzzy
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from common import (
+    ML_MODULES_DIR,
+    add_output_arguments,
+    environment,
+    finish,
+    latency_summary,
+    time_calls,
+)
+from synthetic import make_answer, make_keywords
+
+ANSWER_ACCURACY_DIR = os.path.join(ML_MODULES_DIR, "answer_accuracy")
+if ANSWER_ACCURACY_DIR not in sys.path:
+    sys.path.insert(0, ANSWER_ACCURACY_DIR)
+
+from keyword_checker import KeywordSet, keyword_coverage_score
+
+# name -> (strict, fuzzy)
+MODES = {
+    "exact": (False, False),
+    "exact-strict": (True, False),
+    "fuzzy": (False, True),
+    "fuzzy-strict": (True, True),
+}
+
+TABLE_COLUMNS = ["mode", "words", "keywords", "multi%", "p50Ms", "p95Ms", "p99Ms", "compileMs", "allocPeakKb"]
+
+
+def _int_list(value: str):
+    return [int(item) for item in value.split(",") if item]
+
+
+def _float_list(value: str):
+    return [float(item) for item in value.split(",") if item]
+
+
+def config_name(mode: str, words: int, keywords: int, multiword_ratio: float) -> str:
+    return f"{mode}/words{words}/keywords{keywords}/multi{round(multiword_ratio * 100)}"
+
+
+def bench_config(mode: str, words: int, keyword_count: int, multiword_ratio: float, args) -> dict:
+    """Warm latency, compile time and peak allocation for one configuration."""
+    strict, fuzzy = MODES[mode]
+    keywords = make_keywords(keyword_count, keyword_count, multiword_ratio)
+    answer = make_answer(words, words, keywords, coverage=args.coverage, typo_rate=args.typo_rate)
+    threshold = args.similarity_threshold
+
+    start = time.perf_counter()
+    KeywordSet(keywords, strict, fuzzy, threshold)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    def call():
+        return keyword_coverage_score(answer, keywords, strict, fuzzy, threshold)
+
+    # Warm up (compiles and caches the keyword set), then fit the repeats to the time budget
+    start = time.perf_counter()
+    coverage = call()["coverage_score"]
+    once = time.perf_counter() - start
+    repeat = max(args.min_repeat, min(args.repeat, int(args.budget / once) if once else args.repeat))
+    samples = time_calls(call, repeat, warmup=0)
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        **latency_summary(samples),
+        "compileMs": round(compile_ms, 4),
+        "allocPeakBytes": peak,
+        "answerChars": len(answer),
+        "coverage": coverage,
+    }
+
+
+def format_table(metrics: dict, configs) -> str:
+    """Fixed-width table, one row per configuration in sweep order."""
+    rows = [TABLE_COLUMNS]
+    for mode, words, keyword_count, multiword_ratio in configs:
+        result = metrics[config_name(mode, words, keyword_count, multiword_ratio)]
+        rows.append([
+            mode,
+            str(words),
+            str(keyword_count),
+            str(round(multiword_ratio * 100)),
+            f"{result['p50Ms']:.3f}",
+            f"{result['p95Ms']:.3f}",
+            f"{result['p99Ms']:.3f}",
+            f"{result['compileMs']:.3f}",
+            f"{result['allocPeakBytes'] / 1024:.1f}",
+        ])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(TABLE_COLUMNS))]
+    lines = []
+    for row in rows:
+        cells = [cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths))]
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="keyword_checker benchmark matrix")
+    parser.add_argument("--words", type=_int_list, default=[50, 500, 2000, 20000], help="Answer lengths")
+    parser.add_argument("--keywords", type=_int_list, default=[5, 50, 500], help="Keyword counts")
+    parser.add_argument("--multiword", type=_float_list, default=[0.0, 0.5], help="Shares of multi-word keywords")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated subset of {', '.join(MODES)}")
+    parser.add_argument("--coverage", type=float, default=0.5, help="Share of keywords mentioned in the answer")
+    parser.add_argument("--typo-rate", type=float, default=0.2, help="Share of mentions misspelled")
+    parser.add_argument("--similarity-threshold", type=int, default=85)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per configuration, at most")
+    parser.add_argument("--min-repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=2.0, help="Seconds of timed calls per configuration")
+    parser.add_argument("--table", default=os.path.join("bench_results", "keyword_checker.txt"))
+    add_output_arguments(parser, "keyword_checker")
+    args = parser.parse_args(argv)
+
+    modes = [mode for mode in args.modes.split(",") if mode]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    configs = [
+        (mode, words, keyword_count, multiword_ratio)
+        for mode in modes
+        for words in args.words
+        for keyword_count in args.keywords
+        for multiword_ratio in args.multiword
+    ]
+    metrics = {}
+    for index, (mode, words, keyword_count, multiword_ratio) in enumerate(configs, 1):
+        name = config_name(mode, words, keyword_count, multiword_ratio)
+        metrics[name] = bench_config(mode, words, keyword_count, multiword_ratio, args)
+        print(f"[{index}/{len(configs)}] {name}: p50 {metrics[name]['p50Ms']:.3f} ms", file=sys.stderr)
+
+    table = format_table(metrics, configs)
+    directory = os.path.dirname(args.table)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.table, "w") as f:
+        f.write(table)
+    print(table)
+    print(f"📄 Table written to {args.table}")
+
+    results = {
+        "benchmark": "keyword_checker",
+        "environment": environment(),
+        "config": {
+            "words": args.words,
+            "keywords": args.keywords,
+            "multiword": args.multiword,
+            "modes": modes,
+            "coverage": args.coverage,
+            "typoRate": args.typo_rate,
+            "similarityThreshold": args.similarity_threshold,
+        },
+        "metrics": metrics,
+    }
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
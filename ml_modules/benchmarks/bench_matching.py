@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the resume-job matching pipeline.
+
+Measures cold start, single-pair latency, batch throughput and peak memory of
+main_analyzer.analyze_resume_job_match, plus one-shot and --serve latency of
+call_match.py, and compares them against a saved baseline.
+
+Usage:
+    python benchmarks/bench_matching.py --save-baseline
+    python benchmarks/bench_matching.py --threshold 0.15
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import tracemalloc
+
+from common import (
+    ML_MODULES_DIR,
+    add_output_arguments,
+    environment,
+    finish,
+    latency_summary,
+    time_calls,
+)
+from synthetic import make_job, make_jobs, make_resume, make_resumes
+
+import main_analyzer
+
+CALL_MATCH = os.path.join(ML_MODULES_DIR, "call_match.py")
+
+
+def bench_cold_start(repeat: int) -> dict:
+    """Import + model load in a fresh interpreter, and a full one-shot call_match.py run."""
+    import_cmd = [sys.executable, "-c", "import main_analyzer; main_analyzer.warmup()"]
+    payload = json.dumps({"resume": make_resume(0), "job": make_job(0)})
+    import_ms, call_ms = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(import_cmd, cwd=ML_MODULES_DIR, check=True, capture_output=True)
+        import_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, CALL_MATCH], input=payload.encode(), check=True, capture_output=True
+        )
+        call_ms.append((time.perf_counter() - start) * 1000)
+    return {"importWarmup": latency_summary(import_ms), "callMatchOneShot": latency_summary(call_ms)}
+
+
+def bench_single_pair(args) -> dict:
+    """Per-pair latency with a cold embedding cache (unique texts) and a warm one."""
+    resumes = make_resumes(args.pairs, skill_count=args.skills, description_words=args.words)
+    jobs = make_jobs(args.pairs, requirement_count=args.skills, description_words=args.words * 2)
+    cache = main_analyzer.get_embedding_cache()
+    cache.clear()
+    cold = []
+    for resume, job in zip(resumes, jobs):
+        start = time.perf_counter()
+        main_analyzer.analyze_resume_job_match(resume, job)
+        cold.append((time.perf_counter() - start) * 1000)
+    warm = time_calls(
+        lambda: main_analyzer.analyze_resume_job_match(resumes[0], jobs[0]), args.pairs
+    )
+    return {"uncached": latency_summary(cold), "cached": latency_summary(warm)}
+
+
+def bench_batch(args) -> dict:
+    """One resume against ``batch`` jobs through analyze_resume_job_matches."""
+    resume = make_resume(1, skill_count=args.skills, description_words=args.words)
+    jobs = make_jobs(args.batch, start=100_000, requirement_count=args.skills, description_words=args.words * 2)
+    main_analyzer.get_embedding_cache().clear()
+    start = time.perf_counter()
+    main_analyzer.analyze_resume_job_matches(resume, jobs)
+    elapsed = time.perf_counter() - start
+    return {
+        "size": args.batch,
+        "uncachedMs": round(elapsed * 1000, 3),
+        "pairsPerSec": round(args.batch / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def bench_memory(args) -> dict:
+    """
+    Peak Python allocations during a batch match, and process max RSS where the
+    platform reports it (the resource module is Unix-only).
+    """
+    resume = make_resume(2, skill_count=args.skills, description_words=args.words)
+    jobs = make_jobs(args.batch, start=200_000, requirement_count=args.skills, description_words=args.words * 2)
+    main_analyzer.get_embedding_cache().clear()
+    tracemalloc.start()
+    main_analyzer.analyze_resume_job_matches(resume, jobs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memory = {"tracedPeakBytes": peak}
+    try:
+        import resource
+    except ImportError:
+        print("Warning: resource module not available, skipping peak RSS")
+        return memory
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss_kb = max_rss / 1024 if sys.platform == "darwin" else max_rss
+    memory["maxRssMb"] = round(max_rss_kb / 1024, 2)
+    return memory
+
+
+def bench_serve(args) -> dict:
+    """Round-trip latency of requests sent one at a time to call_match.py --serve."""
+    proc = subprocess.Popen(
+        [sys.executable, CALL_MATCH, "--serve"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+    )
+    try:
+        samples = []
+        for i in range(args.pairs + 1):
+            line = json.dumps({"id": i, "resume": make_resume(i), "job": make_job(i)})
+            start = time.perf_counter()
+            proc.stdin.write(line + "\n")
+            proc.stdin.flush()
+            proc.stdout.readline()
+            if i:  # first request absorbs the model load
+                samples.append((time.perf_counter() - start) * 1000)
+        return latency_summary(samples)
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=60)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Resume-job matching benchmark")
+    parser.add_argument("--pairs", type=int, default=50, help="Pairs for latency runs")
+    parser.add_argument("--batch", type=int, default=500, help="Jobs per batch run")
+    parser.add_argument("--skills", type=int, default=10, help="Skills/requirements per document")
+    parser.add_argument("--words", type=int, default=60, help="Words per resume description")
+    parser.add_argument("--cold-repeat", type=int, default=3)
+    parser.add_argument("--skip-subprocess", action="store_true", help="Skip cold start and --serve runs")
+    add_output_arguments(parser, "matching")
+    args = parser.parse_args(argv)
+
+    model_available = main_analyzer.warmup()
+    if not model_available:
+        print("⚠️ Embedding model not available; timings cover the fallback path only")
+
+    metrics = {}
+    if not args.skip_subprocess:
+        metrics["coldStart"] = bench_cold_start(args.cold_repeat)
+    metrics["singlePair"] = bench_single_pair(args)
+    metrics["batch"] = bench_batch(args)
+    metrics["memory"] = bench_memory(args)
+    if not args.skip_subprocess:
+        metrics["serve"] = bench_serve(args)
+
+    results = {
+        "benchmark": "matching",
+        "environment": environment(),
+        "config": {
+            "pairs": args.pairs,
+            "batch": args.batch,
+            "skills": args.skills,
+            "words": args.words,
+            "modelAvailable": model_available,
+            "model": main_analyzer.MODEL_NAME,
+        },
+        "metrics": metrics,
+    }
+    print(json.dumps(metrics, indent=2))
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
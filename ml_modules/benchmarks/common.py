@@ -0,0 +1,145 @@
+# Placify Benchmark Helpers
+# Timing, result files and baseline comparison shared by the benchmark scripts
+
+import os
+import sys
+import json
+import time
+import platform
+from datetime import datetime
+from typing import Dict, Any, List, Callable
+
+# Benchmarks import the ml_modules code they measure
+ML_MODULES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ML_MODULES_DIR not in sys.path:
+    sys.path.insert(0, ML_MODULES_DIR)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of ``samples`` (which need not be sorted).
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples_ms),
+        "p50Ms": round(percentile(samples_ms, 50), 4),
+        "p95Ms": round(percentile(samples_ms, 95), 4),
+        "p99Ms": round(percentile(samples_ms, 99), 4),
+        "meanMs": round(sum(samples_ms) / len(samples_ms), 4) if samples_ms else 0.0,
+    }
+
+
+def time_calls(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> List[float]:
+    """
+    Calls ``fn`` ``warmup`` times untimed, then ``repeat`` times; returns milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+    }
+
+
+def write_results(results: Dict[str, Any], path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def _flatten(prefix: str, value: Any, out: Dict[str, float]):
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, inner, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = float(value)
+
+
+def compare_to_baseline(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[Dict[str, Any]]:
+    """
+    Returns metrics that regressed by more than ``threshold`` (0.1 = 10%).
+
+    Metrics ending in "Ms" or "Bytes"/"Mb" are lower-is-better; metrics ending in
+    "PerSec" are higher-is-better. Anything else is informational.
+    """
+    current, previous = {}, {}
+    _flatten("", results.get("metrics", {}), current)
+    _flatten("", baseline.get("metrics", {}), previous)
+    regressions = []
+    for name, old in previous.items():
+        new = current.get(name)
+        if new is None or old == 0:
+            continue
+        if name.endswith(("Ms", "Bytes", "Mb")):
+            change = (new - old) / old
+        elif name.endswith("PerSec"):
+            change = (old - new) / old
+        else:
+            continue
+        if change > threshold:
+            regressions.append(
+                {"metric": name, "baseline": old, "current": new, "regression": round(change, 4)}
+            )
+    return regressions
+
+
+def finish(results: Dict[str, Any], args) -> int:
+    """
+    Writes results, optionally saves/compares a baseline, and returns an exit code.
+    Expects ``args`` with ``output``, ``baseline``, ``save_baseline`` and ``threshold``.
+    """
+    write_results(results, args.output)
+    print(f"📄 Results written to {args.output}")
+    if args.save_baseline:
+        write_results(results, args.baseline)
+        print(f"📌 Baseline saved to {args.baseline}")
+        return 0
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} metric(s) regressed more than {args.threshold:.0%}:")
+            for item in regressions:
+                print(
+                    f"   {item['metric']}: {item['baseline']} -> {item['current']} "
+                    f"(+{item['regression']:.1%})"
+                )
+            return 1
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+def add_output_arguments(parser, default_name: str):
+    parser.add_argument(
+        "--output", default=os.path.join("bench_results", f"{default_name}.json")
+    )
+    parser.add_argument(
+        "--baseline", default=os.path.join("bench_results", f"{default_name}.baseline.json")
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="Allowed regression (0.10 = 10%%)"
+    )
@@ -0,0 +1,146 @@
+# Placify Synthetic Data
+# Deterministic resume/job/interview-answer generator for benchmarks
+
+import random
+from typing import Dict, Any, List
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "node.js", "django", "flask",
+    "sql", "postgresql", "mongodb", "docker", "kubernetes", "aws", "azure", "gcp",
+    "machine learning", "deep learning", "nlp", "pandas", "numpy", "tensorflow",
+    "pytorch", "rest api", "graphql", "redis", "kafka", "spark", "hadoop", "git",
+    "ci/cd", "linux", "c++", "go", "rust", "html", "css", "tailwind", "figma", "agile",
+]
+
+WORDS = [
+    "built", "designed", "scalable", "services", "team", "delivered", "improved",
+    "performance", "users", "platform", "data", "pipeline", "deployed", "cloud",
+    "automated", "testing", "features", "customers", "analytics", "dashboard",
+    "optimized", "latency", "reliability", "integrated", "payments", "search",
+    "mobile", "backend", "frontend", "infrastructure", "monitoring", "models",
+]
+
+# Building blocks for made-up technical terms, so keyword lists can grow to hundreds
+SYLLABLES = ["ka", "ro", "mi", "tek", "lon", "va", "stra", "dex", "pho", "ni", "zu", "gra", "fel", "quo", "bin"]
+
+TITLES = [
+    "Software Engineer", "Backend Developer", "Frontend Developer", "Data Scientist",
+    "ML Engineer", "DevOps Engineer", "Full Stack Developer", "Data Analyst",
+]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _text(rng: random.Random, words: int) -> str:
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 16))
+        sentences.append(_sentence(rng, length))
+        remaining -= length
+    return " ".join(sentences)
+
+
+def make_resume(
+    seed: int,
+    skill_count: int = 10,
+    work_entries: int = 2,
+    projects: int = 2,
+    description_words: int = 60,
+) -> Dict[str, Any]:
+    """
+    Builds a resume document shaped like the Mongo Resume model.
+    """
+    rng = random.Random(seed)
+    return {
+        "_id": f"resume-{seed}",
+        "summary": _text(rng, description_words // 2),
+        "skills": rng.sample(SKILLS, min(skill_count, len(SKILLS))),
+        "workExperience": [
+            {
+                "role": rng.choice(TITLES),
+                "company": f"Company {rng.randint(1, 500)}",
+                "description": _text(rng, description_words),
+            }
+            for _ in range(work_entries)
+        ],
+        "projects": [
+            {"title": f"Project {rng.randint(1, 999)}", "description": _text(rng, description_words)}
+            for _ in range(projects)
+        ],
+        "education": [{"degree": "B.Tech", "institution": f"Institute {rng.randint(1, 50)}"}],
+    }
+
+
+def make_job(
+    seed: int,
+    requirement_count: int = 6,
+    description_words: int = 120,
+    responsibilities: int = 4,
+) -> Dict[str, Any]:
+    """
+    Builds a job document shaped like the Mongo Jobs model.
+    """
+    rng = random.Random(10_000_019 + seed)
+    return {
+        "_id": f"job-{seed}",
+        "title": rng.choice(TITLES),
+        "domain": rng.choice(["Fintech", "Edtech", "E-commerce", "Healthcare", "SaaS"]),
+        "description": _text(rng, description_words),
+        "requirements": rng.sample(SKILLS, min(requirement_count, len(SKILLS))),
+        "responsibilities": [_sentence(rng, 10) for _ in range(responsibilities)],
+    }
+
+
+def make_resumes(count: int, start: int = 0, **kwargs) -> List[Dict[str, Any]]:
+    return [make_resume(start + i, **kwargs) for i in range(count)]
+
+
+def make_jobs(count: int, start: int = 0, **kwargs) -> List[Dict[str, Any]]:
+    return [make_job(start + i, **kwargs) for i in range(count)]
+
+
+def _term(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def _typo(rng: random.Random, text: str) -> str:
+    index = rng.randrange(len(text))
+    return text[:index] + text[index + 1:] if rng.random() < 0.5 else text[:index] + rng.choice("aeiou") + text[index:]
+
+
+def make_keywords(seed: int, count: int, multiword_ratio: float = 0.3) -> List[str]:
+    """
+    Builds ``count`` distinct keywords; about ``multiword_ratio`` of them are phrases.
+    """
+    rng = random.Random(20_000_003 + seed)
+    keywords = []
+    seen = set()
+    while len(keywords) < count:
+        if rng.random() < multiword_ratio:
+            keyword = " ".join([rng.choice(WORDS)] + [_term(rng) for _ in range(rng.randint(1, 2))])
+        else:
+            keyword = _term(rng)
+        if keyword not in seen:
+            seen.add(keyword)
+            keywords.append(keyword)
+    return keywords
+
+
+def make_answer(seed: int, words: int, keywords: List[str], coverage: float = 0.5, typo_rate: float = 0.2) -> str:
+    """
+    Builds an interview answer of ``words`` words mentioning ``coverage`` of
+    ``keywords`` (at most one word in four) at random positions, ``typo_rate``
+    of them misspelled.
+    """
+    rng = random.Random(30_000_001 + seed)
+    mentions = rng.sample(keywords, min(int(len(keywords) * coverage), words // 4))
+    mentioned_words = sum(len(keyword.split()) for keyword in mentions)
+    tokens = _text(rng, max(0, words - mentioned_words)).split()
+    for keyword in mentions:
+        if rng.random() < typo_rate:
+            keyword = _typo(rng, keyword)
+        tokens.insert(rng.randint(0, len(tokens)), keyword)
+    return " ".join(tokens)
@@ -1,17 +1,278 @@
 import sys
 import json
-from main_analyzer import analyze_resume_job_match
+import os
+import argparse
+import contextlib
+import socketserver
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Worker count for --serve mode; overridable with --workers
+DEFAULT_WORKERS = int(os.environ.get("PLACIFY_MATCH_WORKERS", "1"))
+
+# Where instrumented requests dump cProfile stats; set by --profile-dir only, never
+# by a request (PLACIFY_MATCH_PROFILE_DIR is applied by main_analyzer itself)
+_profile_dir = None
+
+
+def handle_request(payload):
+    """
+    Run a resume-job match for a decoded request payload.
+    A "jobs" or "resumes" list in the payload selects the batched variants;
+    "timings": true adds per-stage instrumentation to single matches (batched
+    requests are not instrumented).
+    """
+    # Imported lazily so a pool parent never loads the model itself
+    from main_analyzer import (
+        analyze_resume_job_match,
+        analyze_resume_job_matches,
+        analyze_job_resume_matches,
+    )
+
+    pooling = payload.get("pooling")
+    if "jobs" in payload:
+        return analyze_resume_job_matches(payload.get("resume", {}), payload["jobs"], pooling)
+    if "resumes" in payload:
+        return analyze_job_resume_matches(payload.get("job", {}), payload["resumes"], pooling)
+    resume = payload.get("resume", {})
+    job = payload.get("job", {})
+    return analyze_resume_job_match(
+        resume, job, pooling, timings=payload.get("timings"), profile_dir=_profile_dir
+    )
+
+
+def _handle_payload(payload):
+    """
+    Run one decoded request and return the response dict, echoing its id.
+    """
+    request_id = payload.get("id") if isinstance(payload, dict) else None
+    try:
+        return {"id": request_id, "result": handle_request(payload)}
+    except Exception as e:
+        return {"id": request_id, "error": str(e)}
+
+
+def _init_worker(stdout_to_stderr=False, profile_dir=None):
+    """
+    Pool initializer: load the model once per worker process.
+    ``stdout_to_stderr`` sends the worker's prints to stderr, for protocols that own stdout.
+    """
+    global _profile_dir
+    if stdout_to_stderr:
+        sys.stdout = sys.stderr
+    if profile_dir:
+        _profile_dir = profile_dir
+
+    from main_analyzer import warmup
+
+    warmup()
+
+
+class MatchDispatcher:
+    """
+    Routes decoded requests either to a process pool or to the current process.
+    """
+
+    def __init__(self, workers=1, stdout_to_stderr=False):
+        self.workers = max(1, workers)
+        self.executor = None
+        self._inline_lock = threading.Lock()
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(stdout_to_stderr, _profile_dir)
+            )
+        else:
+            _init_worker()
+
+    def submit(self, payload, write):
+        """
+        Process a decoded request and pass its response dict to ``write``.
+        Responses may complete out of order when a pool is used.
+        """
+        if self.executor is None:
+            with self._inline_lock:
+                write(_handle_payload(payload))
+            return
+        future = self.executor.submit(_handle_payload, payload)
+        future.add_done_callback(lambda f: write(_future_response(f, payload)))
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+
+def _future_response(future, payload):
+    try:
+        return future.result()
+    except Exception as e:
+        # Worker crashed before producing a response
+        return {"id": payload.get("id"), "error": str(e)}
+
+
+def _submit_line(dispatcher, line, write):
+    try:
+        payload = json.loads(line)
+    except ValueError as e:
+        write({"id": None, "error": str(e)})
+        return
+    if not isinstance(payload, dict):
+        write({"id": None, "error": "Request must be a JSON object"})
+        return
+    dispatcher.submit(payload, write)
+
+
+def serve_stdin(dispatcher):
+    """
+    Long-lived mode: read NDJSON requests from stdin, write NDJSON responses to stdout.
+    """
+    out_lock = threading.Lock()
+
+    def write(response):
+        with out_lock:
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+
+    for line in sys.stdin:
+        if line.strip():
+            _submit_line(dispatcher, line, write)
+    dispatcher.shutdown()
+
+
+def serve_framed(dispatcher, stdout=None):
+    """
+    Long-lived mode speaking length-prefixed frames (see wire_protocol) on stdin/stdout.
+
+    The first frame written is a JSON hello, {"id": null, "codecs": [...]}, naming
+    the codecs this side supports; each response uses the codec of its request.
+    A frame that cannot be decoded gets an error reply and serving continues;
+    only a stream that ends mid-frame stops it. ``stdout`` is the binary stream
+    frames are written to (default: sys.stdout.buffer), so the caller can point
+    sys.stdout elsewhere while serving.
+    """
+    from wire_protocol import CODEC_JSON, FrameDecodeError, ProtocolError, read_frame, supported_codecs, write_frame
+
+    out_lock = threading.Lock()
+    stdout = stdout or sys.stdout.buffer
+
+    def writer(codec):
+        def write(response):
+            with out_lock:
+                write_frame(stdout, response, codec)
+        return write
+
+    writer(CODEC_JSON)({"id": None, "codecs": supported_codecs()})
+    while True:
+        try:
+            frame = read_frame(sys.stdin.buffer)
+        except FrameDecodeError as e:
+            writer(e.reply_codec)({"id": None, "error": str(e)})
+            continue
+        except ProtocolError as e:
+            writer(CODEC_JSON)({"id": None, "error": str(e)})
+            break
+        if frame is None:
+            break
+        payload, codec = frame
+        if not isinstance(payload, dict):
+            writer(codec)({"id": None, "error": "Request frame must hold an object"})
+            continue
+        dispatcher.submit(payload, writer(codec))
+    dispatcher.shutdown()
+
+
+def serve_socket(dispatcher, path):
+    """
+    Long-lived mode over a local Unix socket; each connection speaks NDJSON.
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            out_lock = threading.Lock()
+
+            def write(response):
+                with out_lock:
+                    try:
+                        self.wfile.write((json.dumps(response) + "\n").encode())
+                        self.wfile.flush()
+                    except OSError:
+                        pass  # client went away
+
+            for raw in self.rfile:
+                line = raw.decode("utf-8")
+                if line.strip():
+                    _submit_line(dispatcher, line, write)
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(path):
+        os.remove(path)
+    with Server(path, Handler) as server:
+        try:
+            server.serve_forever()
+        finally:
+            dispatcher.shutdown()
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Resume-job match runner")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Stay alive and answer newline-delimited JSON requests",
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="Serve on this Unix socket path instead of stdin/stdout",
+    )
+    parser.add_argument(
+        "--framed",
+        action="store_true",
+        help="With --serve, use length-prefixed msgpack/JSON frames instead of NDJSON",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of worker processes in --serve mode",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=None,
+        help="Write a cProfile .pstats file here for each request with timings "
+        "(default: PLACIFY_MATCH_PROFILE_DIR)",
+    )
+    return parser.parse_args(argv)
+
 
 def main():
+    global _profile_dir
+    args = parse_args()
+    _profile_dir = args.profile_dir
+    if args.serve or args.socket:
+        framed = args.framed and not args.socket
+        frame_stream = sys.stdout.buffer
+        # Frames own stdout; a stray print from the analyzers would corrupt the stream
+        with contextlib.redirect_stdout(sys.stderr) if framed else contextlib.nullcontext():
+            dispatcher = MatchDispatcher(args.workers, stdout_to_stderr=framed)
+            if args.socket:
+                serve_socket(dispatcher, args.socket)
+            elif framed:
+                serve_framed(dispatcher, frame_stream)
+            else:
+                serve_stdin(dispatcher)
+        return
+
     try:
         input_data = sys.stdin.read()
         payload = json.loads(input_data)
-        resume = payload.get("resume", {})
-        job = payload.get("job", {})
-        result = analyze_resume_job_match(resume, job)
+        result = handle_request(payload)
         print(json.dumps(result))
     except Exception as e:
         print(json.dumps({"error": str(e)}))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,14 +1,23 @@
-from sentence_transformers import SentenceTransformer
+import os
+import sys
 import numpy as np
 from typing import List
 
+# The shared encoder backend lives in ml_modules/, one level up
+ML_MODULES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ML_MODULES_DIR not in sys.path:
+    sys.path.append(ML_MODULES_DIR)
+
+from encoder_backend import load_encoder
+
 class Vectorizer:
     def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
         """
-        Initializes the vectorizer, loading the sentence-transformer model.
+        Initializes the vectorizer, loading the sentence-transformer model
+        on the backend selected by PLACIFY_ENCODER_BACKEND.
         """
         try:
-            self.model = SentenceTransformer(model_name)
+            self.model = load_encoder(model_name)
         except Exception as e:
             print(f"Error loading SentenceTransformer model: {e}")
             # Fallback or error handling
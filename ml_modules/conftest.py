@@ -0,0 +1,52 @@
+"""
+Shared pytest fixtures for the ml_modules tests.
+
+``stub_encoder`` swaps a deterministic stand-in for main_analyzer's sentence
+model, so match and index tests run without a model download.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words encoder standing in for the sentence model."""
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        self.calls.append(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().replace(",", " ").replace(":", " ").split():
+                vectors[row, sum(map(ord, word)) % self.dim] += 1.0
+        if normalize_embeddings:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def stub_encoder(monkeypatch):
+    """
+    Installs a fresh HashingEncoder and an in-memory embedding cache in
+    main_analyzer, restoring the real model globals on teardown.
+    """
+    import main_analyzer
+    from embedding_cache import EmbeddingCache
+
+    encoder = HashingEncoder()
+    monkeypatch.setattr(main_analyzer, "_model", encoder)
+    monkeypatch.setattr(main_analyzer, "_model_initialized", True)
+    monkeypatch.setattr(main_analyzer, "_embedding_cache", EmbeddingCache("hashing", cache_dir=None))
+    return encoder
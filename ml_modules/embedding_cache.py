@@ -0,0 +1,329 @@
+# Placify Embedding Cache
+# Content-addressed cache for sentence embeddings of resume and job texts
+
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from embedding_codec import EmbeddingCodec, default_codec
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one writer per directory
+    fcntl = None
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("PLACIFY_EMBEDDING_CACHE_SIZE", "4096"))
+DEFAULT_CACHE_DIR = os.environ.get("PLACIFY_EMBEDDING_CACHE_DIR") or None
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapses whitespace so trivially different copies of a text share a key.
+    """
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def embedding_key(text: str, model_name: str) -> str:
+    """
+    Returns the content hash used to address an embedding.
+    """
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only on-disk tier: stored rows in one memory-mapped file plus a key index.
+
+    Layout of ``directory``:
+        meta.json        model name, codec fingerprint and stored dimension
+        embeddings.f32   raw rows, one per key (embeddings.f16 for float16 codecs)
+        index.jsonl      one {"key": ..., "row": ...} object per line
+
+    Rows are written and returned in the codec's stored form. Several processes
+    may share a directory: appends hold an exclusive ``flock`` on ``.lock``, and
+    each process picks up rows other processes added by re-reading the index
+    tail on a miss.
+    """
+
+    def __init__(self, directory: str, model_name: str, codec: Optional[EmbeddingCodec] = None):
+        self.directory = directory
+        self.model_name = model_name
+        self.codec = codec or EmbeddingCodec()
+        self.dtype = np.dtype(self.codec.dtype)
+        self.dim = None
+        self._rows = {}
+        self._index_offset = 0
+        self._matrix = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._data_path = os.path.join(directory, f"embeddings.f{self.dtype.itemsize * 8}")
+        self._index_path = os.path.join(directory, "index.jsonl")
+        self._lock_path = os.path.join(directory, ".lock")
+        with self._file_lock():
+            self._refresh()
+
+    @contextmanager
+    def _file_lock(self):
+        """
+        Exclusive cross-process lock for the directory (no-op without fcntl).
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """
+        Reads meta.json if not yet known and index lines appended since the last refresh.
+        """
+        if self.dim is None:
+            if not os.path.exists(self._meta_path):
+                return
+            self._check_meta()
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            chunk = f.read()
+        # Only whole lines; a line still being written is read next time
+        complete = chunk[: chunk.rfind(b"\n") + 1]
+        self._index_offset += len(complete)
+        row_count = self._row_count()
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn line after a crash
+            # Drop index entries whose rows never made it to disk
+            if int(entry["row"]) < row_count:
+                self._rows[entry["key"]] = int(entry["row"])
+
+    def _check_meta(self):
+        with open(self._meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model_name:
+            raise ValueError(
+                f"Embedding store at {self.directory} was built with "
+                f"{meta.get('model')}, not {self.model_name}"
+            )
+        if meta.get("codec", "float32") != self.codec.fingerprint():
+            raise ValueError(
+                f"Embedding store at {self.directory} uses codec "
+                f"{meta.get('codec', 'float32')}, not {self.codec.fingerprint()}"
+            )
+        self.dim = int(meta["dim"])
+
+    def _row_count(self) -> int:
+        if self.dim is None or not os.path.exists(self._data_path):
+            return 0
+        return os.path.getsize(self._data_path) // (self.dtype.itemsize * self.dim)
+
+    def _mapped(self) -> Optional[np.ndarray]:
+        rows = self._row_count()
+        if rows == 0:
+            return None
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            self._matrix = np.memmap(
+                self._data_path, dtype=self.dtype, mode="r", shape=(rows, self.dim)
+            )
+        return self._matrix
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                # Another process may have added it since our last look
+                self._refresh()
+                row = self._rows.get(key)
+                if row is None:
+                    return None
+            return np.array(self._mapped()[row])
+
+    def put(self, key: str, embedding: np.ndarray):
+        vector = np.asarray(embedding, dtype=self.dtype).reshape(-1)
+        with self._lock, self._file_lock():
+            self._refresh()
+            if key in self._rows:
+                return
+            if self.dim is None:
+                self.dim = int(vector.shape[0])
+                # Replaced atomically: readers refresh without taking the lock
+                with open(self._meta_path + ".tmp", "w") as f:
+                    json.dump(
+                        {"model": self.model_name, "dim": self.dim, "codec": self.codec.fingerprint()}, f
+                    )
+                os.replace(self._meta_path + ".tmp", self._meta_path)
+            elif vector.shape[0] != self.dim:
+                raise ValueError(
+                    f"Expected embedding of dimension {self.dim}, got {vector.shape[0]}"
+                )
+            # The file size is the next row only while we hold the lock; a row
+            # torn by a crash is cut off first so later rows stay aligned
+            row = self._row_count()
+            row_bytes = self.dtype.itemsize * self.dim
+            with open(self._data_path, "ab") as f:
+                if f.tell() != row * row_bytes:
+                    f.truncate(row * row_bytes)
+                f.write(vector.tobytes())
+            # Under the lock, an unfinished last line can only be left by a crash
+            torn = os.path.exists(self._index_path) and os.path.getsize(self._index_path) > self._index_offset
+            with open(self._index_path, "a") as f:
+                f.write(("\n" if torn else "") + json.dumps({"key": key, "row": row}) + "\n")
+            self._rows[key] = row
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: an in-memory LRU backed by an optional DiskEmbeddingStore.
+
+    Both tiers hold embeddings in ``codec``'s stored form (the process default
+    from embedding_codec unless given); lookups return float32 in codec space.
+    ``model_name`` identifies the encoder (encoder_backend.encoder_id, so it
+    includes the backend); the disk tier lives in a sub-directory of
+    ``cache_dir`` named after it, so each encoder keeps its own rows.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        codec: Optional[EmbeddingCodec] = None,
+    ):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.codec = codec or default_codec()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = (
+            DiskEmbeddingStore(os.path.join(cache_dir, model_name.replace("/", "__")), model_name, self.codec)
+            if cache_dir
+            else None
+        )
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        return embedding_key(text, self.model_name)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Returns the cached embedding for ``text`` or None, updating hit/miss counters.
+        """
+        key = self.key(text)
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self.codec.decode(embedding)
+        embedding = self.disk.get(key) if self.disk is not None else None
+        with self._lock:
+            if embedding is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, embedding)
+        return self.codec.decode(embedding)
+
+    def put(self, text: str, embedding: np.ndarray) -> np.ndarray:
+        """
+        Stores a float32 embedding and returns it as later lookups will see it.
+        """
+        key = self.key(text)
+        stored = self.codec.encode(np.asarray(embedding, dtype=np.float32).reshape(-1))
+        with self._lock:
+            self._remember(key, stored)
+        if self.disk is not None:
+            self.disk.put(key, stored)
+        return self.codec.decode(stored)
+
+    def _remember(self, key: str, embedding: np.ndarray):
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_or_compute(self, text: str, encode) -> np.ndarray:
+        """
+        Returns the cached embedding, calling ``encode(text)`` only on a miss.
+        """
+        embedding = self.get(text)
+        if embedding is None:
+            embedding = self.put(text, encode(text))
+        return embedding
+
+    def get_or_compute_many(self, texts: List[str], encode_many, counters=None) -> np.ndarray:
+        """
+        Returns an (n, dim) matrix of embeddings for ``texts`` in input order.
+        Distinct cache misses are passed to ``encode_many`` in one call.
+        ``counters`` (anything with ``count(name, amount)``) receives per-call
+        cacheHits, cacheMisses and batchSize.
+        """
+        found = [self.get(text) for text in texts]
+        missing = []
+        seen = set()
+        for text, embedding in zip(texts, found):
+            key = self.key(text)
+            if embedding is None and key not in seen:
+                seen.add(key)
+                missing.append(text)
+        if counters is not None:
+            hits = sum(1 for embedding in found if embedding is not None)
+            counters.count("cacheHits", hits)
+            counters.count("cacheMisses", len(texts) - hits)
+            counters.count("batchSize", len(missing))
+        computed = {}
+        if missing:
+            matrix = np.asarray(encode_many(missing), dtype=np.float32)
+            for text, embedding in zip(missing, matrix):
+                computed[self.key(text)] = self.put(text, embedding)
+        rows = [
+            embedding if embedding is not None else computed[self.key(text)]
+            for text, embedding in zip(texts, found)
+        ]
+        return np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+
+    def clear(self):
+        """
+        Empties the in-memory tier and resets the counters. The disk tier is kept.
+        """
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRate": round((self.hits + self.disk_hits) / lookups, 4)
+                if lookups
+                else 0.0,
+                "memoryEntries": len(self._memory),
+                "diskEntries": len(self.disk) if self.disk is not None else 0,
+                "codec": self.codec.fingerprint(),
+            }
@@ -0,0 +1,242 @@
+# Placify Embedding Codec
+# Reduced-precision and reduced-dimension storage format for sentence embeddings
+#
+# Every cached or indexed embedding is a 384-dim float32 by default. A codec
+# stores them as float16 and/or projected onto the top principal axes of our
+# own corpus, renormalized so dot products stay cosine similarities:
+#
+#   float32            1536 bytes per all-MiniLM-L6-v2 vector (default)
+#   float16             768 bytes
+#   float16 + pca128    256 bytes
+#
+# Vectors compared with each other must go through the same codec (see
+# ``project``). Caches and stores record the codec fingerprint and refuse to
+# mix formats. Configure the process default with PLACIFY_EMBEDDING_DTYPE and
+# PLACIFY_EMBEDDING_PCA (a directory written by ``fit``).
+#
+# Usage:
+#   python embedding_codec.py fit --input corpus.npy --dim 128 --output codecs/pca128
+#   python embedding_codec.py report --input corpus.npy --codec codecs/pca128 --dtype float16
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+DTYPES = ("float32", "float16")
+DEFAULT_DTYPE = os.environ.get("PLACIFY_EMBEDDING_DTYPE", "float32")
+DEFAULT_PCA_DIR = os.environ.get("PLACIFY_EMBEDDING_PCA") or None
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.clip(norms, 1e-12, None)
+
+
+class EmbeddingCodec:
+    """
+    Converts float32 embeddings to and from their stored form.
+
+    ``components`` is an optional (dim_out, dim_in) projection learned by
+    ``fit_pca``; without it only the dtype changes.
+    """
+
+    def __init__(self, dtype: str = "float32", components: Optional[np.ndarray] = None):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown embedding dtype {dtype!r}; expected one of {DTYPES}")
+        self.dtype = dtype
+        self.components = None if components is None else np.asarray(components, dtype=np.float32)
+
+    @classmethod
+    def fit_pca(cls, embeddings: np.ndarray, dim: int, dtype: str = "float32", sample_size: int = 100_000,
+                seed: int = 0) -> "EmbeddingCodec":
+        """
+        Learns the top ``dim`` principal axes of unit-normalized ``embeddings``.
+        The projection is uncentered so dot products are preserved as closely as
+        possible (a truncated SVD of the corpus).
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if dim >= embeddings.shape[1]:
+            raise ValueError(f"PCA dimension {dim} must be below the input dimension {embeddings.shape[1]}")
+        if embeddings.shape[0] > sample_size:
+            rows = np.random.default_rng(seed).choice(embeddings.shape[0], sample_size, replace=False)
+            embeddings = embeddings[np.sort(rows)]
+        _, _, vt = np.linalg.svd(_normalize_rows(embeddings), full_matrices=False)
+        return cls(dtype, vt[:dim])
+
+    @property
+    def is_identity(self) -> bool:
+        return self.components is None and self.dtype == "float32"
+
+    def output_dim(self, input_dim: int) -> int:
+        return input_dim if self.components is None else self.components.shape[0]
+
+    def fingerprint(self) -> str:
+        """
+        Identifies the stored format; caches built with another codec are not reused.
+        """
+        if self.components is None:
+            return self.dtype
+        digest = hashlib.sha1(self.components.tobytes()).hexdigest()[:12]
+        return f"{self.dtype}-pca{self.components.shape[0]}-{digest}"
+
+    def project(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Maps float32 embeddings into the codec's space (unit-normalized float32),
+        without the precision loss of storage. Use it for query vectors.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.components is None:
+            return embeddings
+        return _normalize_rows(embeddings @ self.components.T)
+
+    def encode(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Float32 embeddings (one vector or a matrix) to the stored form.
+        """
+        return self.project(embeddings).astype(self.dtype, copy=False)
+
+    def decode(self, stored: np.ndarray) -> np.ndarray:
+        """
+        Stored form back to float32 for similarity math.
+        """
+        return np.asarray(stored, dtype=np.float32)
+
+    def round_trip(self, embeddings: np.ndarray) -> np.ndarray:
+        return self.decode(self.encode(embeddings))
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "codec.json"), "w") as f:
+            json.dump({"dtype": self.dtype, "fingerprint": self.fingerprint()}, f)
+        if self.components is not None:
+            np.save(os.path.join(directory, "components.npy"), self.components)
+
+    @classmethod
+    def load(cls, directory: str, dtype: Optional[str] = None) -> "EmbeddingCodec":
+        """
+        Loads a saved codec; ``dtype`` overrides the saved storage dtype.
+        """
+        with open(os.path.join(directory, "codec.json"), "r") as f:
+            meta = json.load(f)
+        components_path = os.path.join(directory, "components.npy")
+        components = np.load(components_path) if os.path.exists(components_path) else None
+        return cls(dtype or meta["dtype"], components)
+
+
+_default_codec = None
+
+
+def default_codec() -> EmbeddingCodec:
+    """
+    The process-wide codec from PLACIFY_EMBEDDING_DTYPE / PLACIFY_EMBEDDING_PCA.
+    """
+    global _default_codec
+    if _default_codec is None:
+        if DEFAULT_PCA_DIR:
+            _default_codec = EmbeddingCodec.load(DEFAULT_PCA_DIR, DEFAULT_DTYPE)
+        else:
+            _default_codec = EmbeddingCodec(DEFAULT_DTYPE)
+    return _default_codec
+
+
+def error_report(embeddings: np.ndarray, codec: EmbeddingCodec, pairs: int = 20_000, queries: int = 200,
+                 k: int = 10, seed: int = 0) -> Dict[str, Any]:
+    """
+    Measures how far cosine similarities under ``codec`` drift from full precision.
+
+    Reports absolute similarity error over random pairs, top-``k`` neighbour
+    recall for random queries, and the storage cost per vector.
+    """
+    full = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    stored = codec.round_trip(full)
+    rng = np.random.default_rng(seed)
+    n = full.shape[0]
+
+    left = rng.integers(0, n, pairs)
+    right = rng.integers(0, n, pairs)
+    exact = np.einsum("ij,ij->i", full[left], full[right])
+    approx = np.einsum("ij,ij->i", stored[left], stored[right])
+    errors = np.abs(exact - approx)
+
+    k = min(k, n - 1)
+    recalls = []
+    for q in rng.choice(n, min(queries, n), replace=False):
+        truth = np.argsort(-(full @ full[q]))[1:k + 1]
+        found = np.argsort(-(stored @ codec.project(full[q])))[1:k + 1]
+        recalls.append(len(set(truth) & set(found)) / k if k else 1.0)
+
+    full_bytes = full.shape[1] * 4
+    stored_bytes = codec.output_dim(full.shape[1]) * np.dtype(codec.dtype).itemsize
+    return {
+        "codec": codec.fingerprint(),
+        "vectors": n,
+        "pairs": pairs,
+        "meanAbsError": round(float(errors.mean()), 6),
+        "p99AbsError": round(float(np.percentile(errors, 99)), 6),
+        "maxAbsError": round(float(errors.max()), 6),
+        f"recallAt{k}": round(float(np.mean(recalls)), 4),
+        "bytesPerVector": stored_bytes,
+        "compression": round(full_bytes / stored_bytes, 2),
+    }
+
+
+def load_embeddings(path: str) -> np.ndarray:
+    """
+    Reads an (n, dim) .npy file or one encoder's embedding cache directory.
+
+    The cache keeps each encoder's rows in its own subdirectory of
+    PLACIFY_EMBEDDING_CACHE_DIR named by encoder_backend.encoder_id (e.g.
+    all-MiniLM-L6-v2@torch, with "/" in the model name written as "__");
+    pass that subdirectory, not the cache root.
+    """
+    if os.path.isdir(path):
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            stores = sorted(
+                name for name in os.listdir(path) if os.path.exists(os.path.join(path, name, "meta.json"))
+            )
+            raise ValueError(f"{path} is not an embedding store; pick one of its encoder directories: {stores}")
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("codec", "float32") != "float32":
+            raise ValueError(f"{path} is already stored as {meta['codec']}; fit on full-precision vectors")
+        return np.fromfile(os.path.join(path, "embeddings.f32"), dtype=np.float32).reshape(-1, int(meta["dim"]))
+    return np.load(path, mmap_mode="r")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fit and evaluate embedding storage codecs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fit = sub.add_parser("fit", help="Fit a PCA codec on a corpus of embeddings")
+    fit.add_argument("--input", required=True, help=".npy matrix or <cache dir>/<model>@<backend> directory")
+    fit.add_argument("--dim", type=int, required=True)
+    fit.add_argument("--dtype", default="float16", choices=DTYPES)
+    fit.add_argument("--output", required=True)
+
+    report = sub.add_parser("report", help="Similarity error of a codec versus float32")
+    report.add_argument("--input", required=True, help=".npy matrix or <cache dir>/<model>@<backend> directory")
+    report.add_argument("--codec", help="Saved PCA codec directory")
+    report.add_argument("--dtype", choices=DTYPES)
+    report.add_argument("--pairs", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    embeddings = load_embeddings(args.input)
+    if args.command == "fit":
+        codec = EmbeddingCodec.fit_pca(embeddings, args.dim, args.dtype)
+        codec.save(args.output)
+        print(json.dumps(error_report(embeddings, codec), indent=2))
+        return 0
+
+    codec = EmbeddingCodec.load(args.codec, args.dtype) if args.codec else EmbeddingCodec(args.dtype or "float16")
+    print(json.dumps(error_report(embeddings, codec, pairs=args.pairs), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+# Placify Encoder Backends
+# Selectable inference backends for the sentence embedding model
+#
+# Backends:
+#   torch      - sentence-transformers on PyTorch (default)
+#   onnx       - ONNX export of the same model run with onnxruntime
+#   onnx-int8  - the ONNX export with dynamic int8 weight quantization
+#
+# Select with PLACIFY_ENCODER_BACKEND. The ONNX files are exported once into
+# PLACIFY_ONNX_DIR (needs torch + transformers for that one step); afterwards the
+# onnx backends only need onnxruntime and a tokenizer.
+#
+# Usage:
+#   python encoder_backend.py export --quantize
+#   python encoder_backend.py parity --backend onnx-int8
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import importlib.util
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, exports still publish atomically
+    fcntl = None
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_BACKEND = os.environ.get("PLACIFY_ENCODER_BACKEND", "torch")
+ONNX_CACHE_DIR = os.environ.get(
+    "PLACIFY_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "placify", "onnx")
+)
+
+# sentence-transformers truncates all-MiniLM-L6-v2 inputs at 256 tokens
+DEFAULT_MAX_SEQ_LENGTH = 256
+
+PARITY_SENTENCES = [
+    "Python developer with Django and REST API experience",
+    "Backend engineer building scalable web services in Python",
+    "Machine learning is a subset of artificial intelligence",
+    "ML is a branch of AI that enables computers to learn",
+    "The sky is blue",
+    "Frontend developer skilled in React, hooks and state management",
+]
+
+
+def _hub_name(model_name: str) -> str:
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def _onnx_dir(model_name: str) -> str:
+    return os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+
+
+def _onnx_path(model_name: str, quantized: bool) -> str:
+    return os.path.join(_onnx_dir(model_name), "model-int8.onnx" if quantized else "model.onnx")
+
+
+def encoder_id(model_name: str, backend: Optional[str] = None) -> str:
+    """
+    Names the embeddings a model produces on a backend, e.g. "all-MiniLM-L6-v2@onnx-int8".
+    Backends (int8 quantization above all) do not give identical vectors, so caches
+    and stores are keyed by this rather than by the model name alone.
+    """
+    return f"{model_name}@{backend or DEFAULT_BACKEND}"
+
+
+def backend_available(backend: Optional[str] = None) -> bool:
+    """
+    Checks whether the libraries a backend needs are installed, without importing them.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == "torch":
+        return importlib.util.find_spec("sentence_transformers") is not None
+    return (
+        importlib.util.find_spec("onnxruntime") is not None
+        and importlib.util.find_spec("transformers") is not None
+    )
+
+
+class OnnxSentenceEncoder:
+    """
+    Minimal SentenceTransformer stand-in backed by onnxruntime.
+
+    Reproduces the all-MiniLM-L6-v2 pipeline (tokenize, transformer, attention-masked
+    mean pooling) and exposes the subset of ``encode`` that Placify uses.
+    """
+
+    def __init__(self, model_dir: str, model_file: str, max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.max_seq_length = max_seq_length
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **kwargs,
+    ) -> np.ndarray:
+        """
+        Returns float32 embeddings; a single string gives a 1-D vector.
+        ``convert_to_numpy``/``convert_to_tensor`` are accepted and ignored.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+            if "token_type_ids" in self.input_names and "token_type_ids" not in feeds:
+                feeds["token_type_ids"] = np.zeros_like(feeds["input_ids"])
+            hidden = self.session.run(None, feeds)[0]
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled.astype(np.float32))
+        embeddings = np.vstack(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings and embeddings.size:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+@contextmanager
+def _export_lock(output_dir: str):
+    """
+    Exclusive cross-process lock for an export directory (no-op without fcntl).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(output_dir, ".lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _export_fp32(model_name: str, output_dir: str, opset: int):
+    """
+    Writes the tokenizer files and model.onnx for ``model_name`` into ``output_dir``.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(_hub_name(model_name))
+    model = AutoModel.from_pretrained(_hub_name(model_name)).eval()
+    tokenizer.save_pretrained(output_dir)
+    dummy = tokenizer(["export"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            os.path.join(output_dir, "model.onnx"),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+
+def _quantize_int8(fp32_path: str, int8_path: str):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+
+def export_onnx(model_name: str, quantize: bool = False, opset: int = 14) -> str:
+    """
+    Exports ``model_name`` to ONNX (and optionally int8) under PLACIFY_ONNX_DIR.
+    Returns the path of the requested model file. Existing exports are reused.
+
+    Pool workers warming up together all end up here: one exports while holding
+    the directory lock, the rest wait for it and load the finished files. Files
+    are written in a temporary directory and moved into place, model file last,
+    so a model path that exists is always complete.
+    """
+    output_dir = _onnx_dir(model_name)
+    fp32_path = _onnx_path(model_name, quantized=False)
+    int8_path = _onnx_path(model_name, quantized=True)
+    target = int8_path if quantize else fp32_path
+    if os.path.exists(target):
+        return target
+
+    with _export_lock(output_dir):
+        staging = tempfile.mkdtemp(prefix=".export-", dir=output_dir)
+        try:
+            if not os.path.exists(fp32_path):
+                _export_fp32(model_name, staging, opset)
+                names = sorted(os.listdir(staging), key=lambda name: name == "model.onnx")
+                for name in names:
+                    os.replace(os.path.join(staging, name), os.path.join(output_dir, name))
+            if quantize and not os.path.exists(int8_path):
+                staged = os.path.join(staging, os.path.basename(int8_path))
+                _quantize_int8(fp32_path, staged)
+                os.replace(staged, int8_path)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    return target
+
+
+def load_encoder(model_name: str, backend: Optional[str] = None):
+    """
+    Returns an object with a SentenceTransformer-compatible ``encode`` for ``backend``.
+    Raises ImportError if the backend's libraries are not installed.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}; expected one of {BACKENDS}")
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(model_name)
+
+    if not backend_available(backend):
+        raise ImportError("onnxruntime and transformers are required for the ONNX backends")
+    model_path = export_onnx(model_name, quantize=backend == "onnx-int8")
+    return OnnxSentenceEncoder(os.path.dirname(model_path), os.path.basename(model_path))
+
+
+def check_parity(
+    model_name: str, backend: str, sentences: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Compares ``backend`` against the PyTorch reference on ``sentences``.
+
+    Reports the lowest per-sentence cosine between the two backends' embeddings and
+    the largest absolute difference in pairwise similarity scores (the numbers that
+    end up in match and answer scores).
+    """
+    sentences = sentences or PARITY_SENTENCES
+    reference = load_encoder(model_name, "torch").encode(
+        sentences, convert_to_numpy=True, normalize_embeddings=True
+    )
+    candidate = load_encoder(model_name, backend).encode(
+        sentences, convert_to_numpy=True, normalize_embeddings=True
+    )
+    embedding_cosine = np.sum(reference * candidate, axis=1)
+    score_error = np.abs(reference @ reference.T - candidate @ candidate.T)
+    return {
+        "model": model_name,
+        "backend": backend,
+        "sentences": len(sentences),
+        "minEmbeddingCosine": round(float(embedding_cosine.min()), 6),
+        "maxScoreError": round(float(score_error.max()), 6),
+        "meanScoreError": round(float(score_error.mean()), 6),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encoder backend tools")
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--quantize", action="store_true", help="Also write the int8 model")
+    parser.add_argument("--backend", default="onnx", choices=BACKENDS[1:])
+    parser.add_argument(
+        "--max-error", type=float, default=0.02, help="Parity fails above this score error"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        print(export_onnx(args.model, quantize=args.quantize))
+        return 0
+
+    report = check_parity(args.model, args.backend)
+    print(json.dumps(report, indent=2))
+    return 0 if report["maxScoreError"] <= args.max_error else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
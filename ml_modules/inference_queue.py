@@ -0,0 +1,187 @@
+# Placify Inference Queue
+# Micro-batching front for a shared sentence embedding model
+#
+# Threaded request handlers that each encode one or two sentences leave most of
+# the CPU's vector width idle and contend on the model's intra-op threads. The
+# BatchingEncoder collects concurrent requests for up to max_wait_ms (or until
+# max_batch_size sentences are waiting), runs one forward pass on a single
+# background thread, and resolves each caller's future.
+#
+# It exposes the same ``encode`` as SentenceTransformer, so it can replace the
+# model object directly, plus ``encode_async`` for asyncio code.
+#
+# Configure with PLACIFY_ENCODE_MAX_BATCH and PLACIFY_ENCODE_MAX_WAIT_MS.
+
+import os
+import time
+import queue
+import asyncio
+import weakref
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Union
+
+import numpy as np
+
+DEFAULT_MAX_BATCH_SIZE = int(os.environ.get("PLACIFY_ENCODE_MAX_BATCH", "64"))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("PLACIFY_ENCODE_MAX_WAIT_MS", "2"))
+
+_STOP = object()
+
+# Live encoders, restarted in forked children (see _restart_after_fork)
+_encoders = weakref.WeakSet()
+
+
+class BatchingEncoder:
+    """
+    Thread-safe micro-batching wrapper around a model with a SentenceTransformer-style ``encode``.
+    """
+
+    def __init__(self, model, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._start()
+        _encoders.add(self)
+
+    def _start(self):
+        """
+        (Re)creates the queue, lock, counters and worker thread.
+        """
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._encoded = 0
+        self._max_batch = 0
+        self._max_depth = 0
+        self._thread = threading.Thread(target=self._run, name="placify-encoder", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queues one sentence; the future resolves to its unnormalized float32 embedding.
+        """
+        future = Future()
+        self._queue.put((text, future))
+        depth = self._queue.qsize()
+        with self._lock:
+            self._max_depth = max(self._max_depth, depth)
+        return future
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        **kwargs,
+    ) -> np.ndarray:
+        """
+        Blocking encode through the queue. ``batch_size`` is ignored; batches
+        are formed from everything queued at the time.
+        """
+        single = isinstance(sentences, str)
+        futures = [self.submit(text) for text in ([sentences] if single else sentences)]
+        return self._collect([f.result() for f in futures], single, normalize_embeddings)
+
+    async def encode_async(
+        self, sentences: Union[str, List[str]], normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        """
+        Awaitable encode for asyncio code; the event loop is not blocked while waiting.
+        """
+        single = isinstance(sentences, str)
+        futures = [asyncio.wrap_future(self.submit(text)) for text in ([sentences] if single else sentences)]
+        return self._collect(await asyncio.gather(*futures), single, normalize_embeddings)
+
+    @staticmethod
+    def _collect(vectors, single: bool, normalize: bool) -> np.ndarray:
+        embeddings = np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+        if normalize and embeddings.size:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+    def _next_batch(self):
+        """
+        Blocks for the first request, then gathers more until the batch is full
+        or max_wait has passed. Returns None once close() was called.
+        """
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            # Identical sentences in one batch are encoded once
+            unique = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                embeddings = np.asarray(
+                    self.model.encode(unique, batch_size=len(unique), convert_to_numpy=True),
+                    dtype=np.float32,
+                )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            rows = {text: row for row, text in enumerate(unique)}
+            for text, future in batch:
+                future.set_result(embeddings[rows[text]])
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._encoded += len(unique)
+                self._max_batch = max(self._max_batch, len(batch))
+
+    def close(self, timeout: float = 5.0):
+        """
+        Stops the worker thread after the requests already queued are served.
+        """
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queueDepth": self._queue.qsize(),
+                "maxQueueDepth": self._max_depth,
+                "batches": self._batches,
+                "items": self._items,
+                "encoded": self._encoded,
+                "meanBatchSize": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "maxBatchSize": self._max_batch,
+            }
+
+
+def _restart_after_fork():
+    """
+    A forked child inherits the encoder but not its worker thread, and may
+    inherit the queue and lock mid-use; give every encoder fresh ones.
+    Requests queued in the parent at fork time stay with the parent.
+    """
+    for encoder in list(_encoders):
+        encoder._start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
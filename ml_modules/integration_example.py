@@ -364,7 +364,26 @@ def main():
 
 if __name__ == "__main__":
     # Handle command line arguments for backend integration
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == "--stdin":
+        # One length-prefixed msgpack/JSON frame on stdin (see wire_protocol.py);
+        # avoids argv size limits for large payloads
+        import contextlib
+        from wire_protocol import read_frame, write_frame
+
+        codec = None
+        try:
+            frame = read_frame(sys.stdin.buffer)
+            if frame is None:
+                raise ValueError("No request frame on stdin")
+            analysis_data, codec = frame
+            # Keep stdout clean for the response frame
+            with contextlib.redirect_stdout(sys.stderr):
+                service = InterviewAnalysisService()
+                result = service.analyze_interview_response(**analysis_data)
+        except Exception as e:
+            result = {"status": "error", "error": str(e)}
+        write_frame(sys.stdout.buffer, result, codec)
+    elif len(sys.argv) > 1:
         try:
             # Parse analysis data from command line (for Express.js integration)
             analysis_data = json.loads(sys.argv[1])
@@ -0,0 +1,100 @@
+# Placify Job Index
+# Precomputed job embeddings for top-k job recommendations
+
+import os
+import json
+from typing import Dict, Any, List, Optional
+
+import main_analyzer
+from vector_index import VectorIndex
+
+# Written next to the vectors by save(): the encoder and codec they came from
+SPACE_FILE = "vector_space.json"
+
+
+def job_id_of(job: Dict[str, Any]) -> str:
+    """
+    Returns the id used to key a job document in the index.
+    """
+    job_id = job.get("_id", job.get("id"))
+    if job_id is None:
+        raise ValueError("Job document has no '_id' or 'id'")
+    return str(job_id)
+
+
+class JobIndex:
+    """
+    Embedding index over extract_job_description outputs.
+
+    Example:
+        index = JobIndex()
+        index.add_jobs(open_jobs)
+        index.top_k_jobs(resume, k=10)
+    """
+
+    def __init__(self, index: Optional[VectorIndex] = None):
+        self.index = index or VectorIndex()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def add_job(self, job: Dict[str, Any]):
+        """
+        Adds or refreshes a single job without rebuilding the index.
+        """
+        self.add_jobs([job])
+
+    def add_jobs(self, jobs: List[Dict[str, Any]]):
+        """
+        Adds or refreshes jobs with one batched encode.
+        Raises RuntimeError(main_analyzer.MODEL_UNAVAILABLE) if there is no model.
+        """
+        if not jobs:
+            return
+        texts = [main_analyzer.extract_job_description(job) for job in jobs]
+        self.index.add_many([job_id_of(job) for job in jobs], main_analyzer.encode_texts(texts))
+
+    def remove_job(self, job_id: str) -> bool:
+        return self.index.remove(str(job_id))
+
+    def top_k_jobs(self, resume: Dict[str, Any], k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Returns the ``k`` indexed jobs most similar to ``resume``, best first.
+        """
+        if len(self.index) == 0 or not main_analyzer.get_model():
+            return []
+        resume_emb = main_analyzer.encode_text(
+            main_analyzer.extract_resume_skills_experience(resume)
+        )
+        return [
+            {"jobId": job_id, "similarity": round(similarity, 4), "matchScore": int(similarity * 100)}
+            for job_id, similarity in self.index.search(resume_emb, k)
+        ]
+
+    def save(self, directory: str):
+        self.index.save(directory)
+        with open(os.path.join(directory, SPACE_FILE), "w") as f:
+            json.dump(main_analyzer.vector_space(), f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "JobIndex":
+        """
+        Loads an index saved by ``save``.
+
+        Raises:
+            ValueError: If it was built with another encoder (model@backend) or
+                codec than main_analyzer now uses, or predates recording them;
+                rebuild it with add_jobs
+        """
+        space_path = os.path.join(directory, SPACE_FILE)
+        recorded = None
+        if os.path.exists(space_path):
+            with open(space_path, "r") as f:
+                recorded = json.load(f)
+        expected = main_analyzer.vector_space()
+        if recorded != expected:
+            raise ValueError(
+                f"Job index at {directory} was built for {recorded or 'an unrecorded encoder'}, "
+                f"not {expected}; rebuild it"
+            )
+        return cls(VectorIndex.load(directory, mmap=mmap))
@@ -2,17 +2,136 @@
 # AI-driven resume analysis and job matching using NLP embeddings
 
 import os
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional
 
-try:
-    from sentence_transformers import SentenceTransformer, util
-except ImportError:
-    SentenceTransformer = None
-    util = None
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+from encoder_backend import DEFAULT_BACKEND, encoder_id, load_encoder
+from match_timing import NULL_TIMER, PROFILE_DIR, StageTimer, profiled, timings_requested
 
 # Load SBERT model (can be replaced with other embedding models)
 MODEL_NAME = "all-MiniLM-L6-v2"
-model = SentenceTransformer(MODEL_NAME) if SentenceTransformer else None
+
+ENCODE_BATCH_SIZE = 64
+
+MODEL_UNAVAILABLE = "NLP model not available"
+
+# How resume embeddings are pooled into one similarity per job:
+#   "concat"   - one embedding of the whole resume text (original behaviour)
+#   "mean"     - cosine with the mean of the section embeddings
+#   "max"      - best single section
+#   "top3"     - average of the three best sections
+POOLING_RULES = ("concat", "mean", "max", "top3")
+DEFAULT_POOLING = os.environ.get("PLACIFY_MATCH_POOLING", "concat")
+
+# The model (and torch) is loaded on first use, not at import time
+_model = None
+_model_initialized = False
+_model_lock = threading.Lock()
+_embedding_cache = None
+
+
+def get_model() -> Optional[Any]:
+    """
+    Returns the shared sentence encoder, loading it on first call.
+    The backend (PyTorch or ONNX Runtime) comes from PLACIFY_ENCODER_BACKEND.
+    Returns None if the backend's libraries are not installed.
+    """
+    global _model, _model_initialized
+    if not _model_initialized:
+        with _model_lock:
+            if not _model_initialized:
+                try:
+                    _model = load_encoder(MODEL_NAME)
+                except ImportError:
+                    _model = None
+                _model_initialized = True
+    return _model
+
+
+def require_model() -> Any:
+    """
+    Returns the shared sentence encoder, raising RuntimeError(MODEL_UNAVAILABLE)
+    when the backend's libraries are not installed.
+    """
+    model = get_model()
+    if model is None:
+        raise RuntimeError(MODEL_UNAVAILABLE)
+    return model
+
+
+def vector_space() -> Dict[str, str]:
+    """
+    Identifies the space embeddings from encode_texts live in: the encoder
+    (model and backend) and the storage codec. Saved indexes record it so they
+    are not searched with vectors from another space.
+    """
+    return {"encoder": encoder_id(MODEL_NAME), "codec": get_embedding_cache().codec.fingerprint()}
+
+
+def warmup() -> bool:
+    """
+    Loads the model and runs one encode so the first real match is fast.
+    Returns True if a model is available.
+    """
+    model = get_model()
+    if model is None:
+        return False
+    model.encode("warmup", convert_to_numpy=True)
+    return True
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Returns the process-wide embedding cache for MODEL_NAME on the configured backend.
+    Sized by PLACIFY_EMBEDDING_CACHE_SIZE; PLACIFY_EMBEDDING_CACHE_DIR enables the disk tier.
+    """
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _model_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(encoder_id(MODEL_NAME))
+    return _embedding_cache
+
+
+def encode_text(text: str) -> np.ndarray:
+    """
+    Returns the unit-normalized embedding of ``text``, served from the cache when possible.
+    Raises RuntimeError(MODEL_UNAVAILABLE) if there is no model.
+    """
+    model = require_model()
+    return get_embedding_cache().get_or_compute(
+        text,
+        lambda t: model.encode(t, convert_to_numpy=True, normalize_embeddings=True),
+    )
+
+
+def encode_texts(texts: List[str], batch_size: int = ENCODE_BATCH_SIZE, timer=NULL_TIMER) -> np.ndarray:
+    """
+    Returns an (n, dim) matrix of unit-normalized embeddings for ``texts``.
+    Cache misses are encoded together in batched ``model.encode`` calls.
+    Raises RuntimeError(MODEL_UNAVAILABLE) if there is no model.
+    """
+    model = require_model()
+    return get_embedding_cache().get_or_compute_many(
+        texts,
+        lambda missing: model.encode(
+            missing,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ),
+        counters=timer,
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatibility for callers reading ``main_analyzer.model``
+    if name == "model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def extract_resume_skills_experience(resume: Dict[str, Any]) -> str:
@@ -33,6 +152,28 @@ def extract_resume_skills_experience(resume: Dict[str, Any]) -> str:
     return ", ".join([summary, skills] + experience + projects + education)
 
 
+def extract_resume_sections(resume: Dict[str, Any]) -> List[str]:
+    """
+    Splits a resume into independently embeddable sections: summary, skills, one per
+    work entry, one per project, and education. Empty sections are dropped.
+    """
+    sections = [resume.get("summary", ""), ", ".join(resume.get("skills", []))]
+    for work in resume.get("workExperience", []):
+        if any(work.get(field) for field in ("role", "company", "description")):
+            sections.append(f"{work.get('role', '')} at {work.get('company', '')}: {work.get('description', '')}")
+    for proj in resume.get("projects", []):
+        if any(proj.get(field) for field in ("title", "description")):
+            sections.append(f"{proj.get('title', '')}: {proj.get('description', '')}")
+    education = [
+        f"{edu.get('degree', '')} at {edu.get('institution', '')}"
+        for edu in resume.get("education", [])
+        if edu.get("degree") or edu.get("institution")
+    ]
+    sections.append(", ".join(education))
+    sections = [section for section in sections if section.strip()]
+    return sections or [extract_resume_skills_experience(resume)]
+
+
 def extract_job_description(job: Dict[str, Any]) -> str:
     """
     Normalizes job description, requirements, and responsibilities into a single string.
@@ -45,18 +186,14 @@ def extract_job_description(job: Dict[str, Any]) -> str:
     return ", ".join([title, domain, desc, requirements, responsibilities])
 
 
-def compute_resume_job_match_score(resume: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, Any]:
+def _model_unavailable_result() -> Dict[str, Any]:
+    return {"matchScore": 0, "feedback": MODEL_UNAVAILABLE, "missingSkills": [], "suggestions": []}
+
+
+def _build_match_result(resume: Dict[str, Any], job: Dict[str, Any], similarity: float) -> Dict[str, Any]:
     """
-    Computes similarity score between resume and job description using NLP embeddings.
-    Returns match score, missing/weak skills, and feedback.
+    Turns a resume-job cosine similarity into the match result with skill-gap feedback.
     """
-    resume_text = extract_resume_skills_experience(resume)
-    job_text = extract_job_description(job)
-    if not model:
-        return {"matchScore": 0, "feedback": "NLP model not available", "missingSkills": [], "suggestions": []}
-    resume_emb = model.encode(resume_text, convert_to_tensor=True)
-    job_emb = model.encode(job_text, convert_to_tensor=True)
-    similarity = util.pytorch_cos_sim(resume_emb, job_emb).item()
     match_score = int(similarity * 100)
 
     # Skill gap analysis
@@ -82,6 +219,71 @@ def compute_resume_job_match_score(resume: Dict[str, Any], job: Dict[str, Any])
     }
 
 
+def _pool_section_similarities(section_sims: np.ndarray, section_embs: np.ndarray, job_matrix: np.ndarray, pooling: str) -> np.ndarray:
+    """
+    Reduces an (sections, jobs) similarity block for one resume to one score per job.
+    """
+    if pooling == "max":
+        return section_sims.max(axis=0)
+    if pooling == "top3":
+        top = min(3, section_sims.shape[0])
+        return np.sort(section_sims, axis=0)[-top:].mean(axis=0)
+    pooled = section_embs.mean(axis=0)
+    norm = np.linalg.norm(pooled)
+    return job_matrix @ (pooled / norm) if norm > 0 else np.zeros(job_matrix.shape[0], dtype=np.float32)
+
+
+def resume_job_similarities(resumes: List[Dict[str, Any]], jobs: List[Dict[str, Any]], pooling: Optional[str] = None, timer=NULL_TIMER) -> np.ndarray:
+    """
+    Returns a (len(resumes), len(jobs)) cosine similarity matrix.
+
+    With a section pooling rule, every resume section is embedded separately (and
+    cached by its own content hash), so editing one project re-encodes one section.
+    """
+    pooling = pooling or DEFAULT_POOLING
+    if pooling not in POOLING_RULES:
+        raise ValueError(f"Unknown pooling rule {pooling!r}; expected one of {POOLING_RULES}")
+    with timer.stage("extract"):
+        job_texts = [extract_job_description(job) for job in jobs]
+        if pooling == "concat":
+            per_resume = [[extract_resume_skills_experience(resume)] for resume in resumes]
+        else:
+            per_resume = [extract_resume_sections(resume) for resume in resumes]
+        resume_texts = [text for texts in per_resume for text in texts]
+    with timer.stage("encode"):
+        job_matrix = encode_texts(job_texts, timer=timer)
+        resume_matrix = encode_texts(resume_texts, timer=timer)
+
+    with timer.stage("similarity"):
+        # Embeddings are unit-normalized, so the dot product is the cosine similarity
+        if pooling == "concat":
+            return resume_matrix @ job_matrix.T
+        section_sims = resume_matrix @ job_matrix.T
+        similarities = np.zeros((len(resumes), len(jobs)), dtype=np.float32)
+        start = 0
+        for row, sections in enumerate(per_resume):
+            stop = start + len(sections)
+            similarities[row] = _pool_section_similarities(
+                section_sims[start:stop], resume_matrix[start:stop], job_matrix, pooling
+            )
+            start = stop
+        return similarities
+
+
+def compute_resume_job_match_score(resume: Dict[str, Any], job: Dict[str, Any], pooling: Optional[str] = None, timer=NULL_TIMER) -> Dict[str, Any]:
+    """
+    Computes similarity score between resume and job description using NLP embeddings.
+    Returns match score, missing/weak skills, and feedback.
+    """
+    with timer.stage("modelLoad"):
+        model = get_model()
+    if not model:
+        return _model_unavailable_result()
+    similarity = float(resume_job_similarities([resume], [job], pooling, timer)[0, 0])
+    with timer.stage("skillGap"):
+        return _build_match_result(resume, job, similarity)
+
+
 def recommend_learning_modules(missing_skills: List[str]) -> List[str]:
     """
     Suggests learning modules or assessments based on missing skills.
@@ -92,15 +294,68 @@ def recommend_learning_modules(missing_skills: List[str]) -> List[str]:
     return modules
 
 
-def analyze_resume_job_match(resume: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_resume_job_match(resume: Dict[str, Any], job: Dict[str, Any], pooling: Optional[str] = None, timings: Optional[bool] = None, profile_dir: Optional[str] = None) -> Dict[str, Any]:
     """
     Main entry point for backend to call for resume-job matching analysis.
+
+    With ``timings`` (or PLACIFY_MATCH_TIMINGS=1) the result carries a ``_timings``
+    dict with per-stage wall time, cache hits/misses, batch size and model backend.
+    ``profile_dir`` (or PLACIFY_MATCH_PROFILE_DIR) also dumps a cProfile .pstats file.
     """
-    match_result = compute_resume_job_match_score(resume, job)
-    learning_recommendations = recommend_learning_modules(match_result.get("missingSkills", []))
-    match_result["learningRecommendations"] = learning_recommendations
+    if not timings_requested(timings):
+        match_result = compute_resume_job_match_score(resume, job, pooling)
+        return _with_learning_recommendations(match_result)
+
+    timer = StageTimer()
+    with profiled(profile_dir or PROFILE_DIR) as profile_path:
+        match_result = compute_resume_job_match_score(resume, job, pooling, timer)
+        with timer.stage("learningRecommendations"):
+            match_result = _with_learning_recommendations(match_result)
+    timer.set("modelBackend", DEFAULT_BACKEND)
+    timer.set("pooling", pooling or DEFAULT_POOLING)
+    if profile_path:
+        timer.set("profileFile", profile_path)
+    match_result["_timings"] = timer.as_dict()
     return match_result
 
+
+def _with_learning_recommendations(match_result: Dict[str, Any]) -> Dict[str, Any]:
+    match_result["learningRecommendations"] = recommend_learning_modules(match_result.get("missingSkills", []))
+    return match_result
+
+
+def analyze_resume_job_matches(resume: Dict[str, Any], jobs: List[Dict[str, Any]], pooling: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Matches one resume against many jobs with batched encoding and one matrix product.
+    Returns one result per job, in order, identical in shape to analyze_resume_job_match.
+    """
+    if not jobs:
+        return []
+    if not get_model():
+        return [_with_learning_recommendations(_model_unavailable_result()) for _ in jobs]
+    similarities = resume_job_similarities([resume], jobs, pooling)[0]
+    return [
+        _with_learning_recommendations(_build_match_result(resume, job, float(similarity)))
+        for job, similarity in zip(jobs, similarities)
+    ]
+
+
+def analyze_job_resume_matches(job: Dict[str, Any], resumes: List[Dict[str, Any]], pooling: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Matches many resumes against one job; the mirror of analyze_resume_job_matches.
+    Returns one result per resume, in order.
+    """
+    if not resumes:
+        return []
+    if not get_model():
+        return [_with_learning_recommendations(_model_unavailable_result()) for _ in resumes]
+    similarities = resume_job_similarities(resumes, [job], pooling)[:, 0]
+    return [
+        _with_learning_recommendations(_build_match_result(resume, job, float(similarity)))
+        for resume, similarity in zip(resumes, similarities)
+    ]
+
 # Example usage:
 # result = analyze_resume_job_match(resume_dict, job_dict)
+# results = analyze_resume_job_matches(resume_dict, [job_dict, ...])
 # print(result)
\ No newline at end of file
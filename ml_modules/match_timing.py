@@ -0,0 +1,104 @@
+# Placify Match Timing
+# Optional per-stage instrumentation and cProfile dumps for resume-job matching
+#
+# Enable per call with analyze_resume_job_match(..., timings=True) or for the whole
+# process with PLACIFY_MATCH_TIMINGS=1. Set PLACIFY_MATCH_PROFILE_DIR to also write
+# one cProfile/pstats file per instrumented request.
+
+import os
+import time
+import cProfile
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, Optional
+
+TIMINGS_ENABLED = os.environ.get("PLACIFY_MATCH_TIMINGS", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.environ.get("PLACIFY_MATCH_PROFILE_DIR") or None
+
+_profile_counter = 0
+_profile_lock = threading.Lock()
+
+
+class StageTimer:
+    """
+    Accumulates wall time per named stage plus free-form counters.
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.info: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def count(self, name: str, amount: int = 1):
+        self.info[name] = self.info.get(name, 0) + amount
+
+    def set(self, name: str, value: Any):
+        self.info[name] = value
+
+    def as_dict(self) -> Dict[str, Any]:
+        result = {
+            "totalMs": round((time.perf_counter() - self._started) * 1000, 3),
+            "stagesMs": {name: round(ms, 3) for name, ms in self.stages.items()},
+        }
+        result.update(self.info)
+        return result
+
+
+class NullTimer:
+    """
+    Do-nothing timer used when instrumentation is off.
+    """
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+    def set(self, name: str, value: Any):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+def timings_requested(flag: Optional[bool]) -> bool:
+    """
+    An explicit per-request flag wins; otherwise PLACIFY_MATCH_TIMINGS decides.
+    """
+    return TIMINGS_ENABLED if flag is None else bool(flag)
+
+
+@contextmanager
+def profiled(profile_dir: Optional[str], label: str = "match"):
+    """
+    Runs the block under cProfile and dumps a .pstats file into ``profile_dir``.
+    Yields the file path, or None when profiling is off.
+    """
+    if not profile_dir:
+        yield None
+        return
+    global _profile_counter
+    with _profile_lock:
+        _profile_counter += 1
+        sequence = _profile_counter
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(
+        profile_dir, f"{label}-{int(time.time() * 1000)}-{os.getpid()}-{sequence}.pstats"
+    )
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield path
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,197 @@
+# Placify Resume Index
+# Reverse candidate search: top-k resumes for a job posting
+
+from typing import Dict, Any, List, Optional, Set
+
+import main_analyzer
+from vector_index import IVFVectorIndex
+
+DEFAULT_INSTITUTION = "unassigned"
+
+# Indexes larger than this switch every shard to approximate (IVF) search
+APPROXIMATE_THRESHOLD = 1_000_000
+
+
+def resume_id_of(resume: Dict[str, Any]) -> str:
+    """
+    Returns the id used to key a resume document in the index.
+    """
+    resume_id = resume.get("_id", resume.get("id"))
+    if resume_id is None:
+        raise ValueError("Resume document has no '_id' or 'id'")
+    return str(resume_id)
+
+
+def institution_of(resume: Dict[str, Any]) -> str:
+    """
+    Picks the shard for a resume: an explicit institution, else the first education entry.
+    """
+    institution = resume.get("institution")
+    if not institution:
+        for edu in resume.get("education", []):
+            if edu.get("institution"):
+                institution = edu["institution"]
+                break
+    return str(institution or DEFAULT_INSTITUTION)
+
+
+class ResumeIndex:
+    """
+    Embedding index over extract_resume_skills_experience outputs, sharded by institution.
+
+    Each shard is an IVFVectorIndex. Shards are searched exactly until the whole
+    index grows past ``approximate_threshold`` rows; from then on every shard is
+    clustered and only ``nprobe`` cells are scored per shard and query. ``nlist``
+    (default: the square root of the index size) is the cell count across all
+    shards, split in proportion to shard size so cells hold about as many rows in
+    a small shard as in a large one.
+    """
+
+    def __init__(
+        self,
+        approximate_threshold: int = APPROXIMATE_THRESHOLD,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+    ):
+        self.approximate_threshold = approximate_threshold
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.shards: Dict[str, IVFVectorIndex] = {}
+        self._institution: Dict[str, str] = {}
+        self._skills: Dict[str, Set[str]] = {}
+        self._by_skill: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._institution)
+
+    def _shard(self, institution: str) -> IVFVectorIndex:
+        shard = self.shards.get(institution)
+        if shard is None:
+            shard = self.shards[institution] = IVFVectorIndex(nprobe=self.nprobe)
+        return shard
+
+    def upsert_resumes(self, resumes: List[Dict[str, Any]]):
+        """
+        Inserts new resumes or re-embeds updated ones, one shard at a time.
+        Raises RuntimeError(main_analyzer.MODEL_UNAVAILABLE) if there is no model.
+        """
+        if not resumes:
+            return
+        embeddings = main_analyzer.encode_texts(
+            [main_analyzer.extract_resume_skills_experience(resume) for resume in resumes]
+        )
+        by_shard: Dict[str, List[int]] = {}
+        for position, resume in enumerate(resumes):
+            resume_id = resume_id_of(resume)
+            institution = institution_of(resume)
+            previous = self._institution.get(resume_id)
+            if previous is not None and previous != institution:
+                self.shards[previous].remove(resume_id)
+            self._unindex_skills(resume_id)
+            skills = set(s.lower() for s in resume.get("skills", []))
+            self._skills[resume_id] = skills
+            for skill in skills:
+                self._by_skill.setdefault(skill, set()).add(resume_id)
+            self._institution[resume_id] = institution
+            by_shard.setdefault(institution, []).append(position)
+
+        for institution, positions in by_shard.items():
+            shard = self._shard(institution)
+            shard.add_many([resume_id_of(resumes[p]) for p in positions], embeddings[positions])
+        if len(self) > self.approximate_threshold:
+            self._train_shards()
+
+    def _train_shards(self):
+        """
+        Clusters every shard not yet trained, giving each its share of ``nlist``.
+        """
+        nlist = self.nlist or int(len(self) ** 0.5)
+        for shard in self.shards.values():
+            if not shard.trained and len(shard):
+                shard.train(max(1, round(nlist * len(shard) / len(self))))
+
+    def upsert_resume(self, resume: Dict[str, Any]):
+        self.upsert_resumes([resume])
+
+    def remove_resume(self, resume_id: str) -> bool:
+        resume_id = str(resume_id)
+        institution = self._institution.pop(resume_id, None)
+        if institution is None:
+            return False
+        self._unindex_skills(resume_id)
+        self._skills.pop(resume_id, None)
+        return self.shards[institution].remove(resume_id)
+
+    def _unindex_skills(self, resume_id: str):
+        for skill in self._skills.get(resume_id, ()):
+            holders = self._by_skill.get(skill)
+            if holders is not None:
+                holders.discard(resume_id)
+                if not holders:
+                    del self._by_skill[skill]
+
+    def _skill_candidates(self, required: Set[str]) -> Set[str]:
+        """
+        Resume ids holding every skill in ``required`` (the same lowercase set
+        comparison compute_resume_job_match_score uses for missing skills).
+        """
+        holders = [self._by_skill.get(skill, set()) for skill in required]
+        holders.sort(key=len)
+        candidates = set(holders[0]) if holders else set()
+        for other in holders[1:]:
+            candidates &= other
+        return candidates
+
+    def top_k_candidates(
+        self, job: Dict[str, Any], k: int = 10, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the ``k`` resumes most similar to ``job``, best first.
+
+        Supported ``filters``:
+            institutions (list): only search these shards
+            requireAllSkills (bool): only resumes listing every job requirement
+            requiredSkills (list): only resumes listing all of these skills
+            nprobe (int): cells to probe in approximate shards
+        """
+        filters = filters or {}
+        if len(self) == 0 or not main_analyzer.get_model():
+            return []
+        job_emb = main_analyzer.encode_text(main_analyzer.extract_job_description(job))
+        job_requirements = set(r.lower() for r in job.get("requirements", []))
+
+        required = set(s.lower() for s in filters.get("requiredSkills", []))
+        if filters.get("requireAllSkills"):
+            required |= job_requirements
+        candidates = self._skill_candidates(required) if required else None
+        if candidates is not None and not candidates:
+            return []
+
+        institutions = filters.get("institutions") or list(self.shards)
+        merged = []
+        for institution in institutions:
+            # Shards are keyed by str(institution); filters may hold ids of any type
+            institution = str(institution)
+            shard = self.shards.get(institution)
+            if shard is None or len(shard) == 0:
+                continue
+            shard_candidates = None
+            if candidates is not None:
+                shard_candidates = [i for i in candidates if self._institution[i] == institution]
+                if not shard_candidates:
+                    continue
+            merged.extend(
+                shard.search(job_emb, k, candidates=shard_candidates, nprobe=filters.get("nprobe"))
+            )
+
+        merged.sort(key=lambda item: -item[1])
+        return [
+            {
+                "resumeId": resume_id,
+                "institution": self._institution[resume_id],
+                "similarity": round(similarity, 4),
+                "matchScore": int(similarity * 100),
+                "missingSkills": sorted(job_requirements - self._skills.get(resume_id, set())),
+            }
+            for resume_id, similarity in merged[:k]
+        ]
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed embedding cache.
+
+Usage:
+    python test_embedding_cache.py
+"""
+
+import os
+import sys
+import tempfile
+import multiprocessing
+
+import numpy as np
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from embedding_cache import DiskEmbeddingStore, EmbeddingCache, embedding_key
+from encoder_backend import encoder_id
+
+
+def test_key_normalization():
+    """Whitespace-only differences share a key; the model name does not."""
+    key = embedding_key("Python,  Django\n developer", "model-a")
+    assert key == embedding_key("Python, Django developer", "model-a")
+    assert key != embedding_key("Python, Django developer", "model-b")
+    print("✅ Keys are content-addressed per model")
+
+
+def test_memory_lru_and_counters():
+    """Repeat lookups hit the LRU tier and the oldest entry is evicted."""
+    calls = []
+
+    def encode(text):
+        calls.append(text)
+        return np.ones(4, dtype=np.float32) * len(text)
+
+    cache = EmbeddingCache("test-model", max_entries=2)
+    cache.get_or_compute("resume one", encode)
+    cache.get_or_compute("resume one", encode)
+    cache.get_or_compute("job two", encode)
+    cache.get_or_compute("job three", encode)
+    cache.get_or_compute("resume one", encode)
+
+    stats = cache.stats()
+    print(f"📊 Cache stats: {stats}")
+    assert calls == ["resume one", "job two", "job three", "resume one"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+    assert stats["memoryEntries"] == 2
+
+
+def test_disk_tier_survives_restart():
+    """Embeddings written to the disk tier are served by a fresh cache."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = EmbeddingCache("test-model", cache_dir=cache_dir)
+        first.put("job text", np.arange(4, dtype=np.float32))
+
+        second = EmbeddingCache("test-model", cache_dir=cache_dir)
+        embedding = second.get("job text")
+        assert embedding is not None
+        assert np.allclose(embedding, np.arange(4))
+        assert second.stats()["diskHits"] == 1
+        print("✅ Disk tier reloaded after restart")
+
+
+def test_disk_tier_separated_by_backend():
+    """Switching encoder backend misses the cache instead of serving the other backend's rows."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        torch_cache = EmbeddingCache(encoder_id("test-model", "torch"), cache_dir=cache_dir)
+        torch_cache.put("job text", np.arange(4, dtype=np.float32))
+
+        int8_cache = EmbeddingCache(encoder_id("test-model", "onnx-int8"), cache_dir=cache_dir)
+        assert int8_cache.get("job text") is None
+        int8_cache.put("job text", np.ones(4, dtype=np.float32))
+
+        reopened = EmbeddingCache(encoder_id("test-model", "torch"), cache_dir=cache_dir)
+        assert np.allclose(reopened.get("job text"), np.arange(4))
+        assert torch_cache.disk.directory != int8_cache.disk.directory
+        print("✅ Each encoder backend keeps its own disk tier")
+
+
+def _vector_for(key):
+    return np.full(4, int(key.split("-")[1]), dtype=np.float32)
+
+
+def _write_keys(cache_dir, worker, count, start_event):
+    store = DiskEmbeddingStore(cache_dir, "test-model")
+    start_event.wait()
+    for i in range(count):
+        key = f"k-{worker * 1000 + i}"
+        store.put(key, _vector_for(key))
+        # Read back keys the other worker wrote through this (possibly stale) instance
+        other = f"k-{(1 - worker) * 1000 + i}"
+        found = store.get(other)
+        assert found is None or np.array_equal(found, _vector_for(other)), (other, found)
+
+
+def test_disk_tier_shared_between_processes():
+    """Two processes appending to one directory never share a row or misread one."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        DiskEmbeddingStore(cache_dir, "test-model").put("k-9999", _vector_for("k-9999"))
+        context = multiprocessing.get_context("spawn")
+        start_event = context.Event()
+        workers = [
+            context.Process(target=_write_keys, args=(cache_dir, worker, 1000, start_event)) for worker in (0, 1)
+        ]
+        for process in workers:
+            process.start()
+        start_event.set()
+        for process in workers:
+            process.join(60)
+            assert process.exitcode == 0
+
+        store = DiskEmbeddingStore(cache_dir, "test-model")
+        assert len(store) == 2001
+        for key in [f"k-{w * 1000 + i}" for w in (0, 1) for i in range(1000)] + ["k-9999"]:
+            assert np.array_equal(store.get(key), _vector_for(key)), key
+        print("✅ Disk tier stays consistent with two writer processes")
+
+
+if __name__ == "__main__":
+    test_key_normalization()
+    test_memory_lru_and_counters()
+    test_disk_tier_survives_restart()
+    test_disk_tier_separated_by_backend()
+    test_disk_tier_shared_between_processes()
+    print("\n🏁 All embedding cache tests completed!")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for reduced-precision / reduced-dimension embedding storage.
+
+Usage:
+    python test_embedding_codec.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from embedding_cache import EmbeddingCache
+from embedding_codec import EmbeddingCodec, error_report, load_embeddings
+
+
+def _corpus(n=2000, dim=64, rank=8, seed=0):
+    """Unit vectors that mostly live in a low-rank subspace, like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(rank, dim))
+    vectors = rng.normal(size=(n, rank)) @ basis + 0.05 * rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_float16_and_pca_error_report():
+    corpus = _corpus()
+    half = error_report(corpus, EmbeddingCodec("float16"), pairs=5000)
+    assert half["compression"] == 2.0 and half["maxAbsError"] < 2e-3
+
+    pca = EmbeddingCodec.fit_pca(corpus, 16, "float16")
+    report = error_report(corpus, pca, pairs=5000)
+    assert report["compression"] == 8.0
+    assert report["meanAbsError"] < 0.02 and report["recallAt10"] > 0.8
+    print(f"✅ float16: {half}\n✅ pca16: {report}")
+
+
+def test_codec_save_load_and_cache():
+    corpus = _corpus(dim=32)
+    codec = EmbeddingCodec.fit_pca(corpus, 8, "float16")
+    with tempfile.TemporaryDirectory() as directory:
+        codec.save(os.path.join(directory, "codec"))
+        loaded = EmbeddingCodec.load(os.path.join(directory, "codec"))
+        assert loaded.fingerprint() == codec.fingerprint()
+
+        cache_dir = os.path.join(directory, "cache")
+        cache = EmbeddingCache("test-model", cache_dir=cache_dir, codec=loaded)
+        first = cache.get_or_compute("resume", lambda _: corpus[0])
+        assert first.dtype == np.float32 and first.shape == (8,)
+        assert np.array_equal(cache.get("resume"), first)
+        assert os.path.getsize(os.path.join(cache.disk.directory, "embeddings.f16")) == 8 * 2
+
+        reopened = EmbeddingCache("test-model", cache_dir=cache_dir, codec=loaded)
+        assert np.array_equal(reopened.get("resume"), first)
+        try:
+            EmbeddingCache("test-model", cache_dir=cache_dir, codec=EmbeddingCodec())
+        except ValueError as e:
+            print(f"✅ Cache refuses a different codec: {e}")
+        else:
+            raise AssertionError("Cache opened with a mismatched codec")
+
+
+def test_load_embeddings_from_encoder_directory():
+    corpus = _corpus(n=3, dim=16)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = EmbeddingCache("test-model@torch", cache_dir=cache_dir, codec=EmbeddingCodec("float32"))
+        for i, vector in enumerate(corpus):
+            cache.get_or_compute(f"text {i}", lambda _, v=vector: v)
+        assert cache.disk.directory == os.path.join(cache_dir, "test-model@torch")
+        assert np.array_equal(load_embeddings(cache.disk.directory), corpus)
+        try:
+            load_embeddings(cache_dir)
+        except ValueError as e:
+            assert "test-model@torch" in str(e)
+            print(f"✅ Cache root refused with its encoder directories listed: {e}")
+        else:
+            raise AssertionError("Cache root was read as an embedding store")
+
+
+if __name__ == "__main__":
+    test_float16_and_pca_error_report()
+    test_codec_save_load_and_cache()
+    test_load_embeddings_from_encoder_directory()
+    print("\n🏁 All embedding codec tests completed!")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the selectable encoder backends.
+
+The parity check against the PyTorch reference is skipped unless onnxruntime,
+transformers and sentence-transformers are installed (its first run exports the
+model into PLACIFY_ONNX_DIR); the other tests need none of them.
+
+Usage:
+    python -m pytest -q test_encoder_backend.py
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import importlib.util
+
+import pytest
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import encoder_backend
+from encoder_backend import check_parity, encoder_id
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+# backend -> (lowest embedding cosine, largest pairwise score error) against torch
+TOLERANCES = {
+    "onnx": (0.9999, 0.001),
+    "onnx-int8": (0.98, 0.02),
+}
+
+PARITY_DEPENDENCIES = ("onnxruntime", "transformers", "sentence_transformers")
+
+
+@pytest.mark.skipif(
+    any(importlib.util.find_spec(name) is None for name in PARITY_DEPENDENCIES),
+    reason="needs onnxruntime, transformers and sentence-transformers",
+)
+@pytest.mark.parametrize("backend", sorted(TOLERANCES))
+def test_backend_parity(backend):
+    min_cosine, max_error = TOLERANCES[backend]
+    report = check_parity(MODEL_NAME, backend)
+    print(f"📊 {backend} parity: {report}")
+    assert report["minEmbeddingCosine"] >= min_cosine
+    assert report["maxScoreError"] <= max_error
+
+
+def test_encoder_id_includes_backend():
+    assert encoder_id(MODEL_NAME, "onnx-int8") == f"{MODEL_NAME}@onnx-int8"
+    assert encoder_id(MODEL_NAME, "onnx-int8") != encoder_id(MODEL_NAME, "torch")
+
+
+@pytest.mark.skipif(encoder_backend.fcntl is None, reason="export locking needs fcntl")
+def test_concurrent_exports_run_once(monkeypatch):
+    """Workers warming up together export once and never see a half-written model."""
+    exports = []
+
+    def slow_export(model_name, output_dir, opset):
+        exports.append(output_dir)
+        with open(os.path.join(output_dir, "tokenizer.json"), "w") as f:
+            f.write("{}")
+        with open(os.path.join(output_dir, "model.onnx"), "wb") as f:
+            for _ in range(5):
+                f.write(b"x" * 1000)
+                f.flush()
+                time.sleep(0.02)
+
+    with tempfile.TemporaryDirectory() as directory:
+        monkeypatch.setattr(encoder_backend, "ONNX_CACHE_DIR", directory)
+        monkeypatch.setattr(encoder_backend, "_export_fp32", slow_export)
+        sizes = []
+
+        def worker():
+            path = encoder_backend.export_onnx(MODEL_NAME)
+            sizes.append(os.path.getsize(path))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        output_dir = encoder_backend._onnx_dir(MODEL_NAME)
+        assert len(exports) == 1 and sizes == [5000] * 4
+        assert sorted(os.listdir(output_dir)) == [".lock", "model.onnx", "tokenizer.json"]
+    print("✅ Concurrent exports ran once and published a complete model")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the micro-batching inference queue.
+
+Usage:
+    python test_inference_queue.py
+"""
+
+import os
+import sys
+import asyncio
+import threading
+import multiprocessing
+
+import numpy as np
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from inference_queue import BatchingEncoder
+
+
+class LengthModel:
+    """Embeds a sentence as [len, words]; records every batch it is given."""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        self.batches.append(list(sentences))
+        if any(text == "boom" for text in sentences):
+            raise RuntimeError("model failure")
+        return np.array([[len(t), len(t.split())] for t in sentences], dtype=np.float32)
+
+
+def test_concurrent_requests_share_batches():
+    model = LengthModel()
+    encoder = BatchingEncoder(model, max_batch_size=16, max_wait_ms=50)
+    results = {}
+    start = threading.Barrier(8)
+
+    def worker(i):
+        start.wait()
+        results[i] = encoder.encode([f"answer {i}", "shared sentence"])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i in range(8):
+        assert np.array_equal(results[i][0], [len(f"answer {i}"), 2])
+        assert np.array_equal(results[i][1], [15, 2])
+    stats = encoder.stats()
+    assert stats["items"] == 16 and stats["batches"] < 8
+    assert stats["encoded"] < stats["items"]  # "shared sentence" deduplicated per batch
+    encoder.close()
+    print(f"✅ 8 threads served in {stats['batches']} batches: {stats}")
+
+
+def test_async_and_normalized():
+    encoder = BatchingEncoder(LengthModel(), max_wait_ms=5)
+
+    async def run():
+        return await asyncio.gather(
+            encoder.encode_async("three word answer", normalize_embeddings=True),
+            encoder.encode_async(["a", "bb"]),
+        )
+
+    single, many = asyncio.run(run())
+    assert single.shape == (2,) and abs(np.linalg.norm(single) - 1.0) < 1e-6
+    assert np.array_equal(many, [[1, 1], [2, 1]])
+    encoder.close()
+    print("✅ asyncio callers and normalization work")
+
+
+def test_model_errors_reach_callers():
+    encoder = BatchingEncoder(LengthModel(), max_wait_ms=1)
+    try:
+        encoder.encode(["boom"])
+    except RuntimeError as e:
+        print(f"✅ Model error propagated: {e}")
+    else:
+        raise AssertionError("Model error was swallowed")
+    assert np.array_equal(encoder.encode("ok"), [2, 1])
+    encoder.close()
+
+
+_fork_encoder = None
+
+
+def _encode_in_child(results):
+    results.put(_fork_encoder.encode("forked child").tolist())
+
+
+def test_encoder_usable_after_fork():
+    """A forked worker gets its own encoder thread instead of waiting forever."""
+    global _fork_encoder
+    if "fork" not in multiprocessing.get_all_start_methods():
+        print("⏭️  fork is not available on this platform")
+        return
+    context = multiprocessing.get_context("fork")
+    _fork_encoder = BatchingEncoder(LengthModel(), max_wait_ms=1)
+    assert np.array_equal(_fork_encoder.encode("parent"), [6, 1])
+    results = context.Queue()
+    child = context.Process(target=_encode_in_child, args=(results,))
+    child.start()
+    child.join(10)
+    if child.is_alive():
+        child.terminate()
+        raise AssertionError("Encoder hung in the forked child")
+    assert results.get(timeout=1) == [12.0, 2.0]
+    assert np.array_equal(_fork_encoder.encode("parent again"), [12, 2])
+    _fork_encoder.close()
+    print("✅ Encoder works in a forked child")
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_batches()
+    test_async_and_normalized()
+    test_model_errors_reach_callers()
+    test_encoder_usable_after_fork()
+    print("\n🏁 All inference queue tests completed!")
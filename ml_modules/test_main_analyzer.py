@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched match APIs and section pooling in main_analyzer.
+
+Runs with a deterministic stand-in encoder, so no model download is needed.
+
+Usage:
+    python -m pytest -q test_main_analyzer.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import main_analyzer
+from conftest import HashingEncoder
+
+RESUMES = [
+    {
+        "_id": "backend",
+        "summary": "Backend developer",
+        "skills": ["Python", "Django", "PostgreSQL"],
+        "workExperience": [{"role": "Intern", "company": "Acme", "description": "Built REST APIs in Django"}],
+        "projects": [
+            {"title": "Chat bot", "description": "Python bot for student queries"},
+            {"title": "Portfolio", "description": "React site"},
+        ],
+        "education": [{"degree": "B.Tech", "institution": "IIT"}],
+    },
+    {
+        "_id": "frontend",
+        "summary": "Frontend engineer",
+        "skills": ["React", "TypeScript"],
+        "projects": [{"title": "Dashboard", "description": "React hooks and state management"}],
+    },
+    {"_id": "skills-only", "skills": ["Java", "Spring"]},
+]
+
+JOBS = [
+    {"_id": "j1", "title": "Python Backend Developer", "requirements": ["Python", "Django"]},
+    {"_id": "j2", "title": "React Frontend Developer", "requirements": ["React", "TypeScript"]},
+    {"_id": "j3", "title": "Java Engineer", "description": "Spring services", "requirements": ["Java"]},
+    {"_id": "j4", "title": "Data Analyst", "requirements": ["SQL", "Excel"]},
+]
+
+
+def _unit(texts):
+    return HashingEncoder().encode(texts, normalize_embeddings=True)
+
+
+def test_extract_resume_sections():
+    sections = main_analyzer.extract_resume_sections(RESUMES[0])
+    assert sections == [
+        "Backend developer",
+        "Python, Django, PostgreSQL",
+        "Intern at Acme: Built REST APIs in Django",
+        "Chat bot: Python bot for student queries",
+        "Portfolio: React site",
+        "B.Tech at IIT",
+    ]
+    # Empty sections are dropped; an empty resume falls back to the concatenated text
+    assert main_analyzer.extract_resume_sections(RESUMES[2]) == ["Java, Spring"]
+    empty = {"projects": [{"title": ""}], "education": [{}]}
+    assert main_analyzer.extract_resume_sections(empty) == [main_analyzer.extract_resume_skills_experience(empty)]
+    print("✅ Resume sections extracted in order, empty ones dropped")
+
+
+def test_batch_matches_single_calls(stub_encoder):
+    for pooling in main_analyzer.POOLING_RULES:
+        batched = main_analyzer.analyze_resume_job_matches(RESUMES[0], JOBS, pooling)
+        single = [main_analyzer.analyze_resume_job_match(RESUMES[0], job, pooling) for job in JOBS]
+        assert batched == single, pooling
+
+        mirrored = main_analyzer.analyze_job_resume_matches(JOBS[1], RESUMES, pooling)
+        assert mirrored == [main_analyzer.analyze_resume_job_match(resume, JOBS[1], pooling) for resume in RESUMES]
+    assert main_analyzer.analyze_resume_job_matches(RESUMES[0], []) == []
+    assert main_analyzer.analyze_job_resume_matches(JOBS[0], []) == []
+    print("✅ Batched matches equal one analyze_resume_job_match call per pair, for every pooling rule")
+
+
+def test_batch_encodes_misses_once(stub_encoder):
+    model = stub_encoder
+    main_analyzer.analyze_resume_job_matches(RESUMES[0], JOBS + JOBS[:2], "mean")
+    # One call for the distinct job texts, one for the resume's sections
+    assert [len(texts) for texts in model.calls] == [len(JOBS), 6]
+    main_analyzer.analyze_resume_job_matches(RESUMES[0], JOBS, "mean")
+    assert len(model.calls) == 2
+    print("✅ Batched matching encodes each distinct text once")
+
+
+def test_pooling_shapes_and_values(stub_encoder):
+    jobs = _unit([main_analyzer.extract_job_description(job) for job in JOBS])
+    for pooling in main_analyzer.POOLING_RULES:
+        matrix = main_analyzer.resume_job_similarities(RESUMES, JOBS, pooling)
+        assert matrix.shape == (len(RESUMES), len(JOBS)), pooling
+
+        # Rows follow resumes and columns follow jobs, whatever the input order
+        reordered = main_analyzer.resume_job_similarities(RESUMES[::-1], JOBS[::-1], pooling)
+        assert np.allclose(reordered, matrix[::-1, ::-1], atol=1e-6), pooling
+
+        for row, resume in enumerate(RESUMES):
+            if pooling == "concat":
+                expected = jobs @ _unit([main_analyzer.extract_resume_skills_experience(resume)])[0]
+            else:
+                sections = _unit(main_analyzer.extract_resume_sections(resume))
+                sims = sections @ jobs.T
+                if pooling == "max":
+                    expected = sims.max(axis=0)
+                elif pooling == "top3":
+                    expected = np.sort(sims, axis=0)[-3:].mean(axis=0)
+                else:
+                    mean = sections.mean(axis=0)
+                    expected = jobs @ (mean / np.linalg.norm(mean))
+            assert np.allclose(matrix[row], expected, atol=1e-6), (pooling, row)
+
+    # The best job for each resume is the one written for it
+    best = main_analyzer.resume_job_similarities(RESUMES, JOBS, "max").argmax(axis=1)
+    assert best.tolist() == [0, 1, 2]
+    try:
+        main_analyzer.resume_job_similarities(RESUMES, JOBS, "median")
+    except ValueError as e:
+        print(f"✅ Pooling rules give (resumes, jobs) matrices; unknown rule refused: {e}")
+    else:
+        raise AssertionError("Unknown pooling rule was accepted")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test script for the job recommendation and candidate search indexes.
+
+Runs with a deterministic stand-in encoder, so no model download is needed.
+
+Usage:
+    python -m pytest -q test_match_indexes.py
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import main_analyzer
+from job_index import JobIndex
+from resume_index import ResumeIndex
+
+JOB = {"_id": "job", "title": "Python Backend Developer", "requirements": ["Python", "Django"]}
+
+
+def _resume(resume_id, skills, institution=None, summary="developer"):
+    resume = {"_id": resume_id, "skills": skills, "summary": summary}
+    if institution is not None:
+        resume["institution"] = institution
+    return resume
+
+
+def _ids(results, key="resumeId"):
+    return [item[key] for item in results]
+
+
+def test_skill_filter(stub_encoder):
+    index = ResumeIndex()
+    index.upsert_resumes([
+        _resume("both", ["Python", "Django"]),
+        _resume("python-only", ["python", "Flask"]),
+        _resume("none", ["Java"]),
+    ])
+    assert sorted(_ids(index.top_k_candidates(JOB, k=3))) == ["both", "none", "python-only"]
+    assert _ids(index.top_k_candidates(JOB, filters={"requireAllSkills": True})) == ["both"]
+    assert sorted(_ids(index.top_k_candidates(JOB, filters={"requiredSkills": ["PYTHON"]}))) == [
+        "both",
+        "python-only",
+    ]
+    assert index.top_k_candidates(JOB, filters={"requiredSkills": ["Rust"]}) == []
+    python_only = index.top_k_candidates(JOB, filters={"requiredSkills": ["flask"]})[0]
+    assert python_only["missingSkills"] == ["django"]
+    print("✅ Skill filters keep only resumes listing the required skills")
+
+
+def test_institution_filter(stub_encoder):
+    index = ResumeIndex()
+    index.upsert_resumes([
+        _resume("a", ["Python", "Django"], institution="IIT"),
+        _resume("b", ["Python", "Django"], institution=42),
+        _resume("c", ["Python"], summary="Django developer", institution=42),
+        {"_id": "d", "skills": ["Python", "Django"], "education": [{"institution": "NIT"}]},
+    ])
+    assert sorted(index.shards) == ["42", "IIT", "NIT"]
+    assert _ids(index.top_k_candidates(JOB, filters={"institutions": ["IIT"]})) == ["a"]
+    # Non-string ids match their shard in both the plain and the skill-filtered search
+    assert sorted(_ids(index.top_k_candidates(JOB, filters={"institutions": [42]}))) == ["b", "c"]
+    filtered = index.top_k_candidates(JOB, filters={"institutions": [42], "requireAllSkills": True})
+    assert _ids(filtered) == ["b"] and filtered[0]["institution"] == "42"
+    assert _ids(index.top_k_candidates(JOB, filters={"institutions": ["NIT", "missing"]})) == ["d"]
+    print("✅ Institution filters search only the requested shards")
+
+
+def test_update_moves_resume_between_shards(stub_encoder):
+    index = ResumeIndex()
+    index.upsert_resumes([_resume("r1", ["Python"], institution="IIT"), _resume("r2", ["Java"], institution="IIT")])
+    index.upsert_resume(_resume("r1", ["Python", "Django"], institution="NIT"))
+
+    assert len(index) == 2 and len(index.shards["IIT"]) == 1 and len(index.shards["NIT"]) == 1
+    assert _ids(index.top_k_candidates(JOB, filters={"institutions": ["IIT"]})) == ["r2"]
+    moved = index.top_k_candidates(JOB, filters={"requireAllSkills": True})
+    assert _ids(moved) == ["r1"] and moved[0]["institution"] == "NIT"
+
+    assert index.remove_resume("r1") and not index.remove_resume("r1")
+    assert index.top_k_candidates(JOB, filters={"requiredSkills": ["Python"]}) == []
+    print("✅ Updating a resume's institution moves it to the new shard")
+
+
+def test_approximate_mode_follows_total_size(stub_encoder):
+    skills = [["Python", "Django"], ["Python"], ["Django"], ["Java"], ["React"], ["SQL"]]
+    resumes = [
+        _resume(f"{institution}-{i}", skill_set, institution=institution)
+        for institution in ("IIT", "NIT")
+        for i, skill_set in enumerate(skills)
+    ]
+    exact = ResumeIndex()
+    exact.upsert_resumes(resumes)
+    # Each shard holds 6 rows, under the threshold; together they are over it
+    approximate = ResumeIndex(approximate_threshold=10, nlist=4)
+    approximate.upsert_resumes(resumes)
+    assert all(shard.trained for shard in approximate.shards.values())
+    assert [shard.stats()["nlist"] for shard in approximate.shards.values()] == [2, 2]
+
+    # Probing every cell of every shard gives the exact cross-shard ranking
+    ranked = approximate.top_k_candidates(JOB, k=4, filters={"nprobe": 2})
+    assert ranked == exact.top_k_candidates(JOB, k=4)
+    assert {item["institution"] for item in ranked} == {"IIT", "NIT"}
+
+    # A shard opened after the switch is clustered as soon as it gets rows
+    approximate.upsert_resume(_resume("late", ["Python"], institution="BITS"))
+    assert approximate.shards["BITS"].trained
+    print("✅ Approximate search switches on for every shard once the whole index is large")
+
+
+def test_job_index_top_k_and_reload(stub_encoder):
+    jobs = [
+        JOB,
+        {"_id": 7, "title": "Java Developer", "requirements": ["Java", "Spring"]},
+        {"_id": "ml", "title": "Machine Learning Engineer", "requirements": ["Python", "PyTorch"]},
+    ]
+    index = JobIndex()
+    index.add_jobs(jobs)
+    resume = _resume("r", ["Python", "Django"], summary="Python backend developer")
+    ranked = index.top_k_jobs(resume, k=3)
+    assert _ids(ranked, "jobId")[0] == "job" and "7" in _ids(ranked, "jobId")
+
+    # Refreshing a job replaces its embedding instead of adding a row
+    index.add_job({"_id": 7, "title": "Python Backend Developer", "requirements": ["Python", "Django"]})
+    assert len(index) == 3
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(directory)
+        loaded = JobIndex.load(directory)
+        assert loaded.top_k_jobs(resume, k=3) == index.top_k_jobs(resume, k=3)
+    assert index.remove_job(7) and len(index) == 2
+    assert _ids(index.top_k_jobs(resume, k=1), "jobId") == ["job"]
+    print("✅ Job index ranks, refreshes, reloads and removes jobs")
+
+
+def test_job_index_rejects_other_vector_space(stub_encoder, monkeypatch):
+    index = JobIndex()
+    index.add_jobs([JOB])
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(directory)
+        # Same files, but the process now encodes with another model
+        with monkeypatch.context() as patch:
+            patch.setattr(main_analyzer, "MODEL_NAME", "other")
+            try:
+                JobIndex.load(directory)
+            except ValueError as e:
+                print(f"✅ Index from another encoder refused: {e}")
+            else:
+                raise AssertionError("Index built with another encoder was loaded")
+
+        # Indexes saved before the vector space was recorded must be rebuilt too
+        os.remove(os.path.join(directory, "vector_space.json"))
+        try:
+            JobIndex.load(directory)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Index without a recorded vector space was loaded")
+
+
+def test_indexing_without_model_raises(stub_encoder, monkeypatch):
+    monkeypatch.setattr(main_analyzer, "_model", None)
+    for add in (JobIndex().add_jobs, ResumeIndex().upsert_resumes):
+        try:
+            add([JOB])
+        except RuntimeError as e:
+            assert str(e) == main_analyzer.MODEL_UNAVAILABLE
+        else:
+            raise AssertionError(f"{add.__qualname__} indexed without a model")
+    print("✅ Indexing without a model raises the model-unavailable error")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
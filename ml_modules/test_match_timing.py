@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for per-stage match timings and cProfile dumps.
+
+Runs with a deterministic stand-in encoder, so no model download is needed.
+
+Usage:
+    python -m pytest -q test_match_timing.py
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import call_match
+import main_analyzer
+
+EXPECTED_STAGES = {"modelLoad", "extract", "encode", "similarity", "skillGap", "learningRecommendations"}
+
+RESUME = {"skills": ["Python", "Django"], "summary": "Backend developer"}
+JOB = {"title": "Python Developer", "requirements": ["python", "docker"]}
+
+
+def test_timings_report_every_stage(stub_encoder):
+    result = main_analyzer.analyze_resume_job_match(RESUME, JOB, timings=True)
+    timings = result["_timings"]
+    print(f"📊 Timings: {timings}")
+    assert set(timings["stagesMs"]) == EXPECTED_STAGES
+    assert all(ms >= 0 for ms in timings["stagesMs"].values())
+    assert timings["cacheMisses"] == 2 and timings["batchSize"] == 2
+    assert timings["pooling"] == main_analyzer.DEFAULT_POOLING
+    assert "profileFile" not in timings
+
+    # A second call is served from the cache
+    again = main_analyzer.analyze_resume_job_match(RESUME, JOB, timings=True)["_timings"]
+    assert again["cacheHits"] == 2 and again["cacheMisses"] == 0
+
+
+def test_profile_written_only_when_enabled(stub_encoder):
+    with tempfile.TemporaryDirectory() as directory:
+        untimed = main_analyzer.analyze_resume_job_match(RESUME, JOB, timings=False, profile_dir=directory)
+        assert "_timings" not in untimed
+        assert os.listdir(directory) == []
+
+        timed = main_analyzer.analyze_resume_job_match(RESUME, JOB, timings=True, profile_dir=directory)
+        assert os.listdir(directory) == [os.path.basename(timed["_timings"]["profileFile"])]
+        print("✅ Profiles are written only for timed requests")
+
+    # Requests cannot pick the profile directory; only --profile-dir can
+    with tempfile.TemporaryDirectory() as directory:
+        payload = {"resume": RESUME, "job": JOB, "timings": True, "profileDir": directory}
+        assert "profileFile" not in call_match.handle_request(payload)["_timings"]
+        assert os.listdir(directory) == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the contiguous embedding index used by job recommendations.
+
+Usage:
+    python test_vector_index.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from vector_index import VectorIndex, IVFVectorIndex
+
+
+def _random_unit_vectors(count, dim=16, seed=7):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_top_k_matches_brute_force():
+    """argpartition top-k returns the same ranking as a full sort."""
+    vectors = _random_unit_vectors(200)
+    index = VectorIndex(capacity=8)
+    index.add_many([f"job-{i}" for i in range(200)], vectors)
+
+    query = vectors[0]
+    expected = np.argsort(-(vectors @ query))[:10]
+    results = index.search(query, k=10)
+    print(f"🔝 Top 3: {results[:3]}")
+    assert [item_id for item_id, _ in results] == [f"job-{i}" for i in expected]
+
+
+def test_remove_keeps_rows_contiguous():
+    """Removing a job moves the last row into its slot."""
+    vectors = _random_unit_vectors(5)
+    index = VectorIndex()
+    index.add_many(["a", "b", "c", "d", "e"], vectors)
+    assert index.remove("b")
+    assert not index.remove("b")
+    assert len(index) == 4
+    assert index.ids == ["a", "e", "c", "d"]
+    assert np.allclose(index.get("e"), vectors[4])
+    print("✅ Remove keeps the matrix contiguous")
+
+
+def test_save_and_memory_mapped_load():
+    """A saved index reloads memory-mapped and still accepts updates."""
+    vectors = _random_unit_vectors(20)
+    index = VectorIndex()
+    index.add_many([str(i) for i in range(20)], vectors)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(directory)
+        loaded = VectorIndex.load(directory)
+        assert loaded.stats()["memoryMapped"]
+        assert loaded.search(vectors[3], k=1)[0][0] == "3"
+
+        loaded.add("new", vectors[3])
+        loaded.remove("0")
+        assert not loaded.stats()["memoryMapped"]
+        assert len(loaded) == 20
+        print("✅ Memory-mapped index reloaded and updated")
+
+
+def test_ivf_recall_and_incremental_insert():
+    """Probing every cell is exact; new rows are assigned on insert."""
+    vectors = _random_unit_vectors(500)
+    index = IVFVectorIndex(nprobe=4)
+    index.add_many([str(i) for i in range(400)], vectors[:400])
+    index.train(nlist=16)
+    index.add_many([str(i) for i in range(400, 500)], vectors[400:])
+    index.remove("10")
+
+    query = vectors[450]
+    exact = [item_id for item_id, _ in VectorIndex.search(index, query, k=5)]
+    assert [item_id for item_id, _ in index.search(query, k=5, nprobe=16)] == exact
+    approximate = index.search(query, k=5)
+    assert approximate[0][0] == "450"
+    print(f"✅ IVF search found {approximate[0][0]} probing {index.nprobe}/16 cells")
+
+
+if __name__ == "__main__":
+    test_top_k_matches_brute_force()
+    test_remove_keeps_rows_contiguous()
+    test_save_and_memory_mapped_load()
+    test_ivf_recall_and_incremental_insert()
+    print("\n🏁 All vector index tests completed!")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the framed wire protocol between Node and the ML scripts.
+
+Usage:
+    python test_wire_protocol.py
+"""
+
+import io
+import os
+import sys
+import subprocess
+
+# Add current directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import wire_protocol
+from wire_protocol import (
+    CODEC_JSON,
+    HEADER,
+    FrameDecodeError,
+    ProtocolError,
+    default_codec,
+    encode_frame,
+    read_frame,
+    supported_codecs,
+)
+
+
+def test_frames_round_trip():
+    """Several frames in one stream decode back in order with their codec."""
+    stream = io.BytesIO(
+        encode_frame({"id": 1, "resume": {"skills": ["python"]}})
+        + encode_frame({"id": 2}, CODEC_JSON)
+    )
+    first, first_codec = read_frame(stream)
+    second, second_codec = read_frame(stream)
+    assert first == {"id": 1, "resume": {"skills": ["python"]}}
+    assert first_codec == default_codec()
+    assert second == {"id": 2} and second_codec == CODEC_JSON
+    assert read_frame(stream) is None
+    print(f"✅ Frames round-trip (default codec {default_codec()!r})")
+
+
+def test_truncated_frame_is_rejected():
+    frame = encode_frame({"id": 1}, CODEC_JSON)
+    try:
+        read_frame(io.BytesIO(frame[:-2]))
+    except ProtocolError as e:
+        print(f"✅ Truncated frame rejected: {e}")
+    else:
+        raise AssertionError("Truncated frame was accepted")
+
+
+def _run_framed_server(stdin_bytes):
+    """Runs call_match --serve --framed with a noisy echo handler; returns (frames, stderr)."""
+    script = (
+        "import sys, call_match\n"
+        "def noisy(payload):\n"
+        "    print('analyzer chatter')\n"
+        "    return {'echo': payload['value']}\n"
+        "call_match.handle_request = noisy\n"
+        "sys.argv = ['call_match.py', '--serve', '--framed']\n"
+        "call_match.main()\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script], input=stdin_bytes, capture_output=True, cwd=current_dir, timeout=60
+    )
+    stdout = io.BytesIO(completed.stdout)
+    frames = []
+    while True:
+        frame = read_frame(stdout)
+        if frame is None:
+            return frames, completed.stderr
+        frames.append(frame)
+
+
+def test_framed_server_keeps_stdout_for_frames():
+    """Prints from the match code go to stderr, not into the frame stream."""
+    frames, stderr = _run_framed_server(encode_frame({"id": 7, "value": "x"}, CODEC_JSON))
+    hello, response = frames
+    assert hello == ({"id": None, "codecs": supported_codecs()}, CODEC_JSON)
+    assert response == ({"id": 7, "result": {"echo": "x"}}, CODEC_JSON)
+    assert b"analyzer chatter" in stderr
+    print("✅ Framed server writes only frames to stdout")
+
+
+def test_bad_frames_do_not_stop_the_server():
+    """Undecodable frames get an error reply each; later frames are still served."""
+    bad_json = HEADER.pack(CODEC_JSON, 3) + b"\xff{x"
+    unknown_codec = HEADER.pack(b"X", 2) + b"{}"
+    # An oversized frame is skipped whole, leaving the next frame readable
+    saved_limit, wire_protocol.MAX_FRAME_BYTES = wire_protocol.MAX_FRAME_BYTES, 8
+    try:
+        stream = io.BytesIO(HEADER.pack(CODEC_JSON, 9) + b"[1,2,3,4]" + encode_frame([5], CODEC_JSON))
+        try:
+            read_frame(stream)
+        except FrameDecodeError as e:
+            assert e.reply_codec == CODEC_JSON
+        else:
+            raise AssertionError("Oversized frame was accepted")
+        assert read_frame(stream) == ([5], CODEC_JSON)
+    finally:
+        wire_protocol.MAX_FRAME_BYTES = saved_limit
+
+    frames, _ = _run_framed_server(
+        bad_json + unknown_codec + encode_frame({"id": 8, "value": "y"}, CODEC_JSON) + b"J\x00"
+    )
+    payloads = [payload for payload, _ in frames[1:]]
+    assert [p["id"] for p in payloads] == [None, None, 8, None]
+    assert "Undecodable" in payloads[0]["error"] and "codec" in payloads[1]["error"].lower()
+    assert payloads[2]["result"] == {"echo": "y"}
+    assert payloads[3]["error"] == "Truncated frame header"
+    print("✅ Bad frames answered with errors; the server kept serving")
+
+
+if __name__ == "__main__":
+    test_frames_round_trip()
+    test_truncated_frame_is_rejected()
+    test_framed_server_keeps_stdout_for_frames()
+    test_bad_frames_do_not_stop_the_server()
+    print("\n🏁 All wire protocol tests completed!")
@@ -0,0 +1,294 @@
+# Placify Vector Index
+# Contiguous, memory-mappable embedding matrix with an id map and top-k search
+
+import os
+import json
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+
+class VectorIndex:
+    """
+    Exact inner-product index over unit-normalized embeddings.
+
+    Rows live in one contiguous float32 matrix (grown by doubling) so a query is a
+    single matrix-vector product. Removing an id moves the last row into the hole,
+    keeping the live rows contiguous without a rebuild.
+    """
+
+    def __init__(self, dim: Optional[int] = None, capacity: int = 1024):
+        self.dim = dim
+        self._capacity = capacity
+        self._matrix = None
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        if dim is not None:
+            self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        The live (n, dim) embedding rows, in the same order as ``ids``.
+        """
+        if self._matrix is None:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return self._matrix[: len(self._ids)]
+
+    def _ensure_writable(self, needed: int):
+        if self._matrix is None:
+            self._matrix = np.zeros((max(self._capacity, needed), self.dim), dtype=np.float32)
+            return
+        writable = isinstance(self._matrix, np.ndarray) and not isinstance(
+            self._matrix, np.memmap
+        )
+        if writable and self._matrix.shape[0] >= needed:
+            return
+        capacity = max(needed, self._matrix.shape[0] * 2, self._capacity)
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = grown
+
+    def add(self, item_id: str, embedding: np.ndarray):
+        """
+        Inserts or replaces the embedding stored for ``item_id``.
+        """
+        self.add_many([item_id], np.asarray(embedding, dtype=np.float32).reshape(1, -1))
+
+    def add_many(self, item_ids: List[str], embeddings: np.ndarray):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not item_ids:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(embeddings.shape[1])
+            if embeddings.shape[1] != self.dim:
+                raise ValueError(
+                    f"Expected embeddings of dimension {self.dim}, got {embeddings.shape[1]}"
+                )
+            new_ids = [i for i in dict.fromkeys(item_ids) if i not in self._rows]
+            self._ensure_writable(len(self._ids) + len(new_ids))
+            for item_id, embedding in zip(item_ids, embeddings):
+                row = self._rows.get(item_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._ids.append(item_id)
+                    self._rows[item_id] = row
+                self._matrix[row] = embedding
+
+    def remove(self, item_id: str) -> bool:
+        """
+        Removes ``item_id``; returns False if it was not indexed.
+        """
+        with self._lock:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                return False
+            self._ensure_writable(len(self._ids))
+            last = len(self._ids) - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = moved_id
+                self._rows[moved_id] = row
+            self._ids.pop()
+            return True
+
+    def get(self, item_id: str) -> Optional[np.ndarray]:
+        row = self._rows.get(item_id)
+        return None if row is None else np.array(self._matrix[row])
+
+    def search(
+        self, query: np.ndarray, k: int = 10, candidates: Optional[List[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns up to ``k`` (id, similarity) pairs, best first.
+        If ``candidates`` is given, only those ids are scored.
+        """
+        with self._lock:
+            if len(self._ids) == 0 or k <= 0:
+                return []
+            query = np.asarray(query, dtype=np.float32).reshape(-1)
+            if candidates is None:
+                return self._top_k(self.matrix @ query, k, self._ids)
+            rows = np.fromiter(
+                (self._rows[i] for i in candidates if i in self._rows), dtype=np.int64
+            )
+            return self._search_rows(query, k, rows)
+
+    def _search_rows(self, query: np.ndarray, k: int, rows: np.ndarray) -> List[Tuple[str, float]]:
+        if rows.size == 0:
+            return []
+        scores = self._matrix[rows] @ query
+        results = self._top_k(scores, k, rows)
+        return [(self._ids[row], score) for row, score in results]
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int, ids) -> List[Tuple[Any, float]]:
+        k = min(k, scores.shape[0])
+        if k < scores.shape[0]:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(scores.shape[0])
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    def save(self, directory: str):
+        """
+        Writes ``embeddings.npy`` and ``ids.json`` to ``directory``.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            np.save(os.path.join(directory, "embeddings.npy"), np.ascontiguousarray(self.matrix))
+            with open(os.path.join(directory, "ids.json"), "w") as f:
+                json.dump({"dim": self.dim, "ids": self._ids}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "VectorIndex":
+        """
+        Loads an index saved by ``save``. With ``mmap`` the matrix stays on disk
+        until the first add/remove copies it into memory.
+        """
+        with open(os.path.join(directory, "ids.json"), "r") as f:
+            meta = json.load(f)
+        index = cls(dim=None)
+        index.dim = meta["dim"]
+        index._ids = list(meta["ids"])
+        index._rows = {item_id: row for row, item_id in enumerate(index._ids)}
+        if index._ids:
+            index._matrix = np.load(
+                os.path.join(directory, "embeddings.npy"), mmap_mode="r" if mmap else None
+            )
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._ids),
+            "dim": self.dim,
+            "capacity": 0 if self._matrix is None else int(self._matrix.shape[0]),
+            "memoryMapped": isinstance(self._matrix, np.memmap),
+        }
+
+
+class IVFVectorIndex(VectorIndex):
+    """
+    VectorIndex with an optional inverted-file (IVF) coarse quantizer.
+
+    After ``train`` clusters the rows with k-means, a query only scores rows in the
+    ``nprobe`` clusters whose centroids are closest to it. New rows are assigned to
+    their nearest centroid on insert, so the index stays incremental. Until trained,
+    search is exact.
+    """
+
+    def __init__(self, dim: Optional[int] = None, capacity: int = 1024, nprobe: int = 8):
+        super().__init__(dim=dim, capacity=capacity)
+        self.nprobe = nprobe
+        self.centroids = None
+        self._assign = np.zeros(0, dtype=np.int32)
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def _nearest_centroids(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def train(self, nlist: int, iterations: int = 10, sample_size: int = 65536, seed: int = 0):
+        """
+        Fits ``nlist`` spherical k-means centroids on (a sample of) the indexed rows.
+        """
+        with self._lock:
+            n = len(self._ids)
+            if n == 0:
+                raise ValueError("Cannot train an empty index")
+            nlist = max(1, min(nlist, n))
+            rng = np.random.default_rng(seed)
+            sample_rows = rng.choice(n, size=min(n, sample_size), replace=False)
+            sample = np.asarray(self._matrix[np.sort(sample_rows)])
+            centroids = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(nlist):
+                    members = sample[labels == c]
+                    if len(members):
+                        centroid = members.sum(axis=0)
+                        norm = np.linalg.norm(centroid)
+                        if norm > 0:
+                            centroids[c] = centroid / norm
+            self.centroids = centroids.astype(np.float32)
+            self._assign = np.zeros(max(n, self._matrix.shape[0]), dtype=np.int32)
+            for start in range(0, n, sample_size):
+                stop = min(n, start + sample_size)
+                self._assign[start:stop] = self._nearest_centroids(self._matrix[start:stop])
+
+    def add_many(self, item_ids: List[str], embeddings: np.ndarray):
+        with self._lock:
+            super().add_many(item_ids, embeddings)
+            if self.trained:
+                if self._assign.shape[0] < self._matrix.shape[0]:
+                    grown = np.zeros(self._matrix.shape[0], dtype=np.int32)
+                    grown[: self._assign.shape[0]] = self._assign
+                    self._assign = grown
+                rows = np.array([self._rows[i] for i in item_ids], dtype=np.int64)
+                self._assign[rows] = self._nearest_centroids(self._matrix[rows])
+
+    def remove(self, item_id: str) -> bool:
+        with self._lock:
+            row = self._rows.get(item_id)
+            last = len(self._ids) - 1
+            removed = super().remove(item_id)
+            if removed and self.trained and row != last:
+                self._assign[row] = self._assign[last]
+            return removed
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        candidates: Optional[List[str]] = None,
+        nprobe: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        if not self.trained or candidates is not None:
+            return super().search(query, k, candidates)
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return []
+            query = np.asarray(query, dtype=np.float32).reshape(-1)
+            nprobe = min(nprobe or self.nprobe, self.centroids.shape[0])
+            probes = np.argsort(-(self.centroids @ query))[:nprobe]
+            rows = np.nonzero(np.isin(self._assign[:n], probes))[0]
+            return self._search_rows(query, k, rows)
+
+    def save(self, directory: str):
+        with self._lock:
+            super().save(directory)
+            if self.trained:
+                np.save(os.path.join(directory, "centroids.npy"), self.centroids)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "IVFVectorIndex":
+        index = super().load(directory, mmap=mmap)
+        centroids_path = os.path.join(directory, "centroids.npy")
+        if os.path.exists(centroids_path) and len(index):
+            index.centroids = np.load(centroids_path)
+            index._assign = index._nearest_centroids(index.matrix)
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["nlist"] = 0 if self.centroids is None else int(self.centroids.shape[0])
+        stats["nprobe"] = self.nprobe
+        return stats
@@ -0,0 +1,136 @@
+# Placify Wire Protocol
+# Length-prefixed binary frames between the Node server and the ML scripts
+#
+# Frame layout:
+#   1 byte   codec tag: b"M" = msgpack, b"J" = JSON (UTF-8)
+#   4 bytes  payload length, unsigned big-endian
+#   N bytes  payload
+#
+# msgpack is used when installed; JSON frames keep working without it. The Node
+# side (server/services/ml/matchWorker.js) projects resumes and jobs down to the
+# fields the analyzers read before framing them.
+
+import json
+import struct
+from typing import Any, BinaryIO, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CODEC_MSGPACK = b"M"
+CODEC_JSON = b"J"
+HEADER = struct.Struct(">cI")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """Raised when the frame stream is broken (truncated header or payload)."""
+
+
+class FrameDecodeError(ProtocolError):
+    """
+    Raised for one complete frame that cannot be used (unknown codec, codec not
+    installed, undecodable or oversized payload). Its bytes have been consumed,
+    so the stream is still in sync and the next frame can be read.
+    """
+
+    def __init__(self, message: str, codec: bytes):
+        super().__init__(message)
+        # Codec to answer in: the frame's own when this side can write it
+        self.reply_codec = codec if codec == CODEC_JSON or (codec == CODEC_MSGPACK and msgpack) else CODEC_JSON
+
+
+def supported_codecs():
+    """
+    Codec tags this side can read and write, JSON first.
+    """
+    return [CODEC_JSON.decode()] + ([CODEC_MSGPACK.decode()] if msgpack is not None else [])
+
+
+def default_codec() -> bytes:
+    return CODEC_MSGPACK if msgpack is not None else CODEC_JSON
+
+
+def encode_payload(obj: Any, codec: bytes) -> bytes:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ProtocolError("msgpack frame requested but msgpack is not installed")
+        return msgpack.packb(obj, use_bin_type=True, default=str)
+    if codec == CODEC_JSON:
+        return json.dumps(obj, default=str).encode("utf-8")
+    raise ProtocolError(f"Unknown codec {codec!r}")
+
+
+def decode_payload(data: bytes, codec: bytes) -> Any:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ProtocolError("msgpack frame received but msgpack is not installed")
+        return msgpack.unpackb(data, raw=False)
+    if codec == CODEC_JSON:
+        return json.loads(data.decode("utf-8"))
+    raise ProtocolError(f"Unknown codec {codec!r}")
+
+
+def encode_frame(obj: Any, codec: Optional[bytes] = None) -> bytes:
+    codec = codec or default_codec()
+    payload = encode_payload(obj, codec)
+    return HEADER.pack(codec, len(payload)) + payload
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _skip_exact(stream: BinaryIO, size: int) -> int:
+    skipped = 0
+    while skipped < size:
+        chunk = stream.read(min(size - skipped, 1024 * 1024))
+        if not chunk:
+            break
+        skipped += len(chunk)
+    return skipped
+
+
+def read_frame(stream: BinaryIO) -> Optional[Tuple[Any, bytes]]:
+    """
+    Reads one frame and returns (payload, codec), or None at a clean end of stream.
+
+    Raises FrameDecodeError for a bad frame the stream can continue after, and
+    ProtocolError when the stream itself ends mid-frame.
+    """
+    header = _read_exact(stream, HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise ProtocolError("Truncated frame header")
+    codec, length = HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        if _skip_exact(stream, length) < length:
+            raise ProtocolError("Truncated frame payload")
+        raise FrameDecodeError(f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}", codec)
+    data = _read_exact(stream, length)
+    if len(data) < length:
+        raise ProtocolError("Truncated frame payload")
+    try:
+        return decode_payload(data, codec), codec
+    except FrameDecodeError:
+        raise
+    except Exception as e:
+        # json, UTF-8 and msgpack each raise their own error types
+        raise FrameDecodeError(f"Undecodable {codec!r} frame: {e}", codec) from e
+
+
+def write_frame(stream: BinaryIO, obj: Any, codec: Optional[bytes] = None):
+    stream.write(encode_frame(obj, codec))
+    stream.flush()
+
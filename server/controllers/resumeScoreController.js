@@ -1,10 +1,10 @@
 import ResumeScore from "../models/ResumeScore.js";
 import User from "../models/User.js";
 import mongoose from "mongoose";
-import { spawn } from "child_process";
 import Job from "../models/Jobs.js";
 import Resume from "../models/Resume.js";
 import logger from '../utils/logger.js';
+import { runResumeJobMatch } from "../services/ml/matchWorker.js";
 
 // ==================== UTILITY FUNCTIONS ====================
 const validateObjectId = (id) => mongoose.Types.ObjectId.isValid(id);
@@ -389,29 +389,19 @@ export const getResumeJobMatch = async (req, res) => {
         .status(404)
         .json({ success: false, message: "Resume or Job not found" });
 
-    const py = spawn("python", ["./ml_modules/call_match.py"]);
-    const input = JSON.stringify({ resume, job });
-    let output = "";
-
-    py.stdin.write(input);
-    py.stdin.end();
-
-    py.stdout.on("data", (data) => (output += data.toString()));
-    py.stderr.on("data", (data) => logger.error("ML Error:", data.toString()));
-
-    py.on("close", () => {
-      try {
-        res.status(200).json({ success: true, data: JSON.parse(output) });
-      } catch {
-        res
-          .status(500)
-          .json({
-            success: false,
-            message: "ML analysis failed",
-            error: output,
-          });
-      }
-    });
+    try {
+      const result = await runResumeJobMatch(resume, job);
+      res.status(200).json({ success: true, data: result });
+    } catch (mlError) {
+      logger.error("ML Error:", mlError.message);
+      res
+        .status(500)
+        .json({
+          success: false,
+          message: "ML analysis failed",
+          error: mlError.message,
+        });
+    }
   } catch (error) {
     handleErrorResponse(res, error, "AI-driven resume-job match");
   }
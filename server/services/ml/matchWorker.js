@@ -0,0 +1,229 @@
+import { spawn } from "child_process";
+import { createHash, randomUUID } from "crypto";
+import logger from '../../utils/logger.js';
+
+// Long-lived `call_match.py --serve --framed` process shared by all match requests,
+// so the interpreter start and model load are paid once instead of per call.
+const MATCH_WORKERS = process.env.ML_MATCH_WORKERS || "1";
+const MATCH_TIMEOUT_MS = Number(process.env.ML_MATCH_TIMEOUT_MS) || 30000;
+const RESULT_TTL_MS = Number(process.env.ML_MATCH_RESULT_TTL_MS) || 30000;
+const RESULT_CACHE_SIZE = Number(process.env.ML_MATCH_RESULT_CACHE_SIZE) || 500;
+
+// Frames: 1-byte codec tag ("M" msgpack / "J" JSON), 4-byte big-endian length, payload.
+// msgpack is optional on both sides (`npm install @msgpack/msgpack` here, `pip install
+// msgpack` for Python): requests go out as JSON until the worker's hello frame,
+// {"id": null, "codecs": [...]}, confirms it can read msgpack too.
+let msgpack = null;
+try {
+    msgpack = await import("@msgpack/msgpack");
+} catch {
+    msgpack = null;
+}
+let codec = "J";
+const HEADER_BYTES = 5;
+
+// Only the fields main_analyzer reads are sent to Python
+const RESUME_FIELDS = ["_id", "institution", "summary", "skills"];
+const RESUME_LIST_FIELDS = {
+    workExperience: ["role", "company", "description"],
+    projects: ["title", "description"],
+    education: ["degree", "institution"],
+};
+const JOB_FIELDS = ["_id", "title", "domain", "description", "requirements", "responsibilities"];
+
+let worker = null;
+let buffer = Buffer.alloc(0);
+const pending = new Map();
+
+// Single-flight: identical matches share one in-flight computation, and
+// successful results are reused for RESULT_TTL_MS.
+const inFlight = new Map();
+const recentResults = new Map();
+const stats = { computed: 0, coalesced: 0, cacheHits: 0 };
+
+function pick(doc, fields) {
+    const out = {};
+    for (const field of fields) {
+        if (doc?.[field] !== undefined && doc[field] !== null) {
+            out[field] = field === "_id" ? String(doc[field]) : doc[field];
+        }
+    }
+    return out;
+}
+
+export function projectResume(resume) {
+    const projected = pick(resume, RESUME_FIELDS);
+    for (const [field, keys] of Object.entries(RESUME_LIST_FIELDS)) {
+        if (Array.isArray(resume?.[field]) && resume[field].length) {
+            projected[field] = resume[field].map((entry) => pick(entry, keys));
+        }
+    }
+    return projected;
+}
+
+export function projectJob(job) {
+    return pick(job, JOB_FIELDS);
+}
+
+function encodeFrame(message) {
+    const payload = codec === "M"
+        ? Buffer.from(msgpack.encode(message))
+        : Buffer.from(JSON.stringify(message), "utf8");
+    const header = Buffer.alloc(HEADER_BYTES);
+    header.write(codec, 0, "latin1");
+    header.writeUInt32BE(payload.length, 1);
+    return Buffer.concat([header, payload]);
+}
+
+function decodePayload(codec, payload) {
+    if (codec === "M") {
+        if (!msgpack) throw new Error("msgpack frame received but @msgpack/msgpack is not installed");
+        return msgpack.decode(payload);
+    }
+    return JSON.parse(payload.toString("utf8"));
+}
+
+function rejectAll(error) {
+    for (const { reject, timer } of pending.values()) {
+        clearTimeout(timer);
+        reject(error);
+    }
+    pending.clear();
+}
+
+function handleMessage(message) {
+    if (message.id === null && Array.isArray(message.codecs)) {
+        codec = msgpack && message.codecs.includes("M") ? "M" : "J";
+        return;
+    }
+    if (message.id === null && message.error) {
+        logger.error("[matchWorker] Worker rejected a frame:", message.error);
+        return;
+    }
+    const entry = pending.get(message.id);
+    if (!entry) return;
+    pending.delete(message.id);
+    clearTimeout(entry.timer);
+    if (message.error) entry.resolve({ error: message.error });
+    else entry.resolve(message.result);
+}
+
+function drainFrames() {
+    while (buffer.length >= HEADER_BYTES) {
+        const codec = buffer.toString("latin1", 0, 1);
+        const length = buffer.readUInt32BE(1);
+        if (buffer.length < HEADER_BYTES + length) return;
+        const payload = buffer.subarray(HEADER_BYTES, HEADER_BYTES + length);
+        buffer = buffer.subarray(HEADER_BYTES + length);
+        try {
+            handleMessage(decodePayload(codec, payload));
+        } catch (err) {
+            logger.error("[matchWorker] Bad response frame:", err?.message || err);
+        }
+    }
+}
+
+function getWorker() {
+    if (worker) return worker;
+
+    worker = spawn("python", [
+        "./ml_modules/call_match.py",
+        "--serve",
+        "--framed",
+        "--workers",
+        String(MATCH_WORKERS),
+    ]);
+    buffer = Buffer.alloc(0);
+    codec = "J";
+
+    worker.stdout.on("data", (data) => {
+        buffer = buffer.length ? Buffer.concat([buffer, data]) : data;
+        drainFrames();
+    });
+    worker.stderr.on("data", (data) => logger.error("ML Error:", data.toString()));
+    worker.on("error", (err) => {
+        logger.error("[matchWorker] Failed to start:", err?.message || err);
+    });
+    worker.on("close", (code) => {
+        logger.warn(`[matchWorker] Exited with code ${code}`);
+        worker = null;
+        rejectAll(new Error("ML match worker exited"));
+    });
+
+    return worker;
+}
+
+function sendMatch(resume, job) {
+    return new Promise((resolve, reject) => {
+        const id = randomUUID();
+        const timer = setTimeout(() => {
+            pending.delete(id);
+            reject(new Error("ML match timed out"));
+        }, MATCH_TIMEOUT_MS);
+        pending.set(id, { resolve, reject, timer });
+        getWorker().stdin.write(encodeFrame({ id, resume, job }));
+    });
+}
+
+function contentKey(resume, job) {
+    return createHash("sha1").update(JSON.stringify([resume, job])).digest("hex");
+}
+
+function getRecentResult(key) {
+    const entry = recentResults.get(key);
+    if (!entry) return undefined;
+    if (entry.expires <= Date.now()) {
+        recentResults.delete(key);
+        return undefined;
+    }
+    return entry.result;
+}
+
+function rememberResult(key, result) {
+    recentResults.delete(key);
+    recentResults.set(key, { result, expires: Date.now() + RESULT_TTL_MS });
+    while (recentResults.size > RESULT_CACHE_SIZE) {
+        recentResults.delete(recentResults.keys().next().value);
+    }
+}
+
+/**
+ * Runs a resume-job match on the persistent ML worker.
+ * Concurrent calls with the same resume/job content wait on one computation.
+ * @param {Object} resume - Resume document
+ * @param {Object} job - Job document
+ * @returns {Promise<Object>} - Match result, or { error } if the analyzer failed
+ */
+export function runResumeJobMatch(resume, job) {
+    const projectedResume = projectResume(resume);
+    const projectedJob = projectJob(job);
+    const key = contentKey(projectedResume, projectedJob);
+
+    const cached = getRecentResult(key);
+    if (cached !== undefined) {
+        stats.cacheHits += 1;
+        return Promise.resolve(cached);
+    }
+    const leader = inFlight.get(key);
+    if (leader) {
+        stats.coalesced += 1;
+        return leader;
+    }
+
+    stats.computed += 1;
+    const promise = sendMatch(projectedResume, projectedJob)
+        .then((result) => {
+            if (!result?.error) rememberResult(key, result);
+            return result;
+        })
+        .finally(() => inFlight.delete(key));
+    inFlight.set(key, promise);
+    return promise;
+}
+
+/**
+ * Counters for the single-flight layer: computed, coalesced and cached requests.
+ */
+export function getMatchStats() {
+    return { ...stats, inFlight: inFlight.size, cachedResults: recentResults.size };
+}